@@ -1,32 +1,36 @@
 from datetime import datetime
 
+from ANALYSIS.geo import MAX_SPEED_KMH, ImpossibleTravel
+from ANALYSIS.records import parse_epoch, epoch_of, to_epoch
+from ANALYSIS.rules import default_engine, flagged, is_night_epoch
+from ANALYSIS.similarity import MessageClusters
+
 def is_night_time(time_str):
-    time = datetime.strptime(time_str, "%Y-%m-%d %H:%M")
-    return time.hour >= 0 and time.hour <= 5
+    epoch = parse_epoch(time_str)
+    if epoch is None:
+        raise ValueError(f"invalid timestamp: {time_str!r}")
+    return is_night_epoch(epoch)
+
+
+def scan(stream, records):
+    """
+    Single rule-engine pass over one artifact stream.
+    Returns (record, rule name or None) pairs for both the suspicious
+    set and the timeline severity.
+    """
+    return default_engine().scan(stream, records)
 
 
 def analyze_calls(calls):
-    suspicious_calls = []
-    for call in calls:
-        if is_night_time(call["time"]):
-            suspicious_calls.append(call)
-    return suspicious_calls
+    return flagged(scan("calls", calls))
 
 
 def analyze_messages(messages):
-    suspicious_messages = []
-    for msg in messages:
-        if "link" in msg["message"].lower() or msg["sender"].lower() == "unknown":
-            suspicious_messages.append(msg)
-    return suspicious_messages
+    return flagged(scan("messages", messages))
 
 
 def analyze_apps(apps):
-    suspicious_apps = []
-    for app in apps:
-        if app["permission"].lower() == "full access":
-            suspicious_apps.append(app)
-    return suspicious_apps
+    return flagged(scan("apps", apps))
 
 
 # -------- EXTRA FORENSIC CHECKS (ENHANCED ANALYSIS) --------
@@ -35,30 +39,71 @@ def analyze_location_jumps(locations):
     """
     Detects suspicious sudden location changes (basic heuristic).
     """
-    suspicious_locations = []
-    for loc in locations:
-        try:
-            hour = datetime.strptime(loc["time"], "%Y-%m-%d %H:%M").hour
-            if hour >= 0 and hour <= 5:
-                suspicious_locations.append(loc)
-        except Exception:
-            continue
-    return suspicious_locations
+    return flagged(scan("locations", locations))
+
+
+def analyze_impossible_travel(locations, max_speed_kmh=MAX_SPEED_KMH):
+    """
+    Detects impossible travel: legs between consecutive fixes (in time
+    order) faster than max_speed_kmh, allowing for minute timestamps
+    (geo.implausible). Returns geo.jump_row report rows in time order.
+    Needs the whole stream; for batches feed one geo.ImpossibleTravel
+    instead.
+    """
+    travel = ImpossibleTravel(max_speed_kmh)
+    travel.update(locations)
+    return travel.jumps()
 
 
-def analyze_timestamp_anomalies(records, time_key="time"):
+def analyze_message_campaigns(messages):
+    """
+    Clusters near-duplicate messages (ANALYSIS.similarity) and returns the
+    campaigns: the same text sent by several senders, largest first, as
+    report rows (size, senders, time span, sample). Needs the whole
+    stream; for batches feed one MessageClusters instead.
+    """
+    clusters = MessageClusters()
+    clusters.update(messages)
+    return [c.as_dict() for c in clusters.campaigns()]
+
+
+def analyze_timestamp_anomalies(records, time_key="time", now=None):
     """
     Detects invalid or future timestamps.
+    Pass the same `now` for every batch of a stream to get consistent results.
     """
     anomalies = []
-    now = datetime.now()
+    if now is None:
+        now = datetime.now()
+    now_epoch = to_epoch(now)
 
     for rec in records:
         try:
-            t = datetime.strptime(rec[time_key], "%Y-%m-%d %H:%M")
-            if t > now:
-                anomalies.append(rec)
-        except Exception:
+            t = epoch_of(rec, time_key)
+        except KeyError:
+            t = None
+        if t is None or t > now_epoch:
             anomalies.append(rec)
 
-    return anomalies
\ No newline at end of file
+    return anomalies
+
+
+# -------- BATCHED ANALYSIS --------
+
+# Analyzers that look across records; they need the whole stream at once
+WHOLE_STREAM = {"analyze_impossible_travel", "analyze_message_campaigns"}
+
+def analyze_in_batches(analyzer, batches, **kwargs):
+    """
+    Runs a per-record analyze_* function batch by batch (e.g. over
+    EXTRACTOR.extractor.iter_csv_batches) and collects the flagged records.
+    Only the current batch and the flagged records stay in memory.
+    Whole-stream analyzers (WHOLE_STREAM) are rejected: run batch by batch
+    they would miss travel legs and campaigns that cross batch boundaries.
+    """
+    if getattr(analyzer, "__name__", None) in WHOLE_STREAM:
+        raise ValueError(f"{analyzer.__name__} needs the whole stream, not batches")
+    results = []
+    for batch in batches:
+        results.extend(analyzer(batch, **kwargs))
+    return results
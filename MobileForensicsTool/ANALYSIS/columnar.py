@@ -0,0 +1,247 @@
+"""
+Columnar (NumPy/pandas) backend for ANALYSIS.analysis.
+
+Exposes the same analyze_* functions and scan(), but evaluates the
+compiled rule registry (ANALYSIS.rules) as masks over whole columns
+instead of a Python loop per row: one combined regex per keyword field,
+one dict lookup per exact-match field, vectorised hours for night rules.
+Given a list of records it returns the same records, in the same order,
+as the pure-Python functions; given a DataFrame it returns the filtered
+DataFrame.
+"""
+from datetime import datetime
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:  # optional: only needed for this backend
+    np = None
+    pd = None
+
+from ANALYSIS.geo import EARTH_RADIUS_M, MAX_SPEED_KMH, implausible, jump_row
+from ANALYSIS.records import Record, TIME_FORMAT, to_epoch
+from ANALYSIS.rules import NightTimeRule, default_engine
+from ANALYSIS.similarity import MessageClusters
+
+
+def _require_pandas():
+    if pd is None:
+        raise ImportError("The columnar analysis backend needs numpy and pandas installed")
+
+
+def _as_rows(records):
+    if isinstance(records, pd.DataFrame) or isinstance(records, list):
+        return records
+    return list(records)
+
+
+def _column(rows, field):
+    if isinstance(rows, pd.DataFrame):
+        return rows[field]
+    return pd.Series([r[field] for r in rows], dtype=object)
+
+
+def _epochs(rows, time_key="time"):
+    """Seconds since 1970 as float64, NaN where the timestamp is invalid."""
+    if isinstance(rows, pd.DataFrame):
+        if time_key == "time" and "epoch" in rows.columns:
+            return rows["epoch"].to_numpy(dtype=float, na_value=np.nan)
+    elif time_key == "time" and rows and isinstance(rows[0], Record):
+        # Typed records already carry the parsed timestamp
+        return np.array([r.epoch for r in rows], dtype=float)
+
+    times = pd.to_datetime(_column(rows, time_key), format=TIME_FORMAT, errors="coerce")
+    epochs = times.to_numpy(dtype="datetime64[s]").astype("int64").astype(float)
+    epochs[times.isna().to_numpy()] = np.nan
+    return epochs
+
+
+def _night_mask(rows):
+    # 00:00-05:59; NaN hours compare False, like unparseable rows
+    hours = np.floor_divide(_epochs(rows), 3600) % 24
+    return hours <= 5
+
+
+def _lower(col):
+    return col.str.lower()
+
+
+def _select(rows, mask):
+    mask = np.asarray(mask, dtype=bool)
+    if isinstance(rows, pd.DataFrame):
+        return rows[mask]
+    return [rows[i] for i in np.flatnonzero(mask)]
+
+
+def _iter_rows(rows):
+    if isinstance(rows, pd.DataFrame):
+        return rows.to_dict("records")
+    return rows
+
+
+def _hits(stream, rows):
+    """
+    Name of the first rule each row hits (None where nothing hit),
+    evaluated one compiled check at a time over whole columns.
+    """
+    hits = np.full(len(rows), None, dtype=object)
+    open_rows = np.ones(len(rows), dtype=bool)
+
+    for kind, field, payload in default_engine().streams[stream].checks:
+        if kind == "keyword":
+            regex, owners, ranks = payload
+            text = _lower(_column(rows, field).fillna(""))
+            if any(ranks.values()):
+                # Several rules share the group: the lowest-ranked keyword present wins
+                found = text.str.findall(regex.pattern).map(lambda ks: min(ks, key=ranks.get) if ks else None)
+            else:
+                found = text.str.extract(regex.pattern, expand=False)
+            names = found.map(owners).to_numpy(dtype=object)
+        elif kind == "exact":
+            names = _lower(_column(rows, field).fillna("")).map(payload).to_numpy(dtype=object)
+        elif isinstance(payload, NightTimeRule):
+            names = np.where(_night_mask(rows), payload.name, None)
+        else:
+            names = np.array(
+                [payload.name if payload.match(r) else None for r in _iter_rows(rows)],
+                dtype=object
+            )
+
+        # Registration order decides which rule is reported
+        matched = open_rows & pd.notna(names)
+        hits[matched] = names[matched]
+        open_rows &= ~matched
+
+    return hits
+
+
+def scan(stream, records):
+    """Same (record, rule name or None) pairs as ANALYSIS.analysis.scan."""
+    _require_pandas()
+    rows = _as_rows(records)
+    if len(rows) == 0:
+        return []
+    return list(zip(_iter_rows(rows), _hits(stream, rows)))
+
+
+def hits(stream, records):
+    """Rule name (or None) per row as an object array, without pairing rows back up like scan()."""
+    _require_pandas()
+    rows = _as_rows(records)
+    if len(rows) == 0:
+        return np.full(0, None, dtype=object)
+    return _hits(stream, rows)
+
+
+def _analyze(stream, records):
+    _require_pandas()
+    rows = _as_rows(records)
+    if len(rows) == 0:
+        return rows[:0]
+    return _select(rows, pd.notna(_hits(stream, rows)))
+
+
+def analyze_calls(calls):
+    return _analyze("calls", calls)
+
+
+def analyze_messages(messages):
+    return _analyze("messages", messages)
+
+
+def analyze_apps(apps):
+    return _analyze("apps", apps)
+
+
+def _haversine_m(lat1, lon1, lat2, lon2):
+    p1, p2 = np.radians(lat1), np.radians(lat2)
+    a = (
+        np.sin((p2 - p1) / 2) ** 2
+        + np.cos(p1) * np.cos(p2) * np.sin(np.radians(lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+
+def _fixes(rows):
+    """Latitude, longitude and epoch columns as float arrays (NaN where invalid)."""
+    lat = pd.to_numeric(_column(rows, "latitude"), errors="coerce").to_numpy(dtype=float)
+    lon = pd.to_numeric(_column(rows, "longitude"), errors="coerce").to_numpy(dtype=float)
+    return lat, lon, _epochs(rows)
+
+
+def _legs(lat, lon, epochs):
+    """
+    Row positions of the valid fixes in time order (stable), and the
+    distance, seconds and speed of each leg between consecutive ones.
+    """
+    valid = np.flatnonzero(~(np.isnan(lat) | np.isnan(lon) | np.isnan(epochs)))
+    order = valid[np.argsort(epochs[valid], kind="stable")]
+    distance = _haversine_m(lat[order[:-1]], lon[order[:-1]], lat[order[1:]], lon[order[1:]])
+    seconds = np.diff(epochs[order])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        speed = np.where(
+            seconds > 0, distance / seconds * 3.6, np.where(distance > 0, np.inf, 0.0)
+        )
+    return order, distance, seconds, speed
+
+
+def trajectory(locations):
+    """
+    Time-ordered trajectory as a DataFrame: latitude, longitude, epoch and,
+    for the leg ending at each fix, distance_m, seconds and speed_kmh
+    (NaN on the first fix). The index is the row position in the input.
+    """
+    _require_pandas()
+    rows = _as_rows(locations)
+    if len(rows) == 0:
+        return pd.DataFrame(columns=["latitude", "longitude", "epoch", "distance_m", "seconds", "speed_kmh"])
+    lat, lon, epochs = _fixes(rows)
+    order, distance, seconds, speed = _legs(lat, lon, epochs)
+    lead = np.array([np.nan])
+    return pd.DataFrame({
+        "latitude": lat[order],
+        "longitude": lon[order],
+        "epoch": epochs[order],
+        "distance_m": np.concatenate([lead, distance])[:len(order)],
+        "seconds": np.concatenate([lead, seconds])[:len(order)],
+        "speed_kmh": np.concatenate([lead, speed])[:len(order)],
+    }, index=order)
+
+
+def analyze_location_jumps(locations):
+    return _analyze("locations", locations)
+
+
+def analyze_impossible_travel(locations, max_speed_kmh=MAX_SPEED_KMH):
+    _require_pandas()
+    rows = _as_rows(locations)
+    if len(rows) == 0:
+        return []
+    lat, lon, epochs = _fixes(rows)
+    order, distance, seconds, _ = _legs(lat, lon, epochs)
+    found = []
+    for i in np.flatnonzero(implausible(distance, seconds, max_speed_kmh)):
+        a, b = order[i], order[i + 1]
+        found.append(jump_row((epochs[a], lat[a], lon[a]), (epochs[b], lat[b], lon[b]), float(distance[i])))
+    return found
+
+
+def analyze_message_campaigns(messages):
+    _require_pandas()
+    rows = _as_rows(messages)
+    clusters = MessageClusters()
+    if len(rows):
+        clusters.add_many(_column(rows, "message"), _column(rows, "sender"), _epochs(rows))
+    return [c.as_dict() for c in clusters.campaigns()]
+
+
+def analyze_timestamp_anomalies(records, time_key="time", now=None):
+    _require_pandas()
+    rows = _as_rows(records)
+    if len(rows) == 0:
+        return rows[:0]
+    if now is None:
+        now = datetime.now()
+    epochs = _epochs(rows, time_key)
+    mask = np.isnan(epochs) | (epochs > to_epoch(now))
+    return _select(rows, mask)
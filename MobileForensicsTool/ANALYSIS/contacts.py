@@ -0,0 +1,232 @@
+"""
+Communication graph analytics.
+
+Calls (`number`) and messages (`sender`/`address`) are folded, one record
+at a time, into per-counterparty aggregates and a weighted adjacency
+between owners (the acquired devices) and the parties they talk to:
+
+    graph = ContactGraph()
+    graph.update("calls", calls, owner="SERIAL1")
+    graph.update("messages", messages, owner="SERIAL1")
+    graph.top(10, key="night")
+    graph.bursts(window_s=600, min_events=5)
+
+Nothing is rebuilt when more records arrive; update() again with only
+the new ones (or pass record keys, e.g. the provider `_id`s, and let the
+graph drop repeats). Each party keeps its event times sorted, so window
+and burst queries bisect instead of rescanning the stream.
+"""
+import heapq
+import re
+from bisect import bisect_left, bisect_right, insort
+
+from ANALYSIS.records import epoch_of
+from ANALYSIS.rules import is_night_epoch
+
+# Owner node for single-device analysis
+OWNER = "DEVICE"
+# Record field naming the counterparty, per stream
+PARTY_FIELDS = {"calls": "number", "messages": "sender"}
+# A burst is at least BURST_MIN_EVENTS interactions within BURST_WINDOW_S
+BURST_WINDOW_S = 900
+BURST_MIN_EVENTS = 3
+
+_NUMBER_PUNCTUATION = re.compile(r"[\s\-().]")
+
+
+def party_of(value):
+    """
+    Canonical counterparty id: phone numbers without spacing or
+    punctuation (a leading + is kept), anything else trimmed.
+    None/NaN and blanks give None.
+    """
+    if value is None or value != value:
+        return None
+    text = str(value).strip()
+    digits = _NUMBER_PUNCTUATION.sub("", text)
+    if digits.lstrip("+").isdigit():
+        return digits
+    return text or None
+
+
+class Contact:
+    """Running aggregates of one counterparty."""
+    __slots__ = ("party", "calls", "messages", "duration", "first", "last", "night", "epochs")
+
+    def __init__(self, party):
+        self.party = party
+        self.calls = self.messages = self.duration = self.night = 0
+        self.first = self.last = None
+        self.epochs = []
+
+    @property
+    def interactions(self):
+        return self.calls + self.messages
+
+    @property
+    def night_ratio(self):
+        return self.night / self.interactions if self.interactions else 0.0
+
+    def as_dict(self):
+        return {
+            "party": self.party, "interactions": self.interactions, "calls": self.calls,
+            "messages": self.messages, "duration": self.duration, "first": self.first,
+            "last": self.last, "night": self.night, "night_ratio": round(self.night_ratio, 3),
+        }
+
+
+class ContactGraph:
+    """
+    Incremental contact network. Nodes are owners and counterparties;
+    edges[owner][party] counts their interactions. Not thread-safe.
+    """
+    RANK_KEYS = {
+        "interactions": lambda c: c.interactions,
+        "duration": lambda c: c.duration,
+        "night": lambda c: c.night,
+        "night_ratio": lambda c: (c.night_ratio, c.interactions),
+        "recent": lambda c: c.last if c.last is not None else float("-inf"),
+    }
+
+    def __init__(self):
+        self.contacts = {}
+        self.edges = {}
+        self.owners_of = {}
+        self._seen = set()
+
+    def __len__(self):
+        return len(self.contacts)
+
+    # ---------------- INGEST ----------------
+    def add(self, party, epoch=None, kind="calls", duration=0, owner=OWNER, key=None):
+        """
+        Folds one interaction in. `key`, if given, identifies the source
+        record; a key already added is ignored, so re-acquired logs can be
+        fed again without double counting. Returns True if it was added.
+        """
+        party = party_of(party)
+        if party is None:
+            return False
+        if key is not None:
+            if (owner, kind, key) in self._seen:
+                return False
+            self._seen.add((owner, kind, key))
+
+        contact = self.contacts.get(party)
+        if contact is None:
+            contact = self.contacts[party] = Contact(party)
+        if kind == "calls":
+            contact.calls += 1
+            contact.duration += duration or 0
+        else:
+            contact.messages += 1
+        if epoch is not None:
+            if contact.first is None or epoch < contact.first:
+                contact.first = epoch
+            if contact.last is None or epoch > contact.last:
+                contact.last = epoch
+            if is_night_epoch(epoch):
+                contact.night += 1
+            # Logs arrive mostly in time order, so this is usually an append
+            if not contact.epochs or epoch >= contact.epochs[-1]:
+                contact.epochs.append(epoch)
+            else:
+                insort(contact.epochs, epoch)
+
+        peers = self.edges.setdefault(owner, {})
+        peers[party] = peers.get(party, 0) + 1
+        owners = self.owners_of.setdefault(party, {})
+        owners[owner] = owners.get(owner, 0) + 1
+        return True
+
+    def update(self, stream, records, owner=OWNER, keys=None):
+        """
+        Adds every call or message record (typed records or dicts); returns
+        how many were added. `keys`, one per record, are passed to add() so
+        records fed again are skipped.
+        """
+        field = PARTY_FIELDS[stream]
+        keys = iter(keys) if keys is not None else None
+        added = 0
+        for rec in records:
+            duration = _seconds(rec.get("duration")) if stream == "calls" else 0
+            key = next(keys) if keys is not None else None
+            added += self.add(rec[field], epoch_of(rec), stream, duration, owner, key)
+        return added
+
+    # ---------------- QUERIES ----------------
+    def top(self, k=10, key="interactions"):
+        """The k contacts ranked highest by RANK_KEYS[key], best first."""
+        return heapq.nlargest(k, self.contacts.values(), key=self.RANK_KEYS[key])
+
+    def neighbours(self, node):
+        """{neighbour: weight} of an owner or a counterparty."""
+        if node in self.edges:
+            return dict(self.edges[node])
+        return dict(self.owners_of.get(party_of(node), {}))
+
+    def bridges(self, min_owners=2):
+        """
+        Counterparties linking at least min_owners devices, as
+        (party, {owner: weight}), most connected first.
+        """
+        found = [(party, dict(owners)) for party, owners in self.owners_of.items() if len(owners) >= min_owners]
+        found.sort(key=lambda item: (-len(item[1]), -sum(item[1].values()), item[0]))
+        return found
+
+    def active_between(self, start, end, k=None):
+        """
+        (party, interactions) with at least one interaction in
+        [start, end), busiest first; the top k only if k is given.
+        """
+        counts = (
+            (c.party, bisect_left(c.epochs, end) - bisect_left(c.epochs, start))
+            for c in self.contacts.values()
+        )
+        counts = [(party, n) for party, n in counts if n > 0]
+        if k is not None:
+            return heapq.nlargest(k, counts, key=lambda item: item[1])
+        counts.sort(key=lambda item: -item[1])
+        return counts
+
+    def bursts(self, window_s=BURST_WINDOW_S, min_events=BURST_MIN_EVENTS, party=None):
+        """
+        Stretches where one party has at least min_events interactions
+        within window_s seconds. Overlapping windows are merged, so each
+        burst is reported once as {party, start, end, events}; largest
+        first. Restrict to one counterparty with `party`.
+        """
+        if party is not None:
+            contact = self.contacts.get(party_of(party))
+            contacts = [contact] if contact else []
+        else:
+            contacts = self.contacts.values()
+        bursts = []
+        for c in contacts:
+            epochs = c.epochs
+            if len(epochs) < min_events:
+                continue
+            # Slide over start positions; a qualifying window that starts
+            # inside the current burst extends it
+            runs = []
+            for i, t in enumerate(epochs):
+                j = bisect_right(epochs, t + window_s, i)
+                if j - i < min_events:
+                    continue
+                if runs and i < runs[-1][1]:
+                    runs[-1][1] = max(runs[-1][1], j)
+                else:
+                    runs.append([i, j])
+            bursts.extend(
+                {"party": c.party, "start": epochs[i], "end": epochs[j - 1], "events": j - i}
+                for i, j in runs
+            )
+        bursts.sort(key=lambda b: (-b["events"], b["start"]))
+        return bursts
+
+
+def _seconds(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
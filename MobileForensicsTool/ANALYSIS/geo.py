@@ -0,0 +1,252 @@
+"""
+Location trajectory analytics.
+
+Fixes are (latitude, longitude, time) records. Everything here works on
+the time-ordered trajectory: consecutive fixes form legs with a great-
+circle distance and implied speed, slow stretches form dwell points, and
+a GridIndex answers "fixes within R metres of X" without scanning every
+fix. ANALYSIS.columnar has the vectorised (NumPy) leg computation.
+"""
+import math
+from array import array
+
+from ANALYSIS.records import epoch_of, format_epoch
+
+EARTH_RADIUS_M = 6371008.8
+# Metres per degree of latitude (and of longitude at the equator)
+METRES_PER_DEGREE = 111320.0
+
+# Legs faster than this are physically implausible for a handset
+MAX_SPEED_KMH = 300.0
+# Timestamps are kept to the minute: two fixes may be up to this much
+# further apart in time than their timestamps say
+TIME_RESOLUTION_S = 60
+# A dwell is at least DWELL_MIN_SECONDS spent within DWELL_RADIUS_M
+DWELL_RADIUS_M = 150.0
+DWELL_MIN_SECONDS = 600
+# Side of a GridIndex cell
+GRID_CELL_M = 500.0
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    """Great-circle distance in metres between two points in degrees."""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def speed_kmh(distance_m, seconds):
+    if seconds > 0:
+        return distance_m / seconds * 3.6
+    # Two places at the same instant
+    return math.inf if distance_m > 0 else 0.0
+
+
+def implausible(distance_m, seconds, max_speed_kmh=MAX_SPEED_KMH):
+    """
+    True for a leg that is too fast even over the longest time its
+    timestamps allow (seconds + TIME_RESOLUTION_S). Works elementwise on
+    NumPy arrays and pandas Series too.
+    """
+    return distance_m / (seconds + TIME_RESOLUTION_S) * 3.6 > max_speed_kmh
+
+
+def fix_of(rec):
+    """(epoch, latitude, longitude) of a location record, or None if any is invalid."""
+    try:
+        lat, lon = float(rec["latitude"]), float(rec["longitude"])
+    except (TypeError, ValueError):
+        return None
+    epoch = epoch_of(rec)
+    if epoch is None or math.isnan(lat) or math.isnan(lon):
+        return None
+    return epoch, lat, lon
+
+
+def trajectory(locations):
+    """
+    Valid fixes in time order (ties keep input order) as
+    (epoch, latitude, longitude, record) tuples.
+    """
+    fixes = []
+    for rec in locations:
+        fix = fix_of(rec)
+        if fix is not None:
+            fixes.append(fix + (rec,))
+    fixes.sort(key=lambda f: f[0])
+    return fixes
+
+
+def travel_legs(locations):
+    """
+    Yields one dict per pair of consecutive fixes: start and end record,
+    distance_m, seconds and speed_kmh.
+    """
+    fixes = trajectory(locations)
+    for (t1, lat1, lon1, start), (t2, lat2, lon2, end) in zip(fixes, fixes[1:]):
+        distance = haversine_m(lat1, lon1, lat2, lon2)
+        yield {
+            "start": start,
+            "end": end,
+            "distance_m": distance,
+            "seconds": t2 - t1,
+            "speed_kmh": speed_kmh(distance, t2 - t1),
+        }
+
+
+class ImpossibleTravel:
+    """
+    Impossible-travel detection over a location stream fed batch by batch
+    in any order. Keeps only (epoch, latitude, longitude) per valid fix;
+    jumps() orders them like trajectory() and reports every implausible()
+    leg.
+    """
+
+    def __init__(self, max_speed_kmh=MAX_SPEED_KMH):
+        self.max_speed_kmh = max_speed_kmh
+        self._epochs, self._lats, self._lons = array("d"), array("d"), array("d")
+
+    def __len__(self):
+        return len(self._epochs)
+
+    def update(self, locations):
+        """Adds a batch of location records; returns how many were valid fixes."""
+        n = 0
+        for rec in locations:
+            fix = fix_of(rec)
+            if fix is not None:
+                self._epochs.append(fix[0])
+                self._lats.append(fix[1])
+                self._lons.append(fix[2])
+                n += 1
+        return n
+
+    def jumps(self):
+        """jump_row() of every impossible leg, in time order."""
+        epochs, lats, lons = self._epochs, self._lats, self._lons
+        order = sorted(range(len(epochs)), key=epochs.__getitem__)
+        rows = []
+        for i, j in zip(order, order[1:]):
+            distance = haversine_m(lats[i], lons[i], lats[j], lons[j])
+            if implausible(distance, epochs[j] - epochs[i], self.max_speed_kmh):
+                rows.append(jump_row((epochs[i], lats[i], lons[i]), (epochs[j], lats[j], lons[j]), distance))
+        return rows
+
+
+def jump_row(start, end, distance_m):
+    """Report row of one leg between (epoch, latitude, longitude) fixes: from/to time and position, distance, gap, speed."""
+    seconds = end[0] - start[0]
+    speed = speed_kmh(distance_m, seconds)
+    return {
+        "from": format_epoch(int(start[0])), "to": format_epoch(int(end[0])),
+        "from_position": f"{start[1]:.5f}, {start[2]:.5f}", "to_position": f"{end[1]:.5f}, {end[2]:.5f}",
+        "distance": f"{distance_m / 1000:.1f} km", "gap": f"{seconds / 60:.0f} min",
+        "speed": "same minute" if math.isinf(speed) else f"{speed:.0f} km/h",
+    }
+
+
+def dwell_points(locations, radius_m=DWELL_RADIUS_M, min_seconds=DWELL_MIN_SECONDS):
+    """
+    Stay-point detection: a run of consecutive fixes that all lie within
+    radius_m of the run's first fix and span at least min_seconds is one
+    dwell. Returns dicts with the run's centroid, start/end epoch and
+    fix count, in time order.
+    """
+    fixes = trajectory(locations)
+    dwells = []
+    i = 0
+    while i < len(fixes):
+        t0, lat0, lon0, _ = fixes[i]
+        j = i + 1
+        while j < len(fixes) and haversine_m(lat0, lon0, fixes[j][1], fixes[j][2]) <= radius_m:
+            j += 1
+        if fixes[j - 1][0] - t0 >= min_seconds:
+            run = fixes[i:j]
+            dwells.append({
+                "latitude": sum(f[1] for f in run) / len(run),
+                "longitude": sum(f[2] for f in run) / len(run),
+                "start": t0,
+                "end": run[-1][0],
+                "fixes": len(run),
+            })
+            i = j
+        else:
+            i += 1
+    return dwells
+
+
+class GridIndex:
+    """
+    Buckets points into square cells of about cell_m metres so a radius
+    query only measures the points in the cells overlapping its bounding
+    box. Point ids are positions in the sequence passed in.
+    Longitudes are not wrapped at the antimeridian.
+    """
+
+    def __init__(self, points, cell_m=GRID_CELL_M):
+        self.cell_deg = cell_m / METRES_PER_DEGREE
+        self.points = []
+        self.cells = {}
+        for i, (lat, lon) in enumerate(points):
+            self.points.append((lat, lon))
+            self.cells.setdefault(self._cell(lat, lon), []).append(i)
+
+    def _cell(self, lat, lon):
+        return int(math.floor(lat / self.cell_deg)), int(math.floor(lon / self.cell_deg))
+
+    def near(self, lat, lon, radius_m):
+        """Sorted ids of the points within radius_m metres of (lat, lon)."""
+        dlat = radius_m / METRES_PER_DEGREE
+        dlon = radius_m / (METRES_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6))
+        lat_lo, lon_lo = self._cell(lat - dlat, lon - dlon)
+        lat_hi, lon_hi = self._cell(lat + dlat, lon + dlon)
+        if (lat_hi - lat_lo + 1) * (lon_hi - lon_lo + 1) <= len(self.cells):
+            cells = (
+                self.cells.get((ci, cj), ())
+                for ci in range(lat_lo, lat_hi + 1)
+                for cj in range(lon_lo, lon_hi + 1)
+            )
+        else:
+            # The radius spans more cells than are occupied; walk those instead
+            cells = (
+                ids for (ci, cj), ids in self.cells.items()
+                if lat_lo <= ci <= lat_hi and lon_lo <= cj <= lon_hi
+            )
+        found = []
+        for ids in cells:
+            for i in ids:
+                plat, plon = self.points[i]
+                if haversine_m(lat, lon, plat, plon) <= radius_m:
+                    found.append(i)
+        found.sort()
+        return found
+
+
+def visits_near(locations, lat, lon, radius_m, cell_m=GRID_CELL_M):
+    """
+    Visits to within radius_m of (lat, lon): runs of consecutive fixes
+    inside the radius, as dicts with start/end epoch and the fix records.
+    Build a GridIndex over trajectory() yourself to answer many queries.
+    """
+    fixes = trajectory(locations)
+    index = GridIndex([(f[1], f[2]) for f in fixes], cell_m)
+    return group_visits(fixes, index.near(lat, lon, radius_m))
+
+
+def group_visits(fixes, ids):
+    """Splits sorted trajectory positions into runs of consecutive positions."""
+    visits = []
+    for i in ids:
+        if visits and visits[-1]["last"] == i - 1:
+            visit = visits[-1]
+        else:
+            visit = {"start": fixes[i][0], "records": []}
+            visits.append(visit)
+        visit["last"] = i
+        visit["end"] = fixes[i][0]
+        visit["records"].append(fixes[i][3])
+    for visit in visits:
+        del visit["last"]
+    return visits
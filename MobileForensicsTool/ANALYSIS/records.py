@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+TIME_FORMAT = "%Y-%m-%d %H:%M"
+_EPOCH = datetime(1970, 1, 1)
+
+
+@lru_cache(maxsize=65536)
+def parse_epoch(time_str):
+    """
+    Parses a "%Y-%m-%d %H:%M" timestamp into whole seconds since 1970-01-01.
+    The device clock is kept as-is (no timezone shift), so epoch_hour() gives
+    the same hour strptime would. Returns None if the timestamp is invalid.
+    Timestamps repeat heavily at minute resolution, hence the cache.
+    """
+    try:
+        return int((datetime.strptime(time_str, TIME_FORMAT) - _EPOCH).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def to_epoch(dt):
+    """Converts a naive datetime onto the same scale as parse_epoch()."""
+    return (dt - _EPOCH).total_seconds()
+
+
+def format_epoch(epoch):
+    """Inverse of parse_epoch (to the minute); "" for None."""
+    if epoch is None:
+        return ""
+    return (_EPOCH + timedelta(seconds=epoch)).strftime(TIME_FORMAT)
+
+
+def epoch_hour(epoch):
+    return epoch // 3600 % 24
+
+
+def epoch_of(rec, time_key="time"):
+    """
+    Returns the parsed timestamp of a record.
+    Typed records reuse the value cached at ingestion; plain dicts are parsed.
+    """
+    if time_key == "time" and isinstance(rec, Record):
+        return rec.epoch
+    return parse_epoch(rec[time_key])
+
+
+# -------- TYPED RECORDS --------
+
+class Record:
+    """
+    Compact artifact row. Fields are slots rather than a per-row dict, and
+    the timestamp (if any) is parsed once into `epoch` when the row is built.
+    Supports rec["field"], rec.get() and rec.items() so existing
+    dict-based callers (pretty printing, report) keep working.
+    """
+    __slots__ = ()
+    FIELDS = ()
+
+    @classmethod
+    def from_row(cls, row):
+        rec = cls.__new__(cls)
+        for field in cls.FIELDS:
+            setattr(rec, field, row.get(field))
+        if "epoch" in cls.__slots__:
+            rec.epoch = parse_epoch(rec.time)
+        return rec
+
+    @classmethod
+    def from_values(cls, values, epoch=None):
+        """
+        Builds a record from values in FIELDS order plus a timestamp that was
+        already parsed (e.g. stored in a columnar evidence file).
+        """
+        rec = cls.__new__(cls)
+        for field, value in zip(cls.FIELDS, values):
+            setattr(rec, field, value)
+        if "epoch" in cls.__slots__:
+            rec.epoch = epoch
+        return rec
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self.FIELDS
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.FIELDS else default
+
+    def keys(self):
+        return self.FIELDS
+
+    def items(self):
+        return [(field, getattr(self, field)) for field in self.FIELDS]
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            return type(self) is type(other) and self.items() == other.items()
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        args = ", ".join(f"{k}={v!r}" for k, v in self.items())
+        return f"{type(self).__name__}({args})"
+
+
+class Call(Record):
+    __slots__ = ("number", "time", "duration", "epoch")
+    FIELDS = ("number", "time", "duration")
+
+
+class Message(Record):
+    __slots__ = ("sender", "message", "time", "epoch")
+    FIELDS = ("sender", "message", "time")
+
+
+class App(Record):
+    __slots__ = ("app_name", "permission")
+    FIELDS = ("app_name", "permission")
+
+
+class Location(Record):
+    __slots__ = ("latitude", "longitude", "time", "epoch")
+    FIELDS = ("latitude", "longitude", "time")
+
+
+# Record type for each DATA csv
+RECORD_TYPES = {
+    "calls.csv": Call,
+    "messages.csv": Message,
+    "apps.csv": App,
+    "location.csv": Location,
+}
@@ -0,0 +1,236 @@
+"""
+Declarative rule engine shared by ANALYSIS and TIMELINE.
+
+Every heuristic is a Rule registered against one artifact stream
+("calls", "messages", "apps", "locations"). A RuleEngine compiles the
+registry once: all keyword rules on a field become a single combined
+regex and all exact-value rules on a field become one dict lookup, so
+adding more rules does not add more passes over the data. One scan of a
+stream yields, per record, the name of the first rule it hit (or None);
+that gives both the suspicious set and the timeline severity.
+"""
+import json
+import re
+
+from ANALYSIS.records import epoch_hour, epoch_of
+
+STREAMS = ("calls", "messages", "apps", "locations")
+
+
+def is_night_epoch(epoch):
+    return epoch is not None and 0 <= epoch_hour(epoch) <= 5
+
+
+# -------- RULE TYPES --------
+
+class Rule:
+    """A named check on one stream. Subclasses implement match(rec)."""
+
+    def __init__(self, name, stream):
+        if stream not in STREAMS:
+            raise ValueError(f"unknown artifact stream: {stream!r}")
+        self.name = name
+        self.stream = stream
+
+    def match(self, rec):
+        raise NotImplementedError
+
+
+class NightTimeRule(Rule):
+    """Flags records timestamped between 00:00 and 05:59."""
+
+    def match(self, rec):
+        return is_night_epoch(epoch_of(rec))
+
+
+class KeywordRule(Rule):
+    """Flags records whose field contains any keyword (case-insensitive)."""
+
+    def __init__(self, name, stream, field, keywords):
+        super().__init__(name, stream)
+        if not keywords:
+            raise ValueError(f"keyword rule {name!r} has no keywords")
+        self.field = field
+        self.keywords = [k.lower() for k in keywords]
+
+    def match(self, rec):
+        value = (rec[self.field] or "").lower()
+        return any(k in value for k in self.keywords)
+
+
+class ExactMatchRule(Rule):
+    """Flags records whose field equals one of the values (case-insensitive),
+    e.g. an "unknown" sender or a number blocklist."""
+
+    def __init__(self, name, stream, field, values):
+        super().__init__(name, stream)
+        self.field = field
+        self.values = {v.lower() for v in values}
+
+    def match(self, rec):
+        return (rec[self.field] or "").lower() in self.values
+
+
+RULE_TYPES = {
+    "night": NightTimeRule,
+    "keyword": KeywordRule,
+    "exact": ExactMatchRule,
+}
+
+
+# -------- REGISTRY --------
+
+_registry = []
+
+
+def register_rule(rule):
+    """Adds a rule to the registry; engines built afterwards include it."""
+    global _default_engine
+    _registry.append(rule)
+    _default_engine = None
+    return rule
+
+
+def registered_rules(stream=None):
+    return [r for r in _registry if stream is None or r.stream == stream]
+
+
+def load_rules(path):
+    """
+    Registers rules from a JSON file: a list of objects such as
+    {"type": "keyword", "name": "otp_phish", "stream": "messages",
+     "field": "message", "values": ["otp", "kyc"]}
+    """
+    with open(path, encoding="utf-8") as f:
+        specs = json.load(f)
+    for spec in specs:
+        rule_type = RULE_TYPES[spec["type"]]
+        if rule_type is NightTimeRule:
+            register_rule(rule_type(spec["name"], spec["stream"]))
+        else:
+            register_rule(rule_type(spec["name"], spec["stream"], spec["field"], spec["values"]))
+
+
+# -------- COMPILED ENGINE --------
+
+class CompiledStream:
+    """
+    Rules of one stream grouped for a single pass, in registration order.
+    Only consecutive keyword (or exact) rules on the same field share a
+    group, so a group never jumps ahead of a rule registered before it.
+    checks holds (kind, field, payload) tuples:
+      ("keyword", field, (regex, {keyword: rule name}, {keyword: rank}))
+      ("exact", field, {value: rule name})
+      ("rule", None, rule)  -- any other Rule, evaluated as-is
+    A keyword's rank is the position of its rule within the group; when
+    several keywords occur, the lowest rank wins, not the leftmost match.
+    """
+
+    def __init__(self, rules):
+        self.checks = []
+        group = None
+
+        for rule in rules:
+            kind = "keyword" if isinstance(rule, KeywordRule) else "exact" if isinstance(rule, ExactMatchRule) else "rule"
+            if kind == "rule":
+                self.checks.append((kind, None, rule))
+                group = None
+                continue
+            if group is None or group[:2] != (kind, rule.field):
+                group = (kind, rule.field, [])
+                self.checks.append(group)
+            group[2].append(rule)
+
+        for i, (kind, field, payload) in enumerate(self.checks):
+            if kind == "keyword":
+                self.checks[i] = (kind, field, self._keyword_group(payload))
+            elif kind == "exact":
+                owners = {}
+                for rule in payload:
+                    for v in rule.values:
+                        owners.setdefault(v, rule.name)
+                self.checks[i] = (kind, field, owners)
+
+    @staticmethod
+    def _keyword_group(rules):
+        owners, ranks = {}, {}
+        for rank, rule in enumerate(rules):
+            for k in rule.keywords:
+                if k not in owners:
+                    owners[k], ranks[k] = rule.name, rank
+        # One lookahead alternation finds a keyword at every position; at one
+        # position the earliest rule's keywords, longest first, are tried first
+        ordered = sorted(owners, key=lambda k: (ranks[k], -len(k)))
+        regex = re.compile("(?=(" + "|".join(re.escape(k) for k in ordered) + "))")
+        return regex, owners, ranks
+
+    def match(self, rec):
+        for kind, field, payload in self.checks:
+            if kind == "keyword":
+                regex, owners, ranks = payload
+                hit = None
+                for m in regex.finditer((rec[field] or "").lower()):
+                    k = m.group(1)
+                    if hit is None or ranks[k] < ranks[hit]:
+                        hit = k
+                        if not ranks[k]:
+                            break
+                if hit is not None:
+                    return owners[hit]
+            elif kind == "exact":
+                hit = payload.get((rec[field] or "").lower())
+                if hit:
+                    return hit
+            elif payload.match(rec):
+                return payload.name
+        return None
+
+
+class RuleEngine:
+    def __init__(self, rules=None):
+        rules = registered_rules() if rules is None else list(rules)
+        self.streams = {
+            stream: CompiledStream([r for r in rules if r.stream == stream])
+            for stream in STREAMS
+        }
+
+    def match(self, stream, rec):
+        """Returns the name of the first rule the record hits, or None."""
+        return self.streams[stream].match(rec)
+
+    def scan(self, stream, records):
+        """One pass over a stream: a list of (record, rule name or None)."""
+        return list(self.iter_scan(stream, records))
+
+    def iter_scan(self, stream, records):
+        """Lazy scan(), for record iterators that should not be materialized."""
+        match = self.streams[stream].match
+        return ((rec, match(rec)) for rec in records)
+
+
+_default_engine = None
+
+
+def default_engine():
+    """Engine over the current registry, rebuilt after register_rule()."""
+    global _default_engine
+    if _default_engine is None:
+        _default_engine = RuleEngine()
+    return _default_engine
+
+
+def flagged(scanned):
+    return [rec for rec, hit in scanned if hit]
+
+
+def severity(hit):
+    return "HIGH" if hit else "NORMAL"
+
+
+# -------- BUILT-IN HEURISTICS --------
+
+register_rule(NightTimeRule("night_call", "calls"))
+register_rule(KeywordRule("link_in_message", "messages", "message", ["link"]))
+register_rule(ExactMatchRule("unknown_sender", "messages", "sender", ["unknown"]))
+register_rule(ExactMatchRule("full_access_app", "apps", "permission", ["full access"]))
+register_rule(NightTimeRule("night_location", "locations"))
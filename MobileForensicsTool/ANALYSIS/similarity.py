@@ -0,0 +1,320 @@
+"""
+Near-duplicate SMS clustering (MinHash + LSH).
+
+Phishing and spam campaigns send one text from many rotating senders with
+small edits: another link, amount or name. Each message is normalised
+(lower case, digit runs -> "0", whitespace collapsed), cut into
+SHINGLE_SIZE-byte shingles and summarised by a NUM_PERM-value MinHash
+signature; the share of equal values between two signatures estimates the
+Jaccard similarity of their shingle sets. Signatures are split into BANDS
+bands and every band is an LSH bucket key, so near-duplicates meet in at
+least one bucket with high probability while unrelated texts almost never
+do:
+
+    clusters = MessageClusters()
+    clusters.update(messages)                  # batch by batch
+    clusters.campaigns()                       # Cluster: size, senders, time span
+    clusters.campaign_keys()                   # stream positions of their messages
+
+A message is only compared with the message that opened each bucket it
+falls into (at most BANDS signature comparisons) and joins that cluster if
+their estimated similarity is at least SIMILARITY_THRESHOLD. No other
+pairs are ever looked at, so a campaign of any size is linked in linear
+time. Memory is one signature (NUM_PERM * 4 bytes) and BANDS bucket
+entries per indexed message. With NumPy installed signatures are computed
+a batch at a time; the pure-Python path gives identical signatures.
+"""
+import random
+import re
+from array import array
+
+from ANALYSIS.records import epoch_of, format_epoch
+
+SHINGLE_SIZE = 5
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+# Estimated Jaccard similarity needed to join a cluster
+SIMILARITY_THRESHOLD = 0.6
+# Shorter (normalised) texts such as "ok" or "call me" are not clustered
+MIN_TEXT_BYTES = 20
+# A cluster is a campaign when it is this large and has this many senders
+CAMPAIGN_MIN_MESSAGES = 3
+CAMPAIGN_MIN_SENDERS = 2
+# Rule hit given to campaign messages, e.g. for the timeline severity
+CAMPAIGN_RULE = "sms_campaign"
+
+# MinHash functions h(x) = ((a * x + b) mod 2**64) >> 32 (multiply-shift), one per value
+_MASK = (1 << 64) - 1
+_rng = random.Random(0x5EED)
+_PERMS = [(_rng.getrandbits(64) | 1, _rng.getrandbits(64)) for _ in range(NUM_PERM)]
+# Odd 64-bit multipliers folding the ROWS values of a band into one bucket key
+_BAND_MULTIPLIERS = [_rng.getrandbits(64) | 1 for _ in range(ROWS)]
+# Shingles per (NUM_PERM x shingles) block in the NumPy path
+_CHUNK_SHINGLES = 1 << 14
+
+_DIGITS = re.compile(r"\d+")
+
+
+def normalize(text):
+    """Lower case, digit runs as "0", single spaces. None/NaN give ""."""
+    if text is None or text != text:
+        return ""
+    return " ".join(_DIGITS.sub("0", str(text).lower()).split())
+
+
+# ---------------- SIGNATURES ----------------
+def _band_keys(signature):
+    return [
+        sum(v * m for v, m in zip(signature[i:i + ROWS], _BAND_MULTIPLIERS)) & _MASK
+        for i in range(0, NUM_PERM, ROWS)
+    ]
+
+
+def _signatures_python(blobs):
+    signatures, bands = array("I"), []
+    done = {}
+    for blob in blobs:
+        if blob not in done:
+            # A shingle's value is its bytes read as one big-endian integer
+            shingles = {int.from_bytes(blob[i:i + SHINGLE_SIZE], "big") for i in range(len(blob) - SHINGLE_SIZE + 1)}
+            signature = [min(((a * x + b) & _MASK) >> 32 for x in shingles) for a, b in _PERMS]
+            done[blob] = (signature, _band_keys(signature))
+        signature, keys = done[blob]
+        signatures.extend(signature)
+        bands.append(keys)
+    return signatures, bands
+
+
+def _numpy():
+    """NumPy, imported when the first batch is signed rather than with this module."""
+    try:
+        import numpy
+    except ImportError:  # optional: batch signatures without it are computed per message
+        return None
+    return numpy
+
+
+def _signatures_numpy(np, blobs):
+    lengths = np.fromiter(map(len, blobs), np.int64, len(blobs))
+    data = np.frombuffer(b"".join(blobs), np.uint8).astype(np.uint64)
+    # Shingle values at every byte offset, then only those inside one message
+    span = len(data) - SHINGLE_SIZE + 1
+    values = np.zeros(span, np.uint64)
+    for j in range(SHINGLE_SIZE):
+        values = (values << np.uint64(8)) | data[j:span + j]
+    counts = lengths - SHINGLE_SIZE + 1
+    ends = np.cumsum(counts)
+    firsts = ends - counts
+    values = values[np.arange(ends[-1]) + np.repeat(np.cumsum(lengths) - lengths - firsts, counts)]
+
+    a = np.array([p[0] for p in _PERMS], np.uint64)[:, None]
+    b = np.array([p[1] for p in _PERMS], np.uint64)[:, None]
+    shift = np.uint64(32)
+    signatures = np.empty((len(blobs), NUM_PERM), np.uint64)
+    lo = 0
+    while lo < len(blobs):
+        hi = max(lo + 1, int(np.searchsorted(ends, firsts[lo] + _CHUNK_SHINGLES, "right")))
+        # uint64 arithmetic wraps, which is the mod 2**64
+        block = (a * values[firsts[lo]:ends[hi - 1]] + b) >> shift
+        signatures[lo:hi] = np.minimum.reduceat(block, firsts[lo:hi] - firsts[lo], axis=1).T
+        lo = hi
+    keys = (signatures.reshape(len(blobs), BANDS, ROWS) * np.array(_BAND_MULTIPLIERS, np.uint64)).sum(axis=2)
+    return array("I", signatures.astype(np.uint32).tobytes()), keys.tolist()
+
+
+def signatures(blobs):
+    """
+    MinHash signatures of normalised, utf-8 encoded texts (each at least
+    SHINGLE_SIZE bytes): a flat array of len(blobs) * NUM_PERM values and
+    the BANDS bucket keys of each.
+    """
+    if not blobs:
+        return array("I"), []
+    np = _numpy()
+    if np is not None:
+        return _signatures_numpy(np, blobs)
+    return _signatures_python(blobs)
+
+
+# ---------------- CLUSTERS ----------------
+class Cluster:
+    """Running aggregates of one group of near-duplicate messages."""
+    __slots__ = ("root", "size", "senders", "first", "last", "sample")
+
+    def __init__(self, root, sample):
+        self.root = root
+        self.sample = sample
+        self.size = 0
+        self.senders = {}
+        self.first = self.last = None
+
+    def add(self, sender, epoch, n=1):
+        self.size += n
+        self.senders[sender] = self.senders.get(sender, 0) + n
+        self._extend(epoch)
+
+    def merge(self, other):
+        self.size += other.size
+        for sender, n in other.senders.items():
+            self.senders[sender] = self.senders.get(sender, 0) + n
+        self._extend(other.first)
+        self._extend(other.last)
+
+    def _extend(self, epoch):
+        if epoch is None:
+            return
+        if self.first is None or epoch < self.first:
+            self.first = epoch
+        if self.last is None or epoch > self.last:
+            self.last = epoch
+
+    @property
+    def span(self):
+        """Seconds between the first and last dated message, or None."""
+        return None if self.first is None else self.last - self.first
+
+    def as_dict(self, top=3):
+        """Report row: sizes, the busiest senders, time span and one sample text."""
+        busiest = sorted(self.senders.items(), key=lambda item: (-item[1], str(item[0])))
+        names = ", ".join(str(sender) for sender, _ in busiest[:top])
+        return {
+            "size": self.size, "senders": len(self.senders),
+            "top_senders": names + (", ..." if len(busiest) > top else ""),
+            "first": format_epoch(self.first), "last": format_epoch(self.last),
+            "span": _duration(self.span), "sample": self.sample,
+        }
+
+
+class MessageClusters:
+    """
+    Incremental near-duplicate clustering of message texts. Messages are
+    identified by a caller key, by default their position in the order
+    they were fed. Not thread-safe.
+    """
+    def __init__(self, threshold=SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self.seen = 0
+        self.clusters = {}
+        self._keys = []
+        self._senders = []
+        self._epochs = []
+        self._signatures = array("I")
+        self._parent = array("q")
+        self._buckets = [{} for _ in range(BANDS)]
+
+    def __len__(self):
+        return len(self._keys)
+
+    # ---------------- INGEST ----------------
+    def add_many(self, texts, senders, epochs=None, keys=None):
+        """
+        Clusters one batch given column-wise; epochs may hold None/NaN.
+        keys default to running stream positions. Returns how many texts
+        were long enough to be indexed.
+        """
+        texts, senders = list(texts), list(senders)
+        epochs = [None] * len(texts) if epochs is None else list(epochs)
+        keys = range(self.seen, self.seen + len(texts)) if keys is None else list(keys)
+        self.seen += len(texts)
+
+        picked, blobs = [], []
+        for i, text in enumerate(texts):
+            blob = normalize(text).encode("utf-8")
+            if len(blob) >= MIN_TEXT_BYTES:
+                picked.append(i)
+                blobs.append(blob)
+        flat, bands = signatures(blobs)
+        self._signatures.extend(flat)
+        for i, band_keys in zip(picked, bands):
+            epoch = epochs[i]
+            self._insert(texts[i], senders[i], None if epoch is None or epoch != epoch else epoch, keys[i], band_keys)
+        return len(picked)
+
+    def update(self, messages):
+        """Adds a batch of message records (typed records or dicts); returns how many were indexed."""
+        messages = list(messages)
+        return self.add_many(
+            [m["message"] for m in messages], [m["sender"] for m in messages], [epoch_of(m) for m in messages]
+        )
+
+    def _insert(self, text, sender, epoch, key, band_keys):
+        slot = len(self._keys)
+        self._keys.append(key)
+        self._senders.append(sender)
+        self._epochs.append(epoch)
+        self._parent.append(slot)
+        root = None
+        for table, band in zip(self._buckets, band_keys):
+            opener = table.get(band)
+            if opener is None:
+                table[band] = slot
+                continue
+            other = self._find(opener)
+            if other == root or self._similarity(slot, opener) < self.threshold:
+                continue
+            root = self._union(slot if root is None else root, other, text)
+
+    # ---------------- UNION-FIND ----------------
+    def _find(self, slot):
+        parent = self._parent
+        while parent[slot] != slot:
+            parent[slot] = parent[parent[slot]]
+            slot = parent[slot]
+        return slot
+
+    def _cluster(self, root, sample):
+        cluster = self.clusters.pop(root, None)
+        if cluster is None:
+            cluster = Cluster(root, sample)
+            cluster.add(self._senders[root], self._epochs[root])
+        return cluster
+
+    def _union(self, a, b, sample):
+        a, b = self._find(a), self._find(b)
+        big, small = self._cluster(a, sample), self._cluster(b, sample)
+        if small.size > big.size:
+            big, small = small, big
+        big.merge(small)
+        self._parent[small.root] = big.root
+        self.clusters[big.root] = big
+        return big.root
+
+    def _similarity(self, a, b):
+        sigs = self._signatures
+        same = sum(x == y for x, y in zip(sigs[a * NUM_PERM:(a + 1) * NUM_PERM], sigs[b * NUM_PERM:(b + 1) * NUM_PERM]))
+        return same / NUM_PERM
+
+    # ---------------- QUERIES ----------------
+    def campaigns(self, min_messages=CAMPAIGN_MIN_MESSAGES, min_senders=CAMPAIGN_MIN_SENDERS):
+        """Clusters with at least min_messages messages from min_senders senders, largest first."""
+        found = [
+            c for c in self.clusters.values()
+            if c.size >= min_messages and len(c.senders) >= min_senders
+        ]
+        found.sort(key=lambda c: (-c.size, c.first if c.first is not None else float("inf")))
+        return found
+
+    def campaign_keys(self, campaigns=None):
+        """Keys of every message in `campaigns` (default: campaigns())."""
+        roots = {c.root for c in (self.campaigns() if campaigns is None else campaigns)}
+        if not roots:
+            return set()
+        return {key for slot, key in enumerate(self._keys) if self._find(slot) in roots}
+
+
+def mark_campaigns(scanned, keys):
+    """
+    (record, rule hit) pairs of a message stream with CAMPAIGN_RULE as the
+    hit of messages at the stream positions in `keys` that no other rule hit.
+    """
+    return ((rec, hit or CAMPAIGN_RULE if i in keys else hit) for i, (rec, hit) in enumerate(scanned))
+
+
+def _duration(seconds):
+    """"2d 03h 15m" style span; "" for None."""
+    if seconds is None:
+        return ""
+    days, rest = divmod(int(seconds), 86400)
+    text = f"{rest // 3600:02d}h {rest % 3600 // 60:02d}m"
+    return f"{days}d {text}" if days else text
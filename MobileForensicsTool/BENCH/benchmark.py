@@ -0,0 +1,256 @@
+"""
+Per-stage pipeline benchmark.
+
+    python BENCH/benchmark.py --rows 100k --out base.json
+    python BENCH/benchmark.py --rows 100k --compare base.json
+
+Stages: read_csv per file, every analyze_* function per backend,
+build_timeline, generate_report and ADBManager.parse_to_df per dump.
+Each stage runs --repeat times (best wall and CPU time are kept) and
+then once more under tracemalloc for its peak allocation. Inputs for a
+stage are prepared outside its timing.
+
+The result is one JSON document (to --out, else stdout): run metadata and
+one object per stage. --compare exits with status 1 if any stage is
+slower than the baseline by more than --threshold.
+"""
+import os
+import sys
+
+# Ensure project root is on PYTHONPATH
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import argparse
+import gc
+import json
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from ANALYSIS.records import parse_epoch
+from BENCH.synthetic import generate, parse_rows
+from EXTRACTOR.extractor import ANALYSIS_BACKENDS, load_backend, read_csv
+from TIMELINE.timeline import build_timeline
+import REPORT.report_generator as report_gen
+
+SCHEMA_VERSION = 1
+# Slowdowns smaller than this (seconds) are noise, whatever the ratio
+MIN_DELTA_S = 0.005
+
+
+def _size(out):
+    try:
+        return len(out)
+    except TypeError:
+        return None
+
+
+def measure(fn, repeat=3, memory=True):
+    """Best wall/CPU seconds of `repeat` runs, rows out and peak bytes."""
+    wall = cpu = float("inf")
+    rows_out = None
+    for _ in range(repeat):
+        gc.collect()
+        w0, c0 = time.perf_counter(), time.process_time()
+        out = fn()
+        wall = min(wall, time.perf_counter() - w0)
+        cpu = min(cpu, time.process_time() - c0)
+        rows_out = _size(out)
+        del out
+    result = {"rows_out": rows_out, "wall_s": round(wall, 6), "cpu_s": round(cpu, 6)}
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn()
+            result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def _cold_read(filename, data_dir):
+    # Every run parses timestamps from scratch, as a fresh process would
+    parse_epoch.cache_clear()
+    return read_csv(filename, data_dir=data_dir)
+
+
+def _parse_to_df():
+    # The dashboard module needs streamlit and friends; skip the stage without them
+    try:
+        from DASHBOARD.app import ADBManager
+    except ImportError as e:
+        return None, str(e)
+    return ADBManager.parse_to_df, None
+
+
+def stages(data_dir, backends, report_path):
+    """Yields (stage name, rows in, callable or skip reason)."""
+    records = {}
+    for filename in ("calls.csv", "messages.csv", "apps.csv", "location.csv"):
+        yield f"read_csv:{filename}", None, lambda f=filename: _cold_read(f, data_dir)
+        records[filename] = read_csv(filename, data_dir=data_dir)
+    calls, messages = records["calls.csv"], records["messages.csv"]
+    apps, locations = records["apps.csv"], records["location.csv"]
+    timestamped = calls + messages + locations
+
+    for name in backends:
+        backend = load_backend(name)
+        for fn, rows in (
+            (backend.analyze_calls, calls),
+            (backend.analyze_messages, messages),
+            (backend.analyze_message_campaigns, messages),
+            (backend.analyze_apps, apps),
+            (backend.analyze_location_jumps, locations),
+            (backend.analyze_impossible_travel, locations),
+            (backend.analyze_timestamp_anomalies, timestamped),
+        ):
+            yield f"{name}.{fn.__name__}", len(rows), lambda fn=fn, rows=rows: fn(rows)
+
+    yield "build_timeline", len(timestamped), lambda: build_timeline(calls, messages, locations)
+
+    python = load_backend("python")
+    suspicious = (python.analyze_calls(calls), python.analyze_messages(messages), python.analyze_apps(apps))
+    timeline = build_timeline(calls, messages, locations)
+    yield "generate_report", len(timeline), lambda: report_gen.generate_report(
+        calls, messages, apps, locations, *suspicious, timeline, report_path=report_path
+    )
+
+    parse_to_df, reason = _parse_to_df()
+    for dump in ("calls.txt", "sms.txt"):
+        path = os.path.join(data_dir, dump)
+        if not os.path.exists(path):
+            continue
+        if parse_to_df is None:
+            yield f"parse_to_df:{dump}", None, reason
+            continue
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        yield f"parse_to_df:{dump}", text.count("\n"), lambda text=text: parse_to_df(text)
+
+
+def _commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+            capture_output=True, text=True
+        )
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run(data_dir, backends, repeat=3, memory=True, meta=None, log=None):
+    work_dir = tempfile.mkdtemp(prefix="echelon-bench-")
+    results = []
+    try:
+        report_path = os.path.join(work_dir, "forensic_report.txt")
+        for name, rows_in, fn in stages(data_dir, backends, report_path):
+            if isinstance(fn, str):
+                result = {"stage": name, "rows_in": rows_in, "skipped": fn}
+            else:
+                result = {"stage": name, "rows_in": rows_in, **measure(fn, repeat, memory)}
+            results.append(result)
+            if log:
+                log(result)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return {
+        "schema": SCHEMA_VERSION,
+        "meta": {
+            "started": datetime.now().isoformat(timespec="seconds"),
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backends": list(backends),
+            "repeat": repeat,
+            **(meta or {}),
+        },
+        "stages": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Stages whose wall time grew by more than `threshold` x the baseline."""
+    base = {s["stage"]: s for s in baseline["stages"] if "wall_s" in s}
+    regressions = []
+    for s in current["stages"]:
+        b = base.get(s["stage"])
+        if b is None or "wall_s" not in s:
+            continue
+        if s["wall_s"] > b["wall_s"] * threshold and s["wall_s"] - b["wall_s"] > MIN_DELTA_S:
+            regressions.append((s["stage"], b["wall_s"], s["wall_s"]))
+    return regressions
+
+
+def print_row(result, out=sys.stderr):
+    if "skipped" in result:
+        print(f"{result['stage']:<44} skipped: {result['skipped']}", file=out)
+        return
+    peak = result.get("peak_bytes")
+    rows_in, rows_out = ("" if n is None else n for n in (result["rows_in"], result["rows_out"]))
+    print(
+        f"{result['stage']:<44} {rows_in:>10} {rows_out:>10} "
+        f"{result['wall_s']:>10.4f} {result['cpu_s']:>10.4f} "
+        f"{'' if peak is None else f'{peak / 1048576:.1f}':>10}",
+        file=out
+    )
+
+
+# ---------------- ENTRY ----------------
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Benchmark each pipeline stage")
+    parser.add_argument("--data", help="existing evidence directory (default: generate one)")
+    parser.add_argument("--rows", default="10k", help="rows per stream when generating; e.g. 1000, 250k, 50M")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", action="append", choices=sorted(ANALYSIS_BACKENDS),
+                        help="analysis backend to time (repeatable; default: all)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--out", help="write the JSON result here instead of stdout")
+    parser.add_argument("--compare", help="baseline JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="allowed slowdown factor against --compare (default 1.25)")
+    args = parser.parse_args(argv)
+
+    backends = args.backend or list(ANALYSIS_BACKENDS)
+    print(f"{'STAGE':<44} {'ROWS IN':>10} {'ROWS OUT':>10} {'WALL s':>10} {'CPU s':>10} {'PEAK MiB':>10}",
+          file=sys.stderr)
+
+    generated = None
+    if args.data:
+        data_dir, meta = args.data, {"data": os.path.abspath(args.data)}
+    else:
+        rows = parse_rows(args.rows)
+        data_dir = generated = generate(tempfile.mkdtemp(prefix="echelon-synth-"), rows, args.seed)
+        meta = {"rows": rows, "seed": args.seed}
+    try:
+        result = run(data_dir, backends, args.repeat, not args.no_memory, meta, log=print_row)
+    finally:
+        if generated:
+            shutil.rmtree(generated, ignore_errors=True)
+
+    document = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(document + "\n")
+    else:
+        print(document)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(result, json.load(f), args.threshold)
+        for stage, before, after in regressions:
+            print(f"REGRESSION {stage}: {before:.4f}s -> {after:.4f}s", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""
+Deterministic synthetic evidence generator.
+
+    python BENCH/synthetic.py --rows 1M --out /tmp/synth
+    ECHELON_DATA_DIR=/tmp/synth python EXTRACTOR/extractor.py
+
+Writes calls.csv, messages.csv, apps.csv and location.csv in the DATA/
+layout and, unless --no-adb, calls.txt and sms.txt in the text format of
+`adb shell content query` (what DASHBOARD ADBManager parses). The same
+rows and seed always give byte-identical files. Rows are generated and
+written in chunks, so memory does not grow with --rows (1k .. 50M).
+
+The data exercises every built-in rule: night-time activity, messages
+with links, unknown senders, full-access apps, unparseable timestamps
+and occasional impossible location jumps.
+"""
+import argparse
+import calendar
+import csv
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+START = datetime(2026, 1, 1)
+SPAN_DAYS = 30
+CHUNK_ROWS = 10000
+WRITE_BUFFER = 1 << 20
+
+# Fraction of rows with an unparseable timestamp
+ANOMALY_RATE = 0.001
+LINK_RATE = 0.02
+UNKNOWN_SENDER_RATE = 0.05
+FULL_ACCESS_RATE = 0.05
+# Fraction of location fixes that teleport to another city
+JUMP_RATE = 0.0005
+
+CONTACTS = ["Mom", "Dad", "Boss", "Office", "Bank", "Ravi", "Priya", "Amit", "Neha", "Courier"]
+PHRASES = [
+    "Where are you?", "Call me back", "On my way", "Meeting at 5", "OTP is 4821",
+    "Reached home", "Send the files", "Lunch tomorrow?", "Payment received", "See you soon",
+]
+LINK_PHRASES = ["Click this link", "Verify here: http://bit.ly/x", "Your parcel link is ready"]
+APPS = ["WhatsApp", "Telegram", "Maps", "Camera", "Bank", "Notes", "Browser", "VPN", "Cleaner", "Launcher"]
+PERMISSIONS = ["Normal", "Location", "Contacts", "Camera", "Storage"]
+CITIES = [(21.1702, 72.8311), (23.0225, 72.5714), (19.0760, 72.8777), (28.6139, 77.2090)]
+
+CALL_TYPES = {1: "Incoming", 2: "Outgoing", 3: "Missed"}
+
+
+def parse_rows(text):
+    """'50000', '1k', '2.5M' -> int."""
+    text = str(text).strip().lower()
+    scale = {"k": 1000, "m": 1000000}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+class Clock:
+    """
+    Non-decreasing device-local timestamps at minute resolution, spread
+    over SPAN_DAYS for any number of rows.
+    """
+
+    def __init__(self, rng, rows):
+        self.rng = rng
+        self.mean_step = SPAN_DAYS * 1440 / max(rows, 1)
+        # Fractional, so steps shorter than a minute still add up
+        self.elapsed = 0.0
+        self._cached = (None, None, None)
+
+    def tick(self):
+        self.elapsed += self.rng.expovariate(1 / self.mean_step)
+        minute = int(self.elapsed)
+        if self._cached[0] != minute:
+            dt = START + timedelta(minutes=minute)
+            self._cached = (
+                minute,
+                dt.strftime("%Y-%m-%d %H:%M"),
+                calendar.timegm(dt.timetuple()) * 1000,
+            )
+        if self.rng.random() < ANOMALY_RATE:
+            return "N/A", None
+        return self._cached[1], self._cached[2]
+
+
+def _open(out_dir, name):
+    return open(os.path.join(out_dir, name), "w", newline="", encoding="utf-8", buffering=WRITE_BUFFER)
+
+
+def _chunks(rows, make_row):
+    chunk = []
+    for i in range(rows):
+        chunk.append(make_row(i))
+        if len(chunk) >= CHUNK_ROWS:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _dump_row(i, fields):
+    # adb prints NULL for missing columns
+    body = ", ".join(f"{k}={'NULL' if v is None else v}" for k, v in fields)
+    return f"Row: {i} {body}\n"
+
+
+def generate_calls(out_dir, rows, rng, numbers, adb=True):
+    clock = Clock(rng, rows)
+
+    def make_row(i):
+        time_str, ms = clock.tick()
+        return rng.choice(numbers), time_str, int(rng.expovariate(1 / 120)), ms, rng.randint(1, 3)
+
+    dump = _open(out_dir, "calls.txt") if adb else None
+    with _open(out_dir, "calls.csv") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(["number", "time", "duration"])
+        n = 0
+        for chunk in _chunks(rows, make_row):
+            writer.writerows(row[:3] for row in chunk)
+            if dump:
+                dump.writelines(
+                    _dump_row(n + j, [("_id", n + j + 1), ("number", number), ("date", ms),
+                                      ("duration", duration), ("type", call_type)])
+                    for j, (number, _, duration, ms, call_type) in enumerate(chunk)
+                )
+            n += len(chunk)
+    if dump:
+        dump.close()
+
+
+def generate_messages(out_dir, rows, rng, numbers, adb=True):
+    clock = Clock(rng, rows)
+    senders = CONTACTS + numbers[:50]
+
+    def make_row(i):
+        time_str, ms = clock.tick()
+        sender = "Unknown" if rng.random() < UNKNOWN_SENDER_RATE else rng.choice(senders)
+        message = rng.choice(LINK_PHRASES if rng.random() < LINK_RATE else PHRASES)
+        return sender, message, time_str, ms
+
+    dump = _open(out_dir, "sms.txt") if adb else None
+    with _open(out_dir, "messages.csv") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(["sender", "message", "time"])
+        n = 0
+        for chunk in _chunks(rows, make_row):
+            writer.writerows(row[:3] for row in chunk)
+            if dump:
+                dump.writelines(
+                    _dump_row(n + j, [("_id", n + j + 1), ("address", sender), ("date", ms),
+                                      ("type", 1), ("body", message)])
+                    for j, (sender, message, _, ms) in enumerate(chunk)
+                )
+            n += len(chunk)
+    if dump:
+        dump.close()
+
+
+def generate_apps(out_dir, rows, rng):
+    def make_row(i):
+        name = APPS[i % len(APPS)] + ("" if i < len(APPS) else str(i // len(APPS)))
+        permission = "Full Access" if rng.random() < FULL_ACCESS_RATE else rng.choice(PERMISSIONS)
+        return name, permission
+
+    with _open(out_dir, "apps.csv") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(["app_name", "permission"])
+        for chunk in _chunks(rows, make_row):
+            writer.writerows(chunk)
+
+
+def generate_locations(out_dir, rows, rng):
+    clock = Clock(rng, rows)
+    position = list(CITIES[0])
+
+    def make_row(i):
+        if rng.random() < JUMP_RATE:
+            position[:] = rng.choice(CITIES)
+        else:
+            position[0] += rng.gauss(0, 0.0005)
+            position[1] += rng.gauss(0, 0.0005)
+        time_str, _ = clock.tick()
+        return f"{position[0]:.6f}", f"{position[1]:.6f}", time_str
+
+    with _open(out_dir, "location.csv") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(["latitude", "longitude", "time"])
+        for chunk in _chunks(rows, make_row):
+            writer.writerows(chunk)
+
+
+def generate(out_dir, rows, seed=0, adb=True):
+    """
+    Writes a full synthetic case of `rows` calls, messages and location
+    fixes (and rows // 1000 apps, at least 10) into out_dir.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(seed)
+    # Shared number pool so the same parties recur across calls and messages
+    numbers = [f"9{rng.randrange(10 ** 9):09d}" for _ in range(min(max(50, rows // 20), 200000))]
+    generate_calls(out_dir, rows, random.Random(f"{seed}:calls"), numbers, adb)
+    generate_messages(out_dir, rows, random.Random(f"{seed}:messages"), numbers, adb)
+    generate_apps(out_dir, max(10, rows // 1000), random.Random(f"{seed}:apps"))
+    generate_locations(out_dir, rows, random.Random(f"{seed}:locations"))
+    return out_dir
+
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Generate a synthetic evidence set")
+    parser.add_argument("--rows", default="10k", help="calls, messages and fixes each; e.g. 1000, 250k, 50M")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--no-adb", action="store_true", help="skip the content-query text dumps")
+    args = parser.parse_args(argv)
+
+    generate(args.out, parse_rows(args.rows), args.seed, adb=not args.no_adb)
+    print(f"Synthetic case written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
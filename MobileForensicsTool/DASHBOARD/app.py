@@ -1,94 +1,785 @@
 import streamlit as st
 import subprocess
-import pandas as pd
 import datetime
-import hashlib
+import math
 import re
-import plotly.express as px
-from fpdf import FPDF
+import importlib.util
 import os
+import sys
+import time
+import queue
+import tempfile
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Ensure project root is on PYTHONPATH
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+def lazy_import(name):
+    """
+    Module whose body only runs on first attribute access. plotly.express,
+    pandas, NumPy and the columnar backend take longer to import than the
+    rest of the app and are only needed once there is data to show, not by
+    headless users of ADBManager (BENCH/benchmark.py).
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+px = lazy_import("plotly.express")
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+columnar_analysis = lazy_import("ANALYSIS.columnar")
+
+from ANALYSIS import geo
+from ANALYSIS.contacts import OWNER, ContactGraph
+from ANALYSIS.rules import severity
+from ANALYSIS.records import App, Call, Location, Message
+from ANALYSIS.similarity import CAMPAIGN_RULE, MessageClusters
+from EXTRACTOR import media as media_acquisition
+from METRICS.stages import StageRecorder
+from REPORT.pdf_report import write_pdf_report
+from STORE import columnar_file
+from STORE.case_store import CaseStore, case_path
+from STORE.search_index import SearchIndex
+from TIMELINE.buckets import GRANULARITIES, TimeBucketIndex
+from TIMELINE.timeline import iter_events, merge_timeline
 
 # ==========================================
 # ⚙️ CORE CONFIGURATION
 # ==========================================
-ADB_PATH = "/Users/darshilprajapati/Downloads/platform-tools/adb"
+# ECHELON_ADB swaps in another binary, e.g. DASHBOARD/stub_adb.py for testing without a device
+ADB_PATH = os.environ.get("ECHELON_ADB", "/Users/darshilprajapati/Downloads/platform-tools/adb")
+ACQUISITION_WORKERS = 4
+# Target device (adb -s); None lets adb pick the only attached device
+DEVICE_SERIAL = os.environ.get("ECHELON_SERIAL")
+# Concurrent adb streams allowed against one handset
+PER_DEVICE_STREAMS = 4
+# Handsets imaged at the same time by the multi-device pool
+MAX_PARALLEL_DEVICES = 4
+CASE_DB = os.environ.get("ECHELON_CASE_DB", case_path("dashboard"))
+# Rows per page in table views; only the visible page is sent to the browser
+PAGE_SIZE = int(os.environ.get("ECHELON_PAGE_SIZE", "500"))
+# Dashboard stream -> (report stream, {record field: frame column}) for the PDF report.
+# Record fields left out are not acquired and stay blank, so rules on them never fire:
+# `pm list packages` gives no permissions, hence no full_access_app findings.
+REPORT_STREAMS = {
+    'calls': ("calls", {'number': 'number', 'duration': 'duration'}),
+    'sms': ("messages", {'sender': 'address', 'message': 'body'}),
+    'apps': ("apps", {'app_name': 'Package'}),
+    'loc': ("locations", {'latitude': 'lat', 'longitude': 'lon'}),
+}
+# Dashboard stream -> (contact graph stream, counterparty column)
+CONTACT_STREAMS = {'calls': ("calls", 'number'), 'sms': ("messages", 'address')}
+# Device directory listed by MEDIA and pulled by PULL MEDIA
+MEDIA_ROOT = os.environ.get("ECHELON_MEDIA_ROOT", media_acquisition.DEFAULT_ROOT)
+# Every stage run is also appended here as a JSON line when set
+METRICS_JSONL = os.environ.get("ECHELON_METRICS_JSONL")
 
 # ==========================================
 # 🧠 MODULAR ENGINE CLASSES
 # ==========================================
 
 class ForensicLogger:
+    # Worker threads have no Streamlit session; their lines wait in the
+    # queue of the session that started them until its script thread
+    # flushes them into that session's activity log.
+    _worker = threading.local()
+
     @staticmethod
     def log(msg):
-        if 'activity_logs' not in st.session_state:
-            st.session_state.activity_logs = [f"[{datetime.datetime.now().strftime('%H:%M:%S')}] Core Initialized..."]
         timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+        pending = getattr(ForensicLogger._worker, "queue", None)
+        if pending is not None:
+            pending.put(f"[{timestamp}] {msg}")
+            return
+        ForensicLogger.flush()
         st.session_state.activity_logs.append(f"[{timestamp}] {msg}")
 
+    @staticmethod
+    def queue():
+        """This session's queue for worker-thread log lines."""
+        if 'log_queue' not in st.session_state:
+            st.session_state.log_queue = queue.SimpleQueue()
+        return st.session_state.log_queue
+
+    @staticmethod
+    def flush():
+        if 'activity_logs' not in st.session_state:
+            st.session_state.activity_logs = [f"[{datetime.datetime.now().strftime('%H:%M:%S')}] Core Initialized..."]
+        pending = ForensicLogger.queue()
+        while True:
+            try:
+                st.session_state.activity_logs.append(pending.get_nowait())
+            except queue.Empty:
+                break
+
+    @staticmethod
+    @contextmanager
+    def queued(log_queue):
+        """Redirects this thread's log lines to log_queue (see queue()) while open."""
+        previous = getattr(ForensicLogger._worker, "queue", None)
+        ForensicLogger._worker.queue = log_queue
+        try:
+            yield
+        finally:
+            ForensicLogger._worker.queue = previous
+
+    @staticmethod
+    def worker(log_queue, fn, *args):
+        """Runs fn in a pool thread with logging redirected to log_queue."""
+        with ForensicLogger.queued(log_queue):
+            return fn(*args)
+
+class StageMetrics:
+    """
+    This session's METRICS.stages recorder. Each finished stage is also
+    written to the activity log; the sidebar shows the per-stage table.
+    """
+    @staticmethod
+    def recorder():
+        if 'stage_metrics' not in st.session_state:
+            st.session_state.stage_metrics = StageRecorder(jsonl=METRICS_JSONL, on_stage=StageMetrics.log)
+        return st.session_state.stage_metrics
+
+    @staticmethod
+    def log(stage):
+        rows = "" if stage.rows_out is None else f" {stage.rows_out} rows"
+        ForensicLogger.log(f"STAGE: {stage.name}{rows} in {stage.wall_s:.2f}s (cpu {stage.cpu_s:.2f}s)")
+
+    @staticmethod
+    def run(name, fn, *args):
+        with StageMetrics.recorder().stage(name) as s:
+            out = fn(*args)
+            s.rows_out = len(out)
+        return out
+
 class ADBManager:
+    """
+    adb bound to one device serial (`adb -s <serial>`); serial None targets
+    the only attached device. Use ADBManager.for_serial() so every caller
+    shares the device's throttle, which caps concurrent adb streams per
+    handset at PER_DEVICE_STREAMS.
+    """
+    # One compiled pattern for every `content query` field (key=value up to the next comma)
+    ROW_FIELD = re.compile(r'(\w+)=([^,]+)')
+    CHUNK_ROWS = 5000
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, serial=None, adb_path=None):
+        self.serial = serial
+        self.adb_path = adb_path or ADB_PATH
+        self.throttle = threading.BoundedSemaphore(PER_DEVICE_STREAMS)
+
     @staticmethod
-    def execute(cmd_list):
-        ForensicLogger.log(f"ADB_EXEC: {' '.join(cmd_list)}")
+    def for_serial(serial=None):
+        with ADBManager._instances_lock:
+            key = (ADB_PATH, serial)
+            if key not in ADBManager._instances:
+                ADBManager._instances[key] = ADBManager(serial)
+            return ADBManager._instances[key]
+
+    @staticmethod
+    def devices():
+        """Serials of attached devices in the `device` state (from `adb devices`)."""
+        out = ADBManager.for_serial(None).execute(["devices"])
+        serials = []
+        for line in out.splitlines()[1:]:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1] == "device":
+                serials.append(parts[0])
+        return serials
+
+    def command(self, cmd_list):
+        return [self.adb_path] + (["-s", self.serial] if self.serial else []) + cmd_list
+
+    def _tag(self):
+        return f"[{self.serial}] " if self.serial else ""
+
+    def execute(self, cmd_list):
+        ForensicLogger.log(f"ADB_EXEC: {self._tag()}{' '.join(cmd_list)}")
         try:
-            full_cmd = [ADB_PATH] + cmd_list
-            res = subprocess.run(full_cmd, capture_output=True, text=True, errors="ignore")
+            with self.throttle:
+                res = subprocess.run(self.command(cmd_list), capture_output=True, text=True, errors="ignore")
             return res.stdout
         except Exception as e:
             ForensicLogger.log(f"CRITICAL_ERROR: {str(e)}")
             return ""
 
+    def iter_lines(self, cmd_list):
+        """Yields stdout lines as the device produces them, without buffering the dump."""
+        ForensicLogger.log(f"ADB_STREAM: {self._tag()}{' '.join(cmd_list)}")
+        with self.throttle:
+            try:
+                proc = subprocess.Popen(
+                    self.command(cmd_list), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                    text=True, errors="ignore"
+                )
+            except Exception as e:
+                ForensicLogger.log(f"CRITICAL_ERROR: {str(e)}")
+                return
+            with proc:
+                yield from proc.stdout
+
+    @contextmanager
+    def open_stream(self, cmd_list):
+        """Binary stdout of one adb command (e.g. exec-out), holding a throttle slot while open."""
+        ForensicLogger.log(f"ADB_STREAM: {self._tag()}{' '.join(cmd_list)}")
+        with self.throttle:
+            proc = subprocess.Popen(self.command(cmd_list), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            try:
+                yield proc.stdout
+            finally:
+                proc.stdout.close()
+                proc.kill()
+                proc.wait()
+
+    @staticmethod
+    def iter_frames(lines, chunk_rows=CHUNK_ROWS):
+        """
+        Parses `Row: ...` lines straight into per-column buffers and yields
+        a DataFrame every chunk_rows rows (and one for the remainder).
+        """
+        findall = ADBManager.ROW_FIELD.findall
+        columns, n = {}, 0
+        for line in lines:
+            if "Row:" not in line: continue
+            parts = findall(line)
+            if not parts: continue
+            for k, v in parts:
+                k = k.strip()
+                col = columns.get(k)
+                if col is None:
+                    col = columns[k] = [float("nan")] * n
+                if len(col) > n:
+                    col[n] = v.strip()  # repeated key on one row: last value wins
+                else:
+                    col.append(v.strip())
+            n += 1
+            for col in columns.values():
+                if len(col) < n: col.append(float("nan"))
+            if n >= chunk_rows:
+                yield pd.DataFrame(columns)
+                columns, n = {k: [] for k in columns}, 0
+        if n:
+            yield pd.DataFrame(columns)
+
+    def query_df(self, cmd_list, on_chunk=None, chunk_rows=CHUNK_ROWS):
+        """Streams a content query into one DataFrame; on_chunk(df) sees each partial frame."""
+        frames = []
+        for chunk in ADBManager.iter_frames(self.iter_lines(cmd_list), chunk_rows):
+            frames.append(chunk)
+            if on_chunk: on_chunk(chunk)
+        if not frames: return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
     @staticmethod
     def parse_to_df(output):
-        rows = []
         if not output: return pd.DataFrame()
-        for line in output.splitlines():
-            if "Row:" in line:
-                entry = {}
-                parts = re.findall(r'(\w+)=([^,]+)', line)
-                for k, v in parts: entry[k.strip()] = v.strip()
-                if entry: rows.append(entry)
+        frames = list(ADBManager.iter_frames(output.splitlines(), chunk_rows=float("inf")))
+        return frames[0] if frames else pd.DataFrame()
+
+class CaseRepository:
+    """
+    Keeps acquired frames in the persistent case store across restarts.
+    The default device uses CASE_DB; every other serial gets its own case.
+    """
+    @staticmethod
+    @st.cache_resource
+    def store(db_path=CASE_DB):
+        return CaseStore(db_path)
+
+    @staticmethod
+    def db_for(serial):
+        if serial is None or serial == DEVICE_SERIAL: return CASE_DB
+        return case_path("device_" + re.sub(r'[^\w.-]', '_', serial))
+
+    @staticmethod
+    def frames_dir(serial=DEVICE_SERIAL):
+        # Typed columnar snapshot of every frame, next to the case db
+        return os.path.splitext(CaseRepository.db_for(serial))[0] + "_frames"
+
+    @staticmethod
+    def media_dir(serial=DEVICE_SERIAL):
+        return media_acquisition.media_dir(CaseRepository.db_for(serial))
+
+    @staticmethod
+    def load(serial=DEVICE_SERIAL):
+        db_path = CaseRepository.db_for(serial)
+        frames = CaseRepository.store(db_path).load_frames()
+        for df in frames.values():
+            # The store keeps text; restore native datetimes for sorting
+            if 'Timestamp' in df.columns:
+                df['Timestamp'] = pd.to_datetime(df['Timestamp'], errors='coerce')
+            elif 'DateTime' in df.columns:
+                df['Timestamp'] = pd.to_datetime(df['DateTime'], errors='coerce')
+            if 'Hour' in df.columns:
+                df['Hour'] = pd.to_numeric(df['Hour'], errors='coerce').astype('Int64')
+        # Snapshots keep dtypes and are memory-mapped; prefer them over the text tables.
+        # A snapshot holds only the latest acquisition while the table keeps every row
+        # ever acquired, so it is used only while both have the same rows.
+        snapshots = CaseRepository.frames_dir(serial)
+        for key in frames:
+            path = columnar_file.find(os.path.join(snapshots, key))
+            if path:
+                with columnar_file.open_columns(path) as packed:
+                    if len(packed) == len(frames[key]):
+                        frames[key] = packed.to_pandas()
+        if frames:
+            ForensicLogger.log(f"CASE_RESTORED: {', '.join(frames)} from {db_path}")
+        return frames
+
+    @staticmethod
+    def save(key, df, serial=DEVICE_SERIAL):
+        if df.empty: return
+        added = CaseRepository.store(CaseRepository.db_for(serial)).save_frame(key, df)
+        snapshots = CaseRepository.frames_dir(serial)
+        os.makedirs(snapshots, exist_ok=True)
+        columnar_file.write_frame(os.path.join(snapshots, key + columnar_file.EXTENSION), df)
+        ForensicLogger.log(f"CASE_STORE: {serial or 'default'}/{key} +{added} new rows")
+
+class ViewCache:
+    """
+    Memoizes derived views (figures, timeline, search index) across
+    Streamlit reruns. Each entry is keyed on the device serial and view
+    name and remembers the generation of every source stream it was built
+    from; ViewCache.bump(source) after an acquisition evicts exactly the
+    entries that read that source. Unlike st.cache_data, nothing has to
+    hash the DataFrames on every rerun.
+    """
+    @staticmethod
+    def _state():
+        if 'view_cache' not in st.session_state:
+            st.session_state.view_cache = {}
+            st.session_state.source_generation = {}
+        return st.session_state.view_cache, st.session_state.source_generation
+
+    @staticmethod
+    def bump(source):
+        cache, generations = ViewCache._state()
+        generations[source] = generations.get(source, 0) + 1
+        for key in [k for k, (deps, _) in cache.items() if source in dict(deps)]:
+            del cache[key]
+
+    @staticmethod
+    def get(name, sources, build):
+        cache, generations = ViewCache._state()
+        key = (st.session_state.get('active_serial', DEVICE_SERIAL), name)
+        deps = tuple((s, generations.get(s, 0)) for s in sources)
+        hit = cache.get(key)
+        if hit is not None and hit[0] == deps:
+            return hit[1]
+        label = name[0] if isinstance(name, tuple) else name
+        with StageMetrics.recorder().stage(f"view:{label}") as s:
+            value = build()
+            s.rows_out = len(value) if isinstance(value, pd.DataFrame) else None
+        cache[key] = (deps, value)
+        return value
+
+class ContactNetwork:
+    """
+    One incremental ContactGraph per session over the calls and SMS of
+    every device case, each device being an owner node. A frame is fed
+    once when it first appears; rows are keyed on their content-provider
+    `_id`, so a re-acquired log only adds its new rows.
+    """
+    @staticmethod
+    def graph():
+        state = st.session_state
+        if 'contact_graph' not in state:
+            state.contact_graph, state.contact_fed = ContactGraph(), {}
+        graph, fed = state.contact_graph, state.contact_fed
+        for serial, frames in state.device_cases.items():
+            for key, (stream, column) in CONTACT_STREAMS.items():
+                df = frames.get(key)
+                if df is None or df.empty or column not in df.columns or fed.get((serial, key)) is df: continue
+                with StageMetrics.recorder().stage("view:contacts", len(df)) as s:
+                    s.rows_out = ContactNetwork.feed(graph, stream, df, column, serial or OWNER)
+                fed[(serial, key)] = df
+        return graph
+
+    @staticmethod
+    def feed(graph, stream, df, column, owner):
+        if 'Timestamp' in df.columns:
+            epochs = (df['Timestamp'] - pd.Timestamp(0)).dt.total_seconds()
+        else:
+            epochs = pd.Series(float('nan'), index=df.index)
+        if stream == "calls" and 'duration' in df.columns:
+            durations = pd.to_numeric(df['duration'], errors='coerce').fillna(0).astype(int)
+        else:
+            durations = pd.Series(0, index=df.index)
+        ids = df['_id'].astype(str) if '_id' in df.columns else pd.Series(None, index=df.index, dtype=object)
+        added = 0
+        for party, epoch, duration, row_id in zip(df[column], epochs, durations, ids):
+            epoch = None if pd.isna(epoch) else int(epoch)
+            key = row_id if row_id is not None else (party, epoch, duration)
+            added += graph.add(party, epoch, stream, duration, owner, key)
+        return added
+
+    @staticmethod
+    def when(epoch):
+        return "" if epoch is None else datetime.datetime.fromtimestamp(epoch, datetime.timezone.utc).strftime('%Y-%m-%d %H:%M')
+
+    @staticmethod
+    def table(contacts):
+        rows = [c.as_dict() for c in contacts]
+        for row in rows:
+            row['first'], row['last'] = ContactNetwork.when(row['first']), ContactNetwork.when(row['last'])
         return pd.DataFrame(rows)
 
+    @staticmethod
+    def figure(graph, contacts):
+        """Owners in the middle, the given contacts on a ring, one line per owner-contact edge."""
+        owners = sorted(graph.edges, key=str)
+        pos = {}
+        for i, owner in enumerate(owners):
+            a = 2 * math.pi * i / len(owners)
+            r = 0.0 if len(owners) == 1 else 0.35
+            pos[('owner', owner)] = (r * math.cos(a), r * math.sin(a))
+        # Group each contact next to its busiest owner
+        ring = sorted(contacts, key=lambda c: (str(max(graph.owners_of[c.party].items(), key=lambda o: o[1])[0]), -c.interactions))
+        for i, c in enumerate(ring):
+            a = 2 * math.pi * i / max(len(ring), 1)
+            pos[('party', c.party)] = (math.cos(a), math.sin(a))
+        edges = [
+            {'x': x, 'y': y, 'edge': f"{owner}→{c.party}", 'Device': str(owner), 'weight': weight}
+            for c in ring for owner, weight in graph.owners_of[c.party].items()
+            for x, y in (pos[('owner', owner)], pos[('party', c.party)])
+        ]
+        fig = px.line(pd.DataFrame(edges), x='x', y='y', line_group='edge', color='Device', hover_data={'weight': True, 'x': False, 'y': False})
+        nodes = pd.DataFrame([
+            {'x': pos[('party', c.party)][0], 'y': pos[('party', c.party)][1], 'Contact': c.party,
+             'Interactions': c.interactions, 'Night Ratio': round(c.night_ratio, 2)}
+            for c in ring
+        ])
+        node_fig = px.scatter(nodes, x='x', y='y', size='Interactions', color='Night Ratio', hover_name='Contact',
+                              text='Contact', color_continuous_scale='Reds', range_color=(0, 1))
+        for trace in node_fig.data:
+            trace.textposition = 'top center'
+            fig.add_trace(trace)
+        fig.update_layout(coloraxis=node_fig.layout.coloraxis)
+        owner_nodes = pd.DataFrame([{'x': pos[('owner', o)][0], 'y': pos[('owner', o)][1], 'Device': str(o)} for o in owners])
+        for trace in px.scatter(owner_nodes, x='x', y='y', text='Device', color_discrete_sequence=['#ffffff']).data:
+            trace.marker.size, trace.textposition = 18, 'bottom center'
+            fig.add_trace(trace)
+        fig.update_xaxes(visible=False)
+        fig.update_yaxes(visible=False, scaleanchor='x')
+        fig.update_layout(title="Contact Network")
+        return styled(fig)
+
+class SmsCampaigns:
+    """
+    Near-duplicate SMS clusters (ANALYSIS.similarity) of the active case:
+    the same text sent from several senders. Rebuilt through ViewCache
+    only when the SMS frame is re-acquired; message keys are row
+    positions in that frame.
+    """
+    @staticmethod
+    def get():
+        """(campaign rows, positions of their messages) for the active case's SMS."""
+        def build():
+            df = st.session_state.forensic_data.get('sms')
+            _, columns = REPORT_STREAMS['sms']
+            if df is None or df.empty or columns['message'] not in df.columns: return [], set()
+            epochs = (df['Timestamp'] - pd.Timestamp(0)).dt.total_seconds() if 'Timestamp' in df.columns else None
+            senders = df[columns['sender']] if columns['sender'] in df.columns else pd.Series("", index=df.index)
+            with StageMetrics.recorder().stage("view:campaigns", len(df)) as s:
+                campaigns, members = SmsCampaigns.cluster(df[columns['message']], senders, epochs)
+                s.rows_out = len(members)
+            return campaigns, members
+        return ViewCache.get("sms_campaigns", ["sms"], build)
+
+    @staticmethod
+    def cluster(texts, senders, epochs=None):
+        clusters = MessageClusters()
+        clusters.add_many(texts, senders, epochs)
+        campaigns = clusters.campaigns()
+        return [c.as_dict() for c in campaigns], clusters.campaign_keys(campaigns)
+
+    @staticmethod
+    def table(campaigns):
+        return pd.DataFrame([
+            {"Messages": c['size'], "Senders": c['senders'], "Top Senders": c['top_senders'],
+             "First Seen": c['first'], "Last Seen": c['last'], "Span": c['span'], "Sample": c['sample']}
+            for c in campaigns
+        ])
+
+class TimeIndex:
+    """
+    Time-bucket index (TIMELINE.buckets) of the active case's timeline
+    sources, kept across reruns. A source is re-indexed only when its
+    frame is replaced by an acquisition; the TIMELINE tab and charts then
+    read bucket counts and event pages from it instead of the raw rows.
+    Rows are frame positions and severities come from the rule engine;
+    SMS that belong to a campaign (SmsCampaigns) are HIGH as well.
+    """
+    SOURCES = ('calls', 'sms')
+    TIMELINE_COLUMNS = ['DateTime', 'Activity', 'Source']
+
+    @staticmethod
+    def get():
+        state = st.session_state
+        if 'time_index' not in state:
+            state.time_index = {}
+        serial = state.get('active_serial', DEVICE_SERIAL)
+        index, fed = state.time_index.setdefault(serial, (TimeBucketIndex(), {}))
+        for key in TimeIndex.SOURCES:
+            df = state.forensic_data.get(key)
+            if df is None or fed.get(key) is df: continue
+            index.drop(key)
+            if not df.empty and 'Timestamp' in df.columns:
+                with StageMetrics.recorder().stage("view:time_index", len(df)) as s:
+                    stream, columns = REPORT_STREAMS[key]
+                    epochs = (df['Timestamp'] - pd.Timestamp(0)).dt.total_seconds().to_numpy()
+                    # The rules only need the record fields and the epoch
+                    fields = pd.DataFrame({f: df[c] if c in df.columns else "" for f, c in columns.items()})
+                    fields['epoch'] = epochs
+                    hits = columnar_analysis.hits(stream, fields)
+                    if key == 'sms':
+                        for i in SmsCampaigns.get()[1]:
+                            hits[i] = hits[i] or CAMPAIGN_RULE
+                    # Hand the index time-ordered rows so it never sorts in Python
+                    order = np.argsort(epochs, kind='stable')
+                    s.rows_out = index.add(
+                        key, epochs[order].tolist(), order.tolist(), [severity(h) for h in hits[order]]
+                    )
+            fed[key] = df
+        return index
+
+    @staticmethod
+    def epoch(day, at):
+        # Same naive device-local scale as the Timestamp columns
+        return (datetime.datetime.combine(day, at) - datetime.datetime(1970, 1, 1)).total_seconds()
+
+    @staticmethod
+    def granularity(start, end):
+        seconds = end - start
+        if seconds <= 6 * 3600: return "minute"
+        if seconds <= 31 * 86400: return "hour"
+        return "day"
+
+    @staticmethod
+    def histogram(index, granularity, start, end):
+        rows = index.histogram(granularity, start, end)
+        df = pd.DataFrame(rows, columns=['bucket', 'Source', 'Severity', 'Events'])
+        df['Time'] = pd.to_datetime(df.pop('bucket'), unit='s')
+        return df
+
+    @staticmethod
+    def page(data, events):
+        """Timeline rows for (epoch, source, row) events, in the given order."""
+        parts = []
+        for key in TimeIndex.SOURCES:
+            picked = [(i, row) for i, (_, source, row) in enumerate(events) if source == key]
+            if not picked: continue
+            order, rows = zip(*picked)
+            part = data[key].iloc[list(rows)][TimeIndex.TIMELINE_COLUMNS]
+            part.index = list(order)
+            parts.append(part)
+        if not parts: return pd.DataFrame(columns=TimeIndex.TIMELINE_COLUMNS)
+        return pd.concat(parts).sort_index()
+
+class DeviceProbe:
+    """
+    Remembers each handset's getprop model across reruns, keyed on the
+    serial and its acquisition generation like ViewCache: the sidebar
+    only re-runs getprop after DeviceProbe.bump(serial), which an
+    acquisition from that device (or RE-PROBE) calls.
+    """
+    @staticmethod
+    def _state():
+        if 'probe_cache' not in st.session_state:
+            st.session_state.probe_cache = {}
+            st.session_state.probe_generation = {}
+        return st.session_state.probe_cache, st.session_state.probe_generation
+
+    @staticmethod
+    def bump(serial):
+        cache, generations = DeviceProbe._state()
+        generations[serial] = generations.get(serial, 0) + 1
+        for key in [k for k in cache if k[0] == serial]:
+            del cache[key]
+
+    @staticmethod
+    def model(serial):
+        cache, generations = DeviceProbe._state()
+        key = (serial, generations.get(serial, 0))
+        if key not in cache:
+            cache[key] = ADBManager.for_serial(serial).execute(["shell", "getprop", "ro.product.model"]).strip()
+        return cache[key]
+
 class ArtifactExtractor:
+    # Location[gps 23.022500,72.571400 hAcc=10 et=+3d4h5m6s7ms ...] in dumpsys location
+    LOCATION_FIX = re.compile(r'Location\[(\w+) (-?\d+(?:\.\d+)?),(-?\d+(?:\.\d+)?)[^\]]*?\bet=\+?([\dmshd]+)')
+    ELAPSED_PART = re.compile(r'(\d+)(ms|d|h|m|s)')
+    ELAPSED_UNITS = {"d": 86400, "h": 3600, "m": 60, "s": 1, "ms": 0.001}
+
+    @staticmethod
+    def local_tz():
+        # Deferred like pandas: only needed once there are acquired rows
+        from dateutil import tz
+        return tz.tzlocal()
+
     @staticmethod
-    def get_calls():
-        out = ADBManager.execute(["shell", "content", "query", "--uri", "content://call_log/calls"])
-        df = ADBManager.parse_to_df(out)
+    def elapsed_seconds(text):
+        # Android's duration format, e.g. 3d4h5m6s7ms
+        return sum(int(n) * ArtifactExtractor.ELAPSED_UNITS[u] for n, u in ArtifactExtractor.ELAPSED_PART.findall(text))
+
+    @staticmethod
+    def add_time_columns(df, hour=False):
+        """
+        Converts the epoch-ms `date` column in one vectorised pass into
+        Timestamp (datetime64, device-local like fromtimestamp), DateTime
+        (display string) and optionally Hour. Missing or invalid dates
+        become NaT/NA instead of raising.
+        """
+        ms = pd.to_numeric(df['date'], errors='coerce')
+        ts = pd.to_datetime(ms, unit='ms', utc=True, errors='coerce').dt.tz_convert(ArtifactExtractor.local_tz()).dt.tz_localize(None)
+        df['Timestamp'] = ts
+        df['DateTime'] = ts.dt.strftime('%Y-%m-%d %H:%M:%S')
+        if hour: df['Hour'] = ts.dt.hour.astype('Int64')
+        return df
+
+    @staticmethod
+    def get_calls(on_chunk=None, adb=None):
+        adb = adb or ADBManager.for_serial(DEVICE_SERIAL)
+        df = adb.query_df(["shell", "content", "query", "--uri", "content://call_log/calls"], on_chunk)
         if not df.empty and 'date' in df.columns:
-            df['DateTime'] = pd.to_numeric(df['date'], errors='coerce').apply(
-                lambda x: datetime.datetime.fromtimestamp(int(x)/1000).strftime('%Y-%m-%d %H:%M:%S')
-            )
+            ArtifactExtractor.add_time_columns(df)
             df['Type_Label'] = df['type'].map({'1': 'Incoming', '2': 'Outgoing', '3': 'Missed'}).fillna('Other')
             df['Activity'] = "Call: " + df['number'].astype(str)
             df['Source'] = "Call Log"
         return df
 
     @staticmethod
-    def get_messages():
-        out = ADBManager.execute(["shell", "content", "query", "--uri", "content://sms/"])
-        df = ADBManager.parse_to_df(out)
+    def get_messages(on_chunk=None, adb=None):
+        adb = adb or ADBManager.for_serial(DEVICE_SERIAL)
+        df = adb.query_df(["shell", "content", "query", "--uri", "content://sms/"], on_chunk)
         if not df.empty and 'date' in df.columns:
-            df['DateTime'] = pd.to_numeric(df['date'], errors='coerce').apply(
-                lambda x: datetime.datetime.fromtimestamp(int(x)/1000).strftime('%Y-%m-%d %H:%M:%S')
-            )
-            df['Hour'] = pd.to_numeric(df['date'], errors='coerce').apply(
-                lambda x: datetime.datetime.fromtimestamp(int(x)/1000).hour
-            )
+            ArtifactExtractor.add_time_columns(df, hour=True)
             df['Activity'] = "SMS: " + df['address'].astype(str)
             df['Source'] = "SMS Inbox"
         return df
 
     @staticmethod
-    def get_apps():
-        out = ADBManager.execute(["shell", "pm", "list", "packages", "-3"])
+    def get_apps(adb=None):
+        adb = adb or ADBManager.for_serial(DEVICE_SERIAL)
+        out = adb.execute(["shell", "pm", "list", "packages", "-3"])
         pkgs = [l.replace("package:", "").strip() for l in out.splitlines() if l.strip()]
         return pd.DataFrame({"Package": pkgs, "Status": "Third-Party", "Source": "App Inventory"})
 
     @staticmethod
-    def get_media():
-        out = ADBManager.execute(["shell", "ls", "-R", "/sdcard/DCIM/Camera"])
-        files = [f for f in out.splitlines() if "." in f]
-        return pd.DataFrame({"File Name": files[:25], "Path": "/DCIM/Camera", "Source": "Media Storage"})
+    def get_media(adb=None):
+        adb = adb or ADBManager.for_serial(DEVICE_SERIAL)
+        files = media_acquisition.list_media(adb.execute, MEDIA_ROOT)
+        return pd.DataFrame({
+            "File Name": [os.path.basename(f.path) for f in files],
+            "Path": [f.path for f in files],
+            "Size": [f.size for f in files],
+            "Modified": pd.to_datetime([f.mtime for f in files], unit='s', utc=True).tz_convert(ArtifactExtractor.local_tz()),
+            "Source": "Media Storage",
+        })
+
+    @staticmethod
+    def get_locations(adb=None):
+        """
+        Cached fixes from `dumpsys location`. Each fix carries elapsed
+        realtime since boot (et=); boot wall time comes from /proc/uptime.
+        """
+        adb = adb or ADBManager.for_serial(DEVICE_SERIAL)
+        dump = adb.execute(["shell", "dumpsys", "location"])
+        uptime = adb.execute(["shell", "cat", "/proc/uptime"]).split()
+        fixes = ArtifactExtractor.LOCATION_FIX.findall(dump)
+        if not fixes or not uptime: return pd.DataFrame()
+        boot = time.time() - float(uptime[0])
+        df = pd.DataFrame(fixes, columns=['Provider', 'lat', 'lon', 'et']).drop_duplicates(ignore_index=True)
+        df['lat'] = pd.to_numeric(df['lat'], errors='coerce')
+        df['lon'] = pd.to_numeric(df['lon'], errors='coerce')
+        df['date'] = ((boot + df['et'].map(ArtifactExtractor.elapsed_seconds)) * 1000).round()
+        ArtifactExtractor.add_time_columns(df)
+        df = df.drop(columns=['et', 'date']).sort_values('Timestamp', ignore_index=True)
+        df['Source'] = "Location Cache"
+        return df
+
+class AcquisitionPipeline:
+    """Runs every artifact query concurrently instead of one adb round-trip after another."""
+    SOURCES = {
+        "calls": ArtifactExtractor.get_calls,
+        "sms": ArtifactExtractor.get_messages,
+        "apps": ArtifactExtractor.get_apps,
+        "media": ArtifactExtractor.get_media,
+        "loc": ArtifactExtractor.get_locations,
+    }
+
+    @staticmethod
+    def _timed(name, fn, adb, metrics, log_queue):
+        def run():
+            with metrics.stage(name) as s:
+                df = fn(adb=adb)
+                s.rows_out = len(df)
+            return df, s.wall_s
+        return ForensicLogger.worker(log_queue, run)
+
+    @staticmethod
+    def acquire_devices(serials, on_progress=None, max_workers=None, metrics=None):
+        """
+        Acquires every source from every serial on one bounded pool.
+        Tasks are interleaved across devices and each device's ADBManager
+        throttle caps its concurrent streams. Returns
+        ({serial: {source: DataFrame}}, {(serial, source): seconds});
+        on_progress((serial, source), done, total, seconds, df) is called on
+        the calling thread as each task completes. Each task is timed as
+        the acquire:<source> stage of `metrics`.
+        """
+        sources = AcquisitionPipeline.SOURCES
+        metrics = metrics or StageRecorder()
+        tasks = [(serial, key) for key in sources for serial in serials]
+        max_workers = max_workers or min(len(tasks), MAX_PARALLEL_DEVICES * PER_DEVICE_STREAMS)
+        frames, timings = {serial: {} for serial in serials}, {}
+        log_queue = ForensicLogger.queue()
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {
+                pool.submit(
+                    AcquisitionPipeline._timed, f"acquire:{key}", sources[key], ADBManager.for_serial(serial), metrics,
+                    log_queue
+                ): (serial, key)
+                for serial, key in tasks
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                serial, key = futures[future]
+                label = f"{serial}/{key}" if serial else key
+                try:
+                    df, secs = future.result()
+                except Exception as e:
+                    ForensicLogger.log(f"ACQUIRE_FAILED: {label} ({e})")
+                    df, secs = pd.DataFrame(), float("nan")
+                frames[serial][key], timings[(serial, key)] = df, secs
+                ForensicLogger.log(f"ACQUIRED: {label} {len(df)} rows in {secs:.2f}s")
+                if on_progress: on_progress((serial, key), done, len(tasks), secs, df)
+        return frames, timings
+
+    @staticmethod
+    def acquire_all(on_progress=None, max_workers=ACQUISITION_WORKERS, serial=DEVICE_SERIAL, metrics=None):
+        """
+        Single-device form: returns ({source: DataFrame}, {source: seconds}).
+        on_progress(source, done, total, seconds, df) as in acquire_devices.
+        """
+        def progress(task, *rest):
+            if on_progress: on_progress(task[1], *rest)
+        frames, timings = AcquisitionPipeline.acquire_devices([serial], progress, max_workers, metrics)
+        return frames[serial], {key: secs for (_, key), secs in timings.items()}
 
 # ==========================================
 # 🎨 UI & CYBER-THEME DESIGN
@@ -114,6 +805,116 @@ def apply_ui_assets():
         </style>
     """, unsafe_allow_html=True)
 
+def current_search_index():
+    """Full-text index of all acquired streams, rebuilt only after a new acquisition."""
+    sources = sorted(st.session_state.forensic_data)
+    return ViewCache.get(("search", tuple(sources)), sources, lambda: SearchIndex.build(st.session_state.forensic_data))
+
+def styled(fig):
+    fig.update_layout(paper_bgcolor='rgba(0,0,0,0)', font_color="white")
+    return fig
+
+def page_bounds(total, key, page_size=PAGE_SIZE):
+    """(start, stop) of the page picked under `key`; the picker is only shown when there is more than one page."""
+    if total <= page_size:
+        return 0, total
+    pages = -(-total // page_size)
+    nav, info = st.columns([1, 3])
+    page = min(int(nav.number_input("PAGE", min_value=1, step=1, key=key)), pages)
+    start = (page - 1) * page_size
+    stop = min(start + page_size, total)
+    info.caption(f"Rows {start + 1}–{stop} of {total} (page {page}/{pages})")
+    return start, stop
+
+def paged_dataframe(df, key, page_size=PAGE_SIZE):
+    """Renders one page of df; the page picker keeps its state under `key`."""
+    start, stop = page_bounds(len(df), key, page_size)
+    st.dataframe(df.iloc[start:stop] if stop - start < len(df) else df, use_container_width=True)
+
+def build_trajectory(loc):
+    """
+    Time-ordered fixes with the leg into each one (distance, seconds,
+    speed), vectorised by ANALYSIS.columnar.trajectory.
+    """
+    epochs = (loc['Timestamp'] - pd.Timestamp(0)).dt.total_seconds()
+    traj = columnar_analysis.trajectory(pd.DataFrame({'latitude': loc['lat'], 'longitude': loc['lon'], 'epoch': epochs}))
+    traj['DateTime'] = loc['DateTime'].to_numpy()[traj.index]
+    traj['Impossible'] = geo.implausible(traj['distance_m'], traj['seconds'])
+    return traj.reset_index(drop=True)
+
+def build_fix_index(traj):
+    """Trajectory fixes plus a GridIndex over them, for radius queries."""
+    records = [
+        Location.from_values((lat, lon, dt), epoch)
+        for lat, lon, dt, epoch in zip(traj['latitude'], traj['longitude'], traj['DateTime'], traj['epoch'])
+    ]
+    fixes = geo.trajectory(records)
+    return fixes, geo.GridIndex([(f[1], f[2]) for f in fixes])
+
+def report_frame(df, stream, columns):
+    """
+    A dashboard stream under the report's record fields (blank where not
+    acquired); time/epoch come from its Timestamp.
+    """
+    record_type = {"calls": Call, "messages": Message, "apps": App, "locations": Location}[stream]
+    fields = dict.fromkeys(record_type.FIELDS, "")
+    fields.update((field, df[col] if col in df.columns else "") for field, col in columns.items())
+    out = pd.DataFrame(fields, index=df.index)
+    if 'Timestamp' in df.columns:
+        out['time'] = df['Timestamp'].dt.strftime('%Y-%m-%d %H:%M').fillna("")
+        out['epoch'] = (df['Timestamp'] - pd.Timestamp(0)).dt.total_seconds()
+        out = out.sort_values('epoch', na_position='last', ignore_index=True)
+    return out
+
+def build_report_inputs(data):
+    """
+    Counts, suspicious records, SMS campaigns, impossible travel and a
+    lazy timeline for REPORT.pdf_report. Each stream is classified once by
+    the columnar rule engine; timeline events are only built as the PDF
+    consumes them.
+    """
+    frames, hits = {}, {}
+    for key, (stream, columns) in REPORT_STREAMS.items():
+        if key in data and not data[key].empty:
+            frames[stream] = report_frame(data[key], stream, columns)
+            hits[stream] = columnar_analysis.hits(stream, frames[stream])
+    counts = tuple(len(frames.get(s, ())) for s in ("calls", "messages", "apps", "locations"))
+    findings = tuple(
+        frames[s][pd.notna(hits[s])].to_dict("records") if s in frames else []
+        for s in ("calls", "messages", "apps")
+    )
+    campaigns = []
+    if "messages" in frames:
+        messages = frames["messages"]
+        campaigns, members = SmsCampaigns.cluster(messages['message'], messages['sender'], messages.get('epoch'))
+        # Campaign messages are HIGH on the timeline without joining the suspicious messages table
+        for i in members:
+            hits["messages"][i] = hits["messages"][i] or CAMPAIGN_RULE
+
+    def rows(frame):
+        names = list(frame.columns)
+        return (dict(zip(names, row)) for row in frame.itertuples(index=False, name=None))
+
+    travel = geo.ImpossibleTravel()
+    if "locations" in frames:
+        travel.update(rows(frames["locations"]))
+    findings += (campaigns, travel.jumps())
+
+    timeline = merge_timeline(*(
+        iter_events(s, zip(rows(frames[s]), hits[s])) for s in ("calls", "messages", "locations") if s in frames
+    ), presorted=True)
+    return counts, findings, timeline
+
+def live_rows(key):
+    """on_chunk callback that shows rows in the ACQUISITION tab while a query is still running."""
+    status, table = st.empty(), st.empty()
+    received = [0]
+    def show(chunk):
+        received[0] += len(chunk)
+        status.caption(f"{key.upper()}: {received[0]} rows received...")
+        table.dataframe(chunk.tail(200), use_container_width=True)
+    return show
+
 # ==========================================
 # 🚀 MAIN APP LOGIC
 # ==========================================
@@ -123,14 +924,28 @@ def main():
     
     st.title("🛡️ ECHELON MOBILE FORENSICS")
 
-    if 'forensic_data' not in st.session_state:
-        st.session_state.forensic_data = {}
+    # One case dataset per device serial; forensic_data is the active one
+    if 'device_cases' not in st.session_state:
+        st.session_state.device_cases = {DEVICE_SERIAL: CaseRepository.load()}
+        st.session_state.active_serial = DEVICE_SERIAL
 
     # --- SIDEBAR ---
     with st.sidebar:
         st.image("https://cdn-icons-png.flaticon.com/512/2563/2563211.png", width=80)
         st.title("ECHELON v4.0")
-        device_model = ADBManager.execute(["shell", "getprop", "ro.product.model"]).strip()
+        cases = list(st.session_state.device_cases)
+        if len(cases) > 1:
+            st.session_state.active_serial = st.selectbox(
+                "ACTIVE CASE DATASET", cases, index=cases.index(st.session_state.active_serial),
+                format_func=lambda serial: serial or "default device"
+            )
+        active = st.session_state.active_serial
+        st.session_state.forensic_data = st.session_state.device_cases[active]
+        adb = ADBManager.for_serial(active)
+
+        if st.button("🔄 RE-PROBE DEVICE"):
+            DeviceProbe.bump(active)
+        device_model = DeviceProbe.model(active)
         if device_model:
             st.success(f"NODE ONLINE: {device_model}")
         else:
@@ -142,6 +957,27 @@ def main():
         log_html = f"<div class='terminal-container'>{'<br>'.join(logs[::-1])}</div>"
         st.markdown(log_html, unsafe_allow_html=True)
 
+        st.markdown("### ⏱️ STAGE METRICS")
+        metrics = StageMetrics.recorder()
+        summary = metrics.summary()
+        if summary:
+            table = pd.DataFrame(summary)
+            table['peak_MiB'] = (table.pop('peak_bytes') / 1048576).round(1)
+            st.dataframe(table, use_container_width=True)
+        else: st.caption("No stages recorded yet.")
+        with st.expander("PROFILING"):
+            metrics.trace_memory(st.checkbox("TRACE PEAK MEMORY", value=metrics.memory))
+            names = [row['stage'] for row in summary]
+            choice = st.selectbox("CPROFILE STAGE", ["(off)"] + names,
+                                  index=names.index(metrics.profile) + 1 if metrics.profile in names else 0)
+            metrics.profile = None if choice == "(off)" else choice
+            if metrics.profile:
+                listing = metrics.profile_report(metrics.profile)
+                if listing: st.code(listing, language=None)
+                else: st.caption("Profiled on its next run.")
+            if st.button("CLEAR METRICS"):
+                metrics.clear()
+
     # --- MAIN TABS ---
     tabs = st.tabs(["📊 ACQUISITION", "⚡ ANALYTICS", "🕒 TIMELINE", "📄 REPORT", "🕵️ SANDBOX", "📍 LIVE GPS"])
 
@@ -149,15 +985,76 @@ def main():
     with tabs[0]:
         st.subheader("Automated Artifact Extraction")
         c1, c2, c3, c4, c5 = st.columns(5)
-        if c1.button("📞 CALLS"): st.session_state.forensic_data['calls'] = ArtifactExtractor.get_calls()
-        if c2.button("💬 SMS"): st.session_state.forensic_data['sms'] = ArtifactExtractor.get_messages()
-        if c3.button("📦 APPS"): st.session_state.forensic_data['apps'] = ArtifactExtractor.get_apps()
-        if c4.button("🖼️ MEDIA"): st.session_state.forensic_data['media'] = ArtifactExtractor.get_media()
-        if c5.button("📍 GPS CACHE"): st.session_state.forensic_data['loc'] = pd.DataFrame([{"lat": 21.1702, "lon": 72.8311, "DateTime": datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'), "Source": "GPS Cache"}])
+        acquired = {}
+        if c1.button("📞 CALLS"): acquired['calls'] = StageMetrics.run("acquire:calls", ArtifactExtractor.get_calls, live_rows("calls"), adb)
+        if c2.button("💬 SMS"): acquired['sms'] = StageMetrics.run("acquire:sms", ArtifactExtractor.get_messages, live_rows("sms"), adb)
+        if c3.button("📦 APPS"): acquired['apps'] = StageMetrics.run("acquire:apps", ArtifactExtractor.get_apps, adb)
+        if c4.button("🖼️ MEDIA"): acquired['media'] = StageMetrics.run("acquire:media", ArtifactExtractor.get_media, adb)
+        if c5.button("📍 GPS CACHE"): acquired['loc'] = StageMetrics.run("acquire:loc", ArtifactExtractor.get_locations, adb)
+        if st.button("⚡ ACQUIRE ALL (PARALLEL)"):
+            bar = st.progress(0.0, text="Starting parallel acquisition...")
+            def on_progress(key, done, total, secs, df):
+                bar.progress(done / total, text=f"{key.upper()} done in {secs:.2f}s ({done}/{total})")
+            frames, timings = AcquisitionPipeline.acquire_all(on_progress, serial=active, metrics=StageMetrics.recorder())
+            acquired.update(frames)
+            st.dataframe(pd.DataFrame(
+                [{"Source": k, "Rows": len(frames[k]), "Seconds": round(v, 3)} for k, v in timings.items()]
+            ), use_container_width=True)
+        if st.button("🧬 PULL MEDIA (SHA-256)"):
+            bar = st.progress(0.0, text=f"Listing {MEDIA_ROOT}...")
+            def on_media(media, status, done, total):
+                bar.progress(done / total, text=f"{status.upper()}: {os.path.basename(media.path)} ({done}/{total})")
+                if status.startswith("failed"): ForensicLogger.log(f"MEDIA_FAILED: {media.path} ({status[8:]})")
+            log_queue = ForensicLogger.queue()
+            @contextmanager
+            def open_stream(cmd_list):
+                # Runs on acquire_media's pool threads
+                with ForensicLogger.queued(log_queue), adb.open_stream(cmd_list) as src:
+                    yield src
+            store = CaseRepository.store(CaseRepository.db_for(active))
+            with StageMetrics.recorder().stage("acquire:media_pull") as s:
+                pulled = media_acquisition.acquire_media(
+                    store, adb.execute, open_stream, CaseRepository.media_dir(active), MEDIA_ROOT,
+                    PER_DEVICE_STREAMS, on_progress=on_media
+                )
+                s.rows_out = pulled['new'] + pulled['duplicate']
+            ForensicLogger.log(
+                f"MEDIA_PULLED: {pulled['new']} new, {pulled['duplicate']} duplicate, "
+                f"{pulled['skipped']} skipped, {pulled['failed']} failed, {pulled['bytes']} bytes"
+            )
+            st.dataframe(pd.DataFrame(store.media_hashes()), use_container_width=True)
+        for key, df in acquired.items():
+            CaseRepository.save(key, df, active)
+            st.session_state.forensic_data[key] = df
+            ViewCache.bump(key)
+        if acquired: DeviceProbe.bump(active)
+
+        with st.expander("🛰️ MULTI-DEVICE ACQUISITION"):
+            if st.button("🔍 DISCOVER DEVICES"):
+                st.session_state.discovered = ADBManager.devices()
+            found = st.session_state.get('discovered', [])
+            st.caption(f"{len(found)} device(s) online")
+            serials = st.multiselect("DEVICES TO IMAGE", found, default=found)
+            if st.button("⚡ ACQUIRE SELECTED DEVICES", disabled=not serials):
+                bar = st.progress(0.0, text=f"Imaging {len(serials)} devices...")
+                def on_device_progress(task, done, total, secs, df):
+                    bar.progress(done / total, text=f"{task[0]}/{task[1].upper()} done in {secs:.2f}s ({done}/{total})")
+                frames, timings = AcquisitionPipeline.acquire_devices(serials, on_device_progress, metrics=StageMetrics.recorder())
+                for serial, device_frames in frames.items():
+                    DeviceProbe.bump(serial)
+                    if serial not in st.session_state.device_cases:
+                        st.session_state.device_cases[serial] = CaseRepository.load(serial)
+                    for key, df in device_frames.items():
+                        CaseRepository.save(key, df, serial)
+                        st.session_state.device_cases[serial][key] = df
+                for key in AcquisitionPipeline.SOURCES: ViewCache.bump(key)
+                st.dataframe(pd.DataFrame(
+                    [{"Device": d, "Source": k, "Rows": len(frames[d][k]), "Seconds": round(v, 3)} for (d, k), v in timings.items()]
+                ), use_container_width=True)
 
         for key, df in st.session_state.forensic_data.items():
             with st.expander(f"RECONSTRUCTED {key.upper()} DATA", expanded=True):
-                if not df.empty: st.dataframe(df, use_container_width=True)
+                if not df.empty: paged_dataframe(df, f"page_acq_{key}")
                 else: st.warning(f"No artifacts found for {key}")
 
     # 2. ANALYTICS
@@ -165,26 +1062,102 @@ def main():
         st.subheader("Intelligence Visualizations")
         if st.session_state.forensic_data:
             col_a, col_b = st.columns(2)
-            if 'calls' in st.session_state.forensic_data:
-                fig_calls = px.pie(st.session_state.forensic_data['calls'], names='Type_Label', title="Call Interaction Density", hole=0.4)
-                fig_calls.update_layout(paper_bgcolor='rgba(0,0,0,0)', font_color="white")
-                col_a.plotly_chart(fig_calls, use_container_width=True)
-            if 'sms' in st.session_state.forensic_data:
-                fig_sms = px.histogram(st.session_state.forensic_data['sms'], x="Hour", title="Peak Messaging Frequency", color_discrete_sequence=['#ff4b4b'])
-                fig_sms.update_layout(paper_bgcolor='rgba(0,0,0,0)', font_color="white")
-                col_b.plotly_chart(fig_sms, use_container_width=True)
+            data = st.session_state.forensic_data
+            if 'calls' in data and 'Type_Label' in data['calls'].columns:
+                def call_types():
+                    counts = data['calls']['Type_Label'].value_counts()
+                    return styled(px.pie(names=counts.index, values=counts.values, title="Call Interaction Density", hole=0.4))
+                col_a.plotly_chart(ViewCache.get("fig_calls", ["calls"], call_types), use_container_width=True)
+            if 'sms' in data:
+                index = TimeIndex.get()
+                if 'sms' in index.sources:
+                    fig_sms = ViewCache.get("fig_sms", ["sms"], lambda: styled(px.bar(
+                        x=list(range(24)), y=index.hour_of_day('sms'), labels={'x': 'Hour', 'y': 'Messages'},
+                        title="Peak Messaging Frequency", color_discrete_sequence=['#ff4b4b']
+                    )))
+                    col_b.plotly_chart(fig_sms, use_container_width=True)
+
+            graph = ContactNetwork.graph()
+            if len(graph):
+                st.markdown("### 🕸️ CONTACT NETWORK")
+                bridges = graph.bridges()
+                k1, k2, k3 = st.columns(3)
+                k1.metric("COUNTERPARTIES", len(graph))
+                k2.metric("DEVICES", len(graph.edges))
+                k3.metric("BRIDGING CONTACTS", len(bridges))
+                r1, r2 = st.columns(2)
+                rank = r1.selectbox("RANK CONTACTS BY", list(ContactGraph.RANK_KEYS))
+                top_k = r2.slider("TOP K", min_value=5, max_value=100, value=15)
+                top = graph.top(top_k, rank)
+                st.plotly_chart(ContactNetwork.figure(graph, top), use_container_width=True)
+                st.dataframe(ContactNetwork.table(top), use_container_width=True)
+                if bridges:
+                    st.markdown("**Contacts shared between devices**")
+                    st.dataframe(pd.DataFrame([
+                        {"Contact": party, "Devices": len(owners), "Interactions": sum(owners.values()),
+                         "Per Device": ", ".join(f"{o}: {n}" for o, n in owners.items())}
+                        for party, owners in bridges
+                    ]), use_container_width=True)
+                b1, b2 = st.columns(2)
+                window = b1.number_input("BURST WINDOW (min)", min_value=1, value=15)
+                min_events = b2.number_input("MIN INTERACTIONS", min_value=2, value=3)
+                bursts = graph.bursts(int(window) * 60, int(min_events))
+                st.markdown(f"**Bursts** (≥ {int(min_events)} interactions within {int(window)} min)")
+                if bursts:
+                    st.dataframe(pd.DataFrame([
+                        {"Contact": b['party'], "From": ContactNetwork.when(b['start']),
+                         "To": ContactNetwork.when(b['end']), "Interactions": b['events']}
+                        for b in bursts
+                    ]), use_container_width=True)
+                else: st.caption("No bursts.")
+
+            if 'sms' in data:
+                campaigns, members = SmsCampaigns.get()
+                st.markdown("### 📨 SMS CAMPAIGNS")
+                m1, m2, m3 = st.columns(3)
+                m1.metric("CAMPAIGNS", len(campaigns))
+                m2.metric("CAMPAIGN MESSAGES", len(members))
+                m3.metric("SENDERS INVOLVED", sum(c['senders'] for c in campaigns))
+                if campaigns: st.dataframe(SmsCampaigns.table(campaigns), use_container_width=True)
+                else: st.caption("No near-duplicate texts sent from several senders.")
         else: st.info("Run Acquisition first.")
 
     # 3. TIMELINE
     with tabs[2]:
         st.subheader("Sequential Event Reconstruction")
         if 'calls' in st.session_state.forensic_data or 'sms' in st.session_state.forensic_data:
-            frames = []
-            if 'calls' in st.session_state.forensic_data: frames.append(st.session_state.forensic_data['calls'][['DateTime', 'Activity', 'Source']])
-            if 'sms' in st.session_state.forensic_data: frames.append(st.session_state.forensic_data['sms'][['DateTime', 'Activity', 'Source']])
-            if frames:
-                timeline = pd.concat(frames).sort_values(by='DateTime', ascending=False)
-                st.dataframe(timeline, use_container_width=True)
+            data = st.session_state.forensic_data
+            index = TimeIndex.get()
+            span = index.span()
+            if span is not None:
+                first, last = (datetime.datetime(1970, 1, 1) + datetime.timedelta(seconds=t) for t in span)
+                f1, f2, f3, f4 = st.columns(4)
+                day = f1.date_input("DAY (EMPTY = WHOLE CASE)", value=None, min_value=first.date(), max_value=last.date())
+                t_from = f2.time_input("FROM", datetime.time(0, 0), step=60)
+                t_to = f3.time_input("TO", datetime.time(23, 59), step=60)
+                zoom = f4.selectbox("BUCKET", ["auto"] + list(GRANULARITIES))
+                if day is None:
+                    start, end = None, None
+                    lo, hi = span[0], span[1] + 1
+                else:
+                    start, end = TimeIndex.epoch(day, t_from), TimeIndex.epoch(day, t_to) + 60
+                    lo, hi = start, end
+                granularity = TimeIndex.granularity(lo, hi) if zoom == "auto" else zoom
+                # Minute buckets are exact for the minute-aligned range, whatever the chart zoom
+                totals = index.totals(start, end, granularity="minute")
+                m1, m2, m3 = st.columns(3)
+                m1.metric("EVENTS IN RANGE", index.count(start, end))
+                m2.metric("HIGH SEVERITY", sum(n for (_, sev), n in totals.items() if sev == "HIGH"))
+                m3.metric("UNDATED", sum(len(index.undated[s]) for s in index.sources))
+                chart = TimeIndex.histogram(index, granularity, start, end)
+                st.plotly_chart(styled(px.bar(
+                    chart, x='Time', y='Events', color='Severity', hover_data=['Source'],
+                    title=f"Events per {granularity}", color_discrete_map={'HIGH': '#ff4b4b', 'NORMAL': '#4b8bff'}
+                )), use_container_width=True)
+                p_start, p_stop = page_bounds(index.count(start, end), "page_timeline")
+                events = index.events(start, end, offset=p_start, limit=p_stop - p_start, newest_first=True)
+                st.dataframe(TimeIndex.page(data, events), use_container_width=True)
+            else: st.warning("No timestamped call or SMS events.")
         else: st.warning("Requires Call or SMS logs to reconstruct timeline.")
 
     # 4. REPORTING (AESTHETIC & FIXED)
@@ -200,46 +1173,15 @@ def main():
 
         if st.button("🚀 COMPILE & DOWNLOAD AESTHETIC REPORT"):
             if st.session_state.forensic_data:
-                pdf = FPDF()
-                pdf.add_page()
-                
-                # Header Section
-                pdf.set_fill_color(30, 30, 30)
-                pdf.rect(0, 0, 210, 40, 'F')
-                pdf.set_text_color(255, 75, 75)
-                pdf.set_font("Arial", 'B', 24)
-                pdf.cell(0, 20, "ECHELON FORENSIC AUDIT", ln=True, align='C')
-                
-                # Case Info
-                pdf.set_text_color(0, 0, 0)
-                pdf.set_font("Arial", 'B', 12)
-                pdf.ln(20)
-                pdf.cell(0, 10, f"Case ID: {case_id}", ln=True)
-                pdf.cell(0, 10, f"Officer: {officer}", ln=True)
-                pdf.cell(0, 10, f"Dept: {dept}", ln=True)
-                pdf.cell(0, 10, f"Date: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", ln=True)
-                pdf.ln(5)
-                pdf.line(10, pdf.get_y(), 200, pdf.get_y())
-                pdf.ln(10)
-
-                # Summary Table
-                pdf.set_font("Arial", 'B', 14)
-                pdf.cell(0, 10, "Acquisition Summary:", ln=True)
-                pdf.set_font("Arial", '', 11)
-                for k, v in st.session_state.forensic_data.items():
-                    pdf.cell(0, 8, f"- {k.upper()}: {len(v)} records extracted.", ln=True)
-                
-                pdf.ln(10)
-                pdf.set_font("Arial", 'I', 10)
-                pdf.multi_cell(0, 8, f"Notes: {notes}")
-                
-                # Footer
-                pdf.set_y(-30)
-                pdf.set_font("Arial", 'B', 8)
-                pdf.cell(0, 10, "CONFIDENTIAL - ECHELON MOBILE FORENSICS", align='C')
-
-                # Generate Download
-                pdf_output = pdf.output(dest='S').encode('latin-1')
+                counts, findings, timeline = build_report_inputs(st.session_state.forensic_data)
+                case = [("Case ID", case_id), ("Officer", officer), ("Dept", dept), ("Device", active or "default device")]
+                if 'apps' in st.session_state.forensic_data:
+                    case.append(("App Permissions", "not acquired; apps are not checked for full access"))
+                with tempfile.TemporaryDirectory() as tmp, StageMetrics.recorder().stage("report:pdf", sum(counts)):
+                    media = CaseRepository.store(CaseRepository.db_for(active)).media_hashes()
+                    pdf_path = write_pdf_report(os.path.join(tmp, "report.pdf"), counts, findings, timeline, case, notes, media)
+                    with open(pdf_path, "rb") as f:
+                        pdf_output = f.read()
                 st.download_button(label="📥 DOWNLOAD PDF REPORT", data=pdf_output, file_name=f"{case_id}_Final_Report.pdf", mime="application/pdf")
                 st.success("Report Compiled Successfully!")
             else:
@@ -249,20 +1191,68 @@ def main():
     with tabs[4]:
         st.subheader("Global Artifact Search")
         if st.session_state.forensic_data:
-            src = st.selectbox("SELECT STREAM", list(st.session_state.forensic_data.keys()))
-            search = st.text_input("🔍 FILTER KEYWORDS")
-            df_sb = st.session_state.forensic_data[src]
+            src = st.selectbox("SELECT STREAM", ["ALL STREAMS"] + list(st.session_state.forensic_data.keys()))
+            search = st.text_input("🔍 FILTER KEYWORDS", help='Tokens and prefixes: link*, address:+91*, "click this", a OR b')
+            streams = list(st.session_state.forensic_data.keys()) if src == "ALL STREAMS" else [src]
             if search:
-                df_sb = df_sb[df_sb.astype(str).apply(lambda x: x.str.contains(search, case=False)).any(axis=1)]
-            st.dataframe(df_sb, use_container_width=True)
+                start = time.perf_counter()
+                hits = current_search_index().search(st.session_state.forensic_data, search, streams)
+                st.caption(f"{sum(len(v) for v in hits.values())} matches in {(time.perf_counter() - start) * 1000:.1f} ms")
+                for key, df_sb in hits.items():
+                    st.markdown(f"**{key.upper()}**")
+                    paged_dataframe(df_sb, f"page_hits_{key}")
+                if not hits: st.warning("No matches.")
+            else:
+                for key in streams:
+                    paged_dataframe(st.session_state.forensic_data[key], f"page_sandbox_{key}")
         else: st.info("No data available to search.")
 
     # 6. LIVE GPS
     with tabs[5]:
         st.subheader("📍 Geospatial Intelligence")
-        lat, lon = 21.1702, 72.8311 # Default Surat
-        st.map(pd.DataFrame({'lat': [lat], 'lon': [lon]}), zoom=14)
-        st.markdown(f"**Coordinates Captured:** {lat}, {lon}")
+        loc = st.session_state.forensic_data.get('loc')
+        if loc is not None and not loc.empty and 'Timestamp' in loc.columns:
+            traj = ViewCache.get("trajectory", ["loc"], lambda: build_trajectory(loc))
+            m1, m2, m3, m4 = st.columns(4)
+            m1.metric("FIXES", len(traj))
+            m2.metric("PATH LENGTH", f"{traj['distance_m'].sum() / 1000:.1f} km")
+            m3.metric("TOP SPEED", f"{traj['speed_kmh'].max():.0f} km/h" if len(traj) > 1 else "—")
+            m4.metric("IMPOSSIBLE JUMPS", int(traj['Impossible'].sum()))
+
+            fig = px.line_map(traj, lat='latitude', lon='longitude', hover_name='DateTime',
+                              hover_data={'speed_kmh': ':.1f'}, zoom=9, map_style="carto-darkmatter")
+            jumps = traj[traj['Impossible']]
+            if not jumps.empty:
+                for trace in px.scatter_map(jumps, lat='latitude', lon='longitude', hover_name='DateTime',
+                                            color_discrete_sequence=['#ff4b4b']).data:
+                    trace.marker.size = 12
+                    fig.add_trace(trace)
+            st.plotly_chart(styled(fig), use_container_width=True)
+            if not jumps.empty:
+                st.error(f"{len(jumps)} fixes reached faster than {geo.MAX_SPEED_KMH:.0f} km/h")
+                st.dataframe(jumps[['DateTime', 'latitude', 'longitude', 'distance_m', 'seconds', 'speed_kmh']], use_container_width=True)
+
+            fixes, index = ViewCache.get("fix_index", ["loc"], lambda: build_fix_index(traj))
+            dwells = ViewCache.get("dwells", ["loc"], lambda: geo.dwell_points(f[3] for f in fixes))
+            st.markdown(f"**Dwell Points** (≥ {geo.DWELL_MIN_SECONDS // 60} min within {geo.DWELL_RADIUS_M:.0f} m)")
+            if dwells:
+                st.dataframe(pd.DataFrame([{
+                    "Latitude": round(d['latitude'], 6), "Longitude": round(d['longitude'], 6),
+                    "Arrived": datetime.datetime.fromtimestamp(d['start'], datetime.timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
+                    "Minutes": round((d['end'] - d['start']) / 60, 1), "Fixes": d['fixes'],
+                } for d in dwells]), use_container_width=True)
+            else: st.caption("No dwell points.")
+
+            st.markdown("**Visits Near Coordinate**")
+            q1, q2, q3 = st.columns(3)
+            q_lat = q1.number_input("LATITUDE", value=float(traj['latitude'].iloc[0]), format="%.6f")
+            q_lon = q2.number_input("LONGITUDE", value=float(traj['longitude'].iloc[0]), format="%.6f")
+            radius = q3.number_input("RADIUS (m)", min_value=1.0, value=200.0, step=50.0)
+            visits = geo.group_visits(fixes, index.near(q_lat, q_lon, radius))
+            st.dataframe(pd.DataFrame([{
+                "Arrived": v['records'][0]['time'], "Left": v['records'][-1]['time'], "Fixes": len(v['records']),
+            } for v in visits]), use_container_width=True)
+        else: st.info("Acquire the GPS CACHE to reconstruct the device trajectory.")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the adb binary, for running the dashboard without a device.
+
+    ECHELON_ADB=DASHBOARD/stub_adb.py streamlit run DASHBOARD/app.py
+
+Answers the commands the dashboard issues from the DATA/*.csv sample
+files, in the same text format as a real device.
+Environment knobs:
+    STUB_ADB_DELAY    seconds to sleep per invocation (simulated latency)
+    STUB_ADB_REPEAT   repeat every content-provider row N times
+    STUB_ADB_SERIALS  comma-separated serials to emulate (default STUB0001)
+    STUB_ADB_MEDIA_DIR  local directory served as the device's /sdcard
+"""
+import csv
+import os
+import shlex
+import sys
+import time
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "DATA")
+
+
+def _rows(filename):
+    with open(os.path.join(DATA_DIR, filename), newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    return rows * int(os.environ.get("STUB_ADB_REPEAT", "1"))
+
+
+def _epoch_ms(time_str):
+    return int(time.mktime(datetime.strptime(time_str, "%Y-%m-%d %H:%M").timetuple()) * 1000)
+
+
+def content_query(uri):
+    if uri.startswith("content://call_log/calls"):
+        for i, r in enumerate(_rows("calls.csv")):
+            print(
+                f"Row: {i} _id={i + 1}, number={r['number']}, date={_epoch_ms(r['time'])}, "
+                f"duration={r['duration']}, type={i % 3 + 1}"
+            )
+    elif uri.startswith("content://sms"):
+        for i, r in enumerate(_rows("messages.csv")):
+            print(
+                f"Row: {i} _id={i + 1}, address={r['sender']}, date={_epoch_ms(r['time'])}, "
+                f"type=1, body={r['message']}"
+            )
+    else:
+        print("No result found.")
+
+
+def _elapsed(seconds):
+    # Android's duration format, e.g. +3d4h5m6s7ms
+    ms = int(round(seconds * 1000))
+    parts = []
+    for unit, size in (("d", 86400000), ("h", 3600000), ("m", 60000), ("s", 1000)):
+        if ms >= size:
+            parts.append(f"{ms // size}{unit}")
+            ms %= size
+    return "+" + "".join(parts) + f"{ms}ms"
+
+
+def _boot_time(fixes):
+    # Pretend the device booted an hour before its oldest location fix
+    return min(fixes) / 1000 - 3600 if fixes else time.time() - 3600
+
+
+def dumpsys_location():
+    rows = _rows("location.csv")
+    boot = _boot_time([_epoch_ms(r["time"]) for r in rows])
+    print("Location Manager State:")
+    for r in rows:
+        et = _epoch_ms(r["time"]) / 1000 - boot
+        print(
+            f"    gps: Location[gps {float(r['latitude']):.6f},{float(r['longitude']):.6f} "
+            f"hAcc=12.0 et={_elapsed(et)} alt=53.0 vAcc=4.0]"
+        )
+
+
+def _media_path(device_path):
+    # /sdcard/... on the device is STUB_ADB_MEDIA_DIR/... locally
+    root = os.environ.get("STUB_ADB_MEDIA_DIR")
+    rel = os.path.relpath(device_path, "/sdcard")
+    if not root or rel.startswith(".."):
+        return None
+    return os.path.join(root, rel)
+
+
+def find_stat(root):
+    # find ROOT -type f -exec stat -c '%s %Y %n' {} +
+    local = _media_path(root)
+    if not local or not os.path.isdir(local):
+        print(f"find: {root}: No such file or directory", file=sys.stderr)
+        return 1
+    for dirpath, _, filenames in os.walk(local):
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            st = os.stat(path)
+            device_path = "/sdcard/" + os.path.relpath(path, os.environ["STUB_ADB_MEDIA_DIR"]).replace(os.sep, "/")
+            print(f"{st.st_size} {int(st.st_mtime)} {device_path}")
+    return 0
+
+
+def tail_bytes(start, device_path):
+    # tail -c +N PATH: raw bytes from 1-based offset N
+    local = _media_path(device_path)
+    if not local or not os.path.isfile(local):
+        print(f"tail: {device_path}: No such file or directory", file=sys.stderr)
+        return 1
+    out = sys.stdout.buffer
+    with open(local, "rb") as f:
+        f.seek(max(0, int(start.lstrip("+")) - 1))
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            out.write(chunk)
+    out.flush()
+    return 0
+
+
+def main(args):
+    time.sleep(float(os.environ.get("STUB_ADB_DELAY", "0")))
+    serials = os.environ.get("STUB_ADB_SERIALS", "STUB0001").split(",")
+
+    if args[:1] == ["devices"]:
+        print("List of devices attached")
+        for s in serials:
+            print(f"{s}\tdevice")
+        return 0
+    serial = serials[0]
+    if args[:1] == ["-s"]:
+        serial = args[1]
+        if serial not in serials:
+            print(f"adb: device '{serial}' not found", file=sys.stderr)
+            return 1
+        args = args[2:]
+    elif len(serials) > 1:
+        print("adb: more than one device/emulator", file=sys.stderr)
+        return 1
+
+    if args[:1] not in (["shell"], ["exec-out"]):
+        return 1
+    # adb joins the arguments and the device shell splits them again
+    cmd = shlex.split(" ".join(args[1:]))
+    if cmd[:2] == ["getprop", "ro.product.model"]:
+        print(f"StubPhone-{serial}")
+    elif cmd[:3] == ["content", "query", "--uri"] and len(cmd) > 3:
+        content_query(cmd[3])
+    elif cmd[:3] == ["pm", "list", "packages"]:
+        for r in _rows("apps.csv"):
+            print(f"package:com.stub.{r['app_name'].lower()}")
+    elif cmd[:2] == ["dumpsys", "location"]:
+        dumpsys_location()
+    elif cmd[:2] == ["cat", "/proc/uptime"]:
+        boot = _boot_time([_epoch_ms(r["time"]) for r in _rows("location.csv")])
+        print(f"{time.time() - boot:.2f} {(time.time() - boot) * 3:.2f}")
+    elif cmd[:1] == ["find"] and "stat" in cmd:
+        return find_stat(cmd[1])
+    elif cmd[:2] == ["tail", "-c"] and len(cmd) > 3:
+        return tail_bytes(cmd[2], cmd[3])
+    else:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
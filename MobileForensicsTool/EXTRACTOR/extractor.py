@@ -7,92 +7,593 @@ if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
 import csv
+import importlib
+from datetime import datetime
 
-from ANALYSIS.analysis import (
-    analyze_calls,
-    analyze_messages,
-    analyze_apps,
-    analyze_location_jumps,
-    analyze_timestamp_anomalies
-)
-from TIMELINE.timeline import build_timeline
+from ANALYSIS.geo import ImpossibleTravel
+from ANALYSIS.records import RECORD_TYPES, parse_epoch
+from ANALYSIS.similarity import CAMPAIGN_RULE, MessageClusters, mark_campaigns
+from METRICS.stages import StageRecorder, format_summary
+from STORE import columnar_file
+from STORE.case_store import CaseStore, case_path
+from TIMELINE.timeline import TimelineSpool, iter_events, merge_timeline
 import REPORT.report_generator as report_gen
+from REPORT.pdf_report import write_pdf_report
 
 # ---------------- PATH SETUP ----------------
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DATA_DIR = os.path.join(BASE_DIR, "DATA")
+# ECHELON_DATA_DIR points the pipeline at another evidence set (e.g. BENCH/synthetic.py output)
+DATA_DIR = os.environ.get("ECHELON_DATA_DIR", os.path.join(BASE_DIR, "DATA"))
+
+# Rows held in memory at once per artifact stream
+BATCH_SIZE = 10000
+
+# Interchangeable implementations of the analyze_* functions
+ANALYSIS_BACKENDS = {
+    "python": "ANALYSIS.analysis",
+    "columnar": "ANALYSIS.columnar",
+}
+
+def load_backend(name="python"):
+    return importlib.import_module(ANALYSIS_BACKENDS[name])
+
+# Packed column holding timestamps already parsed by parse_epoch
+EPOCH_COLUMN = "_epoch"
+
+# Per-record dumps (pretty, print_timeline); set_quiet() turns them off for batch jobs
+ECHO_RECORDS = True
+
+def set_quiet(quiet=True):
+    global ECHO_RECORDS
+    ECHO_RECORDS = not quiet
+
+# ---------------- COLUMNAR EVIDENCE ----------------
+def packed_path(filename, data_dir=None):
+    """
+    Columnar copy of a DATA csv (STORE.columnar_file), if there is one that
+    is not older than the csv itself.
+    """
+    csv_path = os.path.join(data_dir or DATA_DIR, filename)
+    path = columnar_file.find(os.path.splitext(csv_path)[0])
+    if path is None:
+        return None
+    if os.path.exists(csv_path) and os.path.getmtime(csv_path) > os.path.getmtime(path):
+        return None
+    return path
+
+def pack_csv(filename, data_dir=None):
+    """
+    Writes a columnar copy of a DATA csv next to it: every csv column as
+    text plus, for timestamped artifacts, the parsed epoch. Later runs read
+    that instead of re-parsing the csv. Returns the written path.
+    """
+    csv_path = os.path.join(data_dir or DATA_DIR, filename)
+    record_type = RECORD_TYPES.get(filename)
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        header = reader.fieldnames or []
+        values = {name: [] for name in header}
+        for row in reader:
+            for name in header:
+                values[name].append(row[name])
+    columns = [(name, "str", values[name]) for name in header]
+    if record_type and "epoch" in record_type.__slots__:
+        times = values.get("time") or [None] * (len(columns[0][2]) if columns else 0)
+        columns.append((EPOCH_COLUMN, "i64", [parse_epoch(t) for t in times]))
+    path = os.path.splitext(csv_path)[0] + columnar_file.EXTENSION
+    return columnar_file.write_columns(path, columns, {"source": filename, "header": header})
+
+def iter_packed_batches(path, batch_size=BATCH_SIZE, record_type=None, start=0, stop=None):
+    """
+    Same batches as iter_csv_batches, read from a columnar copy. Only one
+    batch of each column is decoded at a time and timestamps are not
+    parsed again. start/stop restrict it to that row range.
+    """
+    with columnar_file.open_columns(path) as packed:
+        header = packed.meta.get("header", [n for n in packed.names if n != EPOCH_COLUMN])
+        end = len(packed) if stop is None else min(stop, len(packed))
+        for lo in range(start, end, batch_size):
+            hi = min(lo + batch_size, end)
+            if record_type is None:
+                columns = [packed.column(name, lo, hi) for name in header]
+                yield [dict(zip(header, row)) for row in zip(*columns)]
+                continue
+            missing = [None] * (hi - lo)
+            columns = [
+                packed.column(field, lo, hi) if field in header else missing
+                for field in record_type.FIELDS
+            ]
+            epochs = (
+                packed.column(EPOCH_COLUMN, lo, hi)
+                if EPOCH_COLUMN in packed.names else missing
+            )
+            yield [
+                record_type.from_values(row, epoch)
+                for row, epoch in zip(zip(*columns), epochs)
+            ]
 
 # ---------------- UTIL ----------------
-def read_csv(filename):
-    path = os.path.join(DATA_DIR, filename)
-    data = []
+def iter_csv_batches(filename, batch_size=BATCH_SIZE, typed=True, data_dir=None):
+    """
+    Streams a DATA csv as lists of at most batch_size records,
+    so only one batch is ever held in memory.
+    Known files yield typed records (timestamp parsed once); typed=False
+    or an unknown file yields the raw row dicts.
+    A current columnar copy (see pack_csv) is read instead when present.
+    """
+    path = os.path.join(data_dir or DATA_DIR, filename)
+    record_type = RECORD_TYPES.get(filename) if typed else None
+    packed = packed_path(filename, data_dir)
+    if packed:
+        yield from iter_packed_batches(packed, batch_size, record_type)
+        return
     with open(path, newline="", encoding="utf-8") as f:
         reader = csv.DictReader(f)
+        batch = []
         for row in reader:
-            data.append(row)
+            batch.append(record_type.from_row(row) if record_type else row)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+def read_csv(filename, typed=True, data_dir=None):
+    data = []
+    for batch in iter_csv_batches(filename, typed=typed, data_dir=data_dir):
+        data.extend(batch)
     return data
 
-def pretty(title, items):
-    print(f"\n=== {title} ===")
-    if not items:
-        print("No data found")
+def pretty(title, items, start=1):
+    if not ECHO_RECORDS:
         return
-    for i, it in enumerate(items, 1):
+    if start == 1:
+        print(f"\n=== {title} ===")
+        if not items:
+            print("No data found")
+            return
+    for i, it in enumerate(items, start):
         print(f"{i}. " + ", ".join(f"{k}: {v}" for k, v in it.items()))
 
 # ---------------- MAIN FLOW ----------------
-def extract_all_data():
-    # STEP 1: EXTRACTION
-    calls = read_csv("calls.csv")
-    messages = read_csv("messages.csv")
-    apps = read_csv("apps.csv")
-    locations = read_csv("location.csv")
-
-    pretty("CALL LOGS", calls)
-    pretty("MESSAGES", messages)
-    pretty("APPS", apps)
-    pretty("LOCATIONS", locations)
-
-    # STEP 2: ANALYSIS
-    s_calls = analyze_calls(calls)
-    s_msgs = analyze_messages(messages)
-    s_apps = analyze_apps(apps)
-    s_locations = analyze_location_jumps(locations)
-
-    pretty("SUSPICIOUS CALLS", s_calls)
-    pretty("SUSPICIOUS MESSAGES", s_msgs)
-    pretty("SUSPICIOUS APPS", s_apps)
-    pretty("SUSPICIOUS LOCATIONS", s_locations)
+def stream_artifact(title, filename, stream, on_scanned=None,
+                    batch_size=BATCH_SIZE, backend=None, metrics=None):
+    """
+    Prints and analyzes one artifact file batch by batch.
+    Each batch goes through the rule engine once; the (record, hit) pairs
+    give the flagged records and are handed to on_scanned (the timeline).
+    Reading, analysis and timestamp checks are timed per batch as the
+    extract:/analyze:/anomalies: stages of `metrics`.
+    Returns (row count, flagged records, timestamp anomalies).
+    """
+    backend = backend or load_backend()
+    metrics = metrics or StageRecorder()
+    count = 0
+    flagged = []
+    anomalies = []
+    now = datetime.now()
 
-    # Timestamp integrity checks
-    ts_anomalies = (
-        analyze_timestamp_anomalies(calls) +
-        analyze_timestamp_anomalies(messages) +
-        analyze_timestamp_anomalies(locations)
+    for batch in metrics.iterate(f"extract:{stream}", iter_csv_batches(filename, batch_size)):
+        pretty(title, batch, start=count + 1)
+        count += len(batch)
+        with metrics.stage(f"analyze:{stream}", len(batch)) as s:
+            scanned = backend.scan(stream, batch)
+            hits = [rec for rec, hit in scanned if hit]
+            s.rows_out = len(hits)
+        flagged.extend(hits)
+        if "time" in batch[0]:
+            with metrics.stage(f"anomalies:{stream}", len(batch)) as s:
+                found = backend.analyze_timestamp_anomalies(batch, now=now)
+                s.rows_out = len(found)
+            anomalies.extend(found)
+        if on_scanned:
+            on_scanned(scanned)
+
+    if count == 0:
+        pretty(title, [])
+    return count, flagged, anomalies
+
+def analyze_all(batch_size=BATCH_SIZE, backend="python", metrics=None, workers=1, timeline=None):
+    """
+    Steps 1 + 2 of the pipeline over DATA: every artifact is extracted,
+    printed and analyzed. With workers > 1 each file is split into shards
+    of batch_size rows that are read and analyzed on a process pool
+    (EXTRACTOR.parallel); the output is the same as with one worker.
+    Messages are also clustered into SMS campaigns (ANALYSIS.similarity)
+    and location fixes checked for impossible travel (ANALYSIS.geo) as
+    they stream past.
+    The calls/messages/locations events go to `timeline` (a
+    TIMELINE.timeline.TimelineSpool, if given), with campaign messages
+    HIGH. Returns (counts, suspicious, anomalies, campaigns, jumps): record
+    counts and flagged records per ARTIFACT_FILES stream, the timestamp
+    anomalies, and the campaign and impossible-travel report rows.
+    """
+    metrics = metrics or StageRecorder()
+    pool = None
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        from EXTRACTOR.parallel import stream_artifact_sharded
+        pool = ProcessPoolExecutor(max_workers=workers)
+
+        def artifact(title, filename, stream, on_scanned=None):
+            return stream_artifact_sharded(
+                pool, workers, title, filename, stream, on_scanned, batch_size, backend, metrics
+            )
+    else:
+        analysis = load_backend(backend)
+
+        def artifact(title, filename, stream, on_scanned=None):
+            return stream_artifact(title, filename, stream, on_scanned, batch_size, analysis, metrics)
+
+    clusters = MessageClusters()
+    travel = ImpossibleTravel()
+
+    def calls(scanned):
+        if timeline is not None:
+            timeline.add("calls", scanned)
+
+    def messages(scanned):
+        with metrics.stage("campaigns:messages", len(scanned)) as s:
+            s.rows_out = clusters.update(rec for rec, _ in scanned)
+        if timeline is not None:
+            timeline.add("messages", scanned)
+
+    def locations(scanned):
+        with metrics.stage("jumps:locations", len(scanned)) as s:
+            s.rows_out = travel.update(rec for rec, _ in scanned)
+        if timeline is not None:
+            timeline.add("locations", scanned)
+
+    try:
+        n_calls, s_calls, call_anomalies = artifact("CALL LOGS", "calls.csv", "calls", calls)
+        n_msgs, s_msgs, msg_anomalies = artifact("MESSAGES", "messages.csv", "messages", messages)
+        n_apps, s_apps, _ = artifact("APPS", "apps.csv", "apps")
+        n_locs, s_locations, loc_anomalies = artifact("LOCATIONS", "location.csv", "locations", locations)
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+
+    campaigns = clusters.campaigns()
+    if timeline is not None:
+        timeline.mark("messages", clusters.campaign_keys(campaigns), CAMPAIGN_RULE)
+    return (
+        (n_calls, n_msgs, n_apps, n_locs),
+        (s_calls, s_msgs, s_apps, s_locations),
+        call_anomalies + msg_anomalies + loc_anomalies,
+        [c.as_dict() for c in campaigns],
+        travel.jumps(),
     )
-    pretty("TIMESTAMP ANOMALIES", ts_anomalies)
 
-    # STEP 3: TIMELINE
-    timeline = build_timeline(calls, messages, locations)
+def print_findings(suspicious, anomalies, campaigns, jumps):
+    """suspicious: flagged records per ARTIFACT_FILES stream."""
+    for (_, _, stream), records in zip(ARTIFACT_FILES, suspicious):
+        pretty(f"SUSPICIOUS {stream.upper()}", records)
+    # Timestamp integrity checks
+    pretty("TIMESTAMP ANOMALIES", anomalies)
+    # Near-duplicate texts from several senders
+    pretty("SMS CAMPAIGNS", campaigns)
+    # Consecutive fixes too far apart for the time between them
+    pretty("IMPOSSIBLE TRAVEL", jumps)
+
+def print_summary(counts, suspicious, anomalies, campaigns, jumps):
+    """One line per stream; what --quiet runs print instead of the record dumps."""
+    print("\n=== SUMMARY ===")
+    for (title, _, _), n, records in zip(ARTIFACT_FILES, counts, suspicious):
+        print(f"{title:<12} {n:>10} records {len(records):>10} suspicious")
+    print(f"{'TIMESTAMP ANOMALIES':<20} {len(anomalies):>13}")
+    print(f"{'SMS CAMPAIGNS':<20} {len(campaigns):>13} ({sum(c['size'] for c in campaigns)} messages)")
+    print(f"{'IMPOSSIBLE TRAVEL':<20} {len(jumps):>13}")
+
+def extract_all_data(batch_size=BATCH_SIZE, backend="python", metrics=None, workers=1, pdf_path=None):
+    """
+    Runs the whole pipeline over DATA (see analyze_all for workers).
+    pdf_path also writes the PDF report (REPORT.pdf_report) there.
+    """
+    metrics = metrics or StageRecorder()
+
+    # STEP 1 + 2: EXTRACTION & ANALYSIS (streamed in fixed-size batches)
+    with TimelineSpool() as spool:
+        counts, suspicious, anomalies, campaigns, jumps = analyze_all(
+            batch_size, backend, metrics, workers, timeline=spool
+        )
+        n_calls, n_msgs, n_apps, n_locs = counts
+        s_calls, s_msgs, s_apps, _ = suspicious
+        print_findings(suspicious, anomalies, campaigns, jumps)
+        if not ECHO_RECORDS:
+            print_summary(counts, suspicious, anomalies, campaigns, jumps)
+
+        # STEP 3: TIMELINE (sorted runs spooled to disk, merged lazily for each pass)
+        with metrics.stage("timeline", len(spool)) as s:
+            s.rows_out = print_timeline(spool.merge())
+
+        # STEP 4: REPORT
+        with metrics.stage("report", len(spool)):
+            report_path = report_gen.stream_report(
+                spool.merge(),
+                s_calls,
+                s_msgs,
+                s_apps,
+                n_apps,
+                campaigns=campaigns,
+                jumps=jumps
+            )
+        print(f"\nReport generated successfully: {report_path}")
+
+        if pdf_path:
+            with metrics.stage("report:pdf", len(spool)):
+                write_pdf_report(
+                    pdf_path, (n_calls, n_msgs, n_apps, n_locs), (s_calls, s_msgs, s_apps, campaigns, jumps),
+                    spool.merge()
+                )
+            print(f"PDF report generated successfully: {pdf_path}")
+
+def print_timeline(timeline):
+    """Prints every event (only counts them when quiet); returns how many there were."""
+    if not ECHO_RECORDS:
+        return sum(1 for _ in timeline)
     print("\n=== TIMELINE (Chronological) ===")
+    i = 0
     for i, e in enumerate(timeline, 1):
         sev = e.get("severity", "NORMAL")
         typ = e.get("type", "EVENT")
         print(f"{i}. [{typ}] [{sev}] {e['time']} -> {e['event']}")
+    return i
+
+# ---------------- INCREMENTAL CASE FLOW ----------------
+# (title, csv file, stream)
+ARTIFACT_FILES = [
+    ("CALL LOGS", "calls.csv", "calls"),
+    ("MESSAGES", "messages.csv", "messages"),
+    ("APPS", "apps.csv", "apps"),
+    ("LOCATIONS", "location.csv", "locations"),
+]
+
+def extract_case(case_db, batch_size=BATCH_SIZE, backend="python", metrics=None, pdf_path=None):
+    """
+    Same pipeline as extract_all_data, backed by a persistent case store.
+    Only rows appended to the DATA csvs since the previous run are read,
+    printed and analyzed; findings, anomalies and the timeline come from
+    the store's indexes.
+    """
+    backend = load_backend(backend)
+    metrics = metrics or StageRecorder()
 
-    # STEP 4: REPORT
-    report_path = report_gen.generate_report(
-        calls,
-        messages,
-        apps,
-        locations,
-        s_calls,
-        s_msgs,
-        s_apps,
-        timeline
+    def scan(stream, batch):
+        with metrics.stage(f"analyze:{stream}", len(batch)) as s:
+            scanned = backend.scan(stream, batch)
+            s.rows_out = sum(1 for _, hit in scanned if hit)
+        return scanned
+
+    with CaseStore(case_db) as store:
+        # STEP 1 + 2: INGEST NEW ROWS (analyzed once, on the way in)
+        for title, filename, stream in ARTIFACT_FILES:
+            printed = [0]
+
+            def show(batch, scanned, title=title, printed=printed):
+                pretty(f"NEW {title}", batch, start=printed[0] + 1)
+                printed[0] += len(batch)
+
+            with metrics.stage(f"ingest:{stream}") as s:
+                s.rows_out = store.ingest_csv(
+                    stream, os.path.join(DATA_DIR, filename), scan,
+                    batch_size, on_batch=show
+                )
+            if printed[0] == 0:
+                pretty(f"NEW {title}", [])
+
+        report_case(store, metrics, pdf_path)
+
+def case_findings(store):
+    """(counts, suspicious, anomalies) from the store, laid out like analyze_all's."""
+    now = datetime.now()
+    streams = [stream for _, _, stream in ARTIFACT_FILES]
+    return (
+        tuple(store.count(s) for s in streams),
+        tuple(store.suspicious(s) for s in streams),
+        store.anomalies("calls", now) + store.anomalies("messages", now) + store.anomalies("locations", now),
     )
+
+def case_campaigns(store, batch_size=BATCH_SIZE):
+    """
+    SMS campaigns over every stored message, clustered in one pass in
+    timeline order. Returns (campaign rows, positions of their messages
+    in store.iter_scanned("messages")).
+    """
+    clusters = MessageClusters()
+    batch = []
+    for rec, _ in store.iter_scanned("messages"):
+        batch.append(rec)
+        if len(batch) >= batch_size:
+            clusters.update(batch)
+            batch = []
+    clusters.update(batch)
+    campaigns = clusters.campaigns()
+    return [c.as_dict() for c in campaigns], clusters.campaign_keys(campaigns)
+
+def case_jumps(store):
+    """Impossible-travel rows over every stored location fix."""
+    travel = ImpossibleTravel()
+    travel.update(rec for rec, _ in store.iter_scanned("locations"))
+    return travel.jumps()
+
+def report_case(store, metrics=None, pdf_path=None):
+    """
+    Steps 3 + 4 of extract_case on what the store already holds: findings,
+    anomalies, timeline and reports, without reading the DATA csvs.
+    """
+    metrics = metrics or StageRecorder()
+    counts, suspicious, anomalies = case_findings(store)
+    with metrics.stage("campaigns:messages", counts[1]) as s:
+        campaigns, campaign_messages = case_campaigns(store)
+        s.rows_out = len(campaign_messages)
+    with metrics.stage("jumps:locations", counts[3]) as s:
+        jumps = case_jumps(store)
+        s.rows_out = len(jumps)
+    s_calls, s_msgs, s_apps, _ = suspicious
+    print_findings(suspicious, anomalies, campaigns, jumps)
+    if not ECHO_RECORDS:
+        print_summary(counts, suspicious, anomalies, campaigns, jumps)
+
+    # STEP 3: TIMELINE (each table is read in time order and merged; campaign messages are HIGH)
+    def timeline():
+        return merge_timeline(
+            iter_events("calls", store.iter_scanned("calls")),
+            iter_events("messages", mark_campaigns(store.iter_scanned("messages"), campaign_messages)),
+            iter_events("locations", store.iter_scanned("locations")),
+            presorted=True
+        )
+    with metrics.stage("timeline") as s:
+        s.rows_out = print_timeline(timeline())
+
+    # STEP 4: REPORT (media hashes recorded by EXTRACTOR/media.py go in section 5)
+    media = store.media_hashes()
+    with metrics.stage("report"):
+        report_path = report_gen.stream_report(
+            timeline(), s_calls, s_msgs, s_apps, counts[2], media=media, campaigns=campaigns, jumps=jumps
+        )
+
+    if pdf_path:
+        with metrics.stage("report:pdf"):
+            write_pdf_report(pdf_path, counts, (s_calls, s_msgs, s_apps, campaigns, jumps), timeline(), media=media)
     print(f"\nReport generated successfully: {report_path}")
+    if pdf_path:
+        print(f"PDF report generated successfully: {pdf_path}")
 
 # ---------------- ENTRY ----------------
+def _add_common_options(parser, evidence=True):
+    """Options shared by the run, analyze and report commands; `evidence` adds the input ones."""
+    parser.add_argument(
+        "--quiet", "-q", action="store_true",
+        help="skip the per-record dumps and print a one-line summary per artifact instead"
+    )
+    if evidence:
+        parser.add_argument(
+            "--data-dir", metavar="DIR",
+            help="evidence directory to read (default $ECHELON_DATA_DIR or DATA/)"
+        )
+        parser.add_argument(
+            "--backend", choices=sorted(ANALYSIS_BACKENDS), default="python",
+            help="analysis implementation (default python)"
+        )
+        parser.add_argument(
+            "--chunk-rows", type=int, default=BATCH_SIZE,
+            help=f"rows per batch, and per shard with --workers (default {BATCH_SIZE})"
+        )
+    parser.add_argument(
+        "--metrics", nargs="?", const="-", metavar="JSONL",
+        help="print per-stage timings at the end; with a path, also append every stage run there as JSON lines"
+    )
+    parser.add_argument(
+        "--trace-memory", action="store_true",
+        help="record each stage's peak allocation with tracemalloc (slower)"
+    )
+    parser.add_argument(
+        "--profile", metavar="STAGE",
+        help="run stages matching this pattern (e.g. 'analyze:*') under cProfile and print the hot spots"
+    )
+    parser.add_argument("--profile-dir", help="also dump the cProfile stats of each profiled stage here (.prof)")
+
+def _pdf_option(parser):
+    parser.add_argument(
+        "--pdf", nargs="?", const=os.path.join(BASE_DIR, "REPORT", "forensic_report.pdf"), metavar="PATH",
+        help="also write the PDF report with full findings and timeline tables (default REPORT/forensic_report.pdf)"
+    )
+
+def _workers_option(parser):
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="worker processes that read and analyze shards of each file (0 = one per core; default 1, in-process; ignored with --case)"
+    )
+
+def _start(args):
+    """Applies the common options; returns the StageRecorder to run with."""
+    global DATA_DIR
+    set_quiet(args.quiet)
+    if getattr(args, "data_dir", None):
+        # Also exported, so --workers processes and packed-file lookups see it
+        DATA_DIR = os.environ["ECHELON_DATA_DIR"] = os.path.abspath(args.data_dir)
+    return StageRecorder(
+        jsonl=None if args.metrics in (None, "-") else args.metrics,
+        memory=args.trace_memory, profile=args.profile, profile_dir=args.profile_dir
+    )
+
+def _finish(args, metrics):
+    if args.metrics or args.trace_memory:
+        print("\n=== STAGE METRICS ===")
+        print(format_summary(metrics.summary()))
+    for stage in metrics.profiles:
+        print(f"\n=== PROFILE {stage} ===")
+        print(metrics.profile_report(stage))
+
+def main(argv=None, prog=None):
+    """The full pipeline: extraction, analysis, timeline and reports."""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog=prog, description="Mobile forensics extraction pipeline")
+    parser.add_argument(
+        "--case",
+        help="name of a persistent case (CASES/<name>.db); re-runs only process new rows"
+    )
+    parser.add_argument(
+        "--pack", action="store_true",
+        help="write typed columnar copies of the DATA csvs, read instead of them from then on"
+    )
+    _pdf_option(parser)
+    _workers_option(parser)
+    _add_common_options(parser)
+    args = parser.parse_args(argv)
+
+    metrics = _start(args)
+    if args.pack:
+        for _, filename, _ in ARTIFACT_FILES:
+            print(f"Packed {filename} -> {pack_csv(filename)}")
+    elif args.case:
+        extract_case(case_path(args.case), args.chunk_rows, args.backend, metrics, pdf_path=args.pdf)
+    else:
+        extract_all_data(
+            args.chunk_rows, args.backend, metrics,
+            workers=args.workers or os.cpu_count() or 1, pdf_path=args.pdf
+        )
+    _finish(args, metrics)
+    return 0
+
+def analyze_main(argv=None, prog=None):
+    """Extraction and analysis only: findings and a summary, no timeline or reports."""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog=prog, description="Extract and analyze the evidence; no timeline or reports")
+    _workers_option(parser)
+    _add_common_options(parser)
+    args = parser.parse_args(argv)
+
+    metrics = _start(args)
+    counts, suspicious, anomalies, campaigns, jumps = analyze_all(
+        args.chunk_rows, args.backend, metrics,
+        workers=args.workers or os.cpu_count() or 1
+    )
+    print_findings(suspicious, anomalies, campaigns, jumps)
+    print_summary(counts, suspicious, anomalies, campaigns, jumps)
+    _finish(args, metrics)
+    return 0
+
+def report_main(argv=None, prog=None):
+    """Re-renders the reports of an existing case without re-reading the evidence."""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog=prog, description="Regenerate the reports of an existing case")
+    parser.add_argument("--case", required=True, help="name of a case built by run --case (CASES/<name>.db)")
+    _pdf_option(parser)
+    _add_common_options(parser, evidence=False)
+    args = parser.parse_args(argv)
+
+    db_path = case_path(args.case)
+    if not os.path.exists(db_path):
+        parser.error(f"no such case: {db_path}")
+    metrics = _start(args)
+    with CaseStore(db_path) as store:
+        report_case(store, metrics, args.pdf)
+    _finish(args, metrics)
+    return 0
+
 if __name__ == "__main__":
-    extract_all_data()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""
+Hash-verified media acquisition over adb.
+
+    python EXTRACTOR/media.py --case demo --root /sdcard/DCIM --workers 4
+    ECHELON_ADB=DASHBOARD/stub_adb.py STUB_ADB_MEDIA_DIR=~/Pictures python EXTRACTOR/media.py --case demo
+
+Files under `root` are listed with their size and mtime in one `find`,
+then pulled over several concurrent `adb exec-out` streams. Each file is
+SHA-256 hashed chunk by chunk while it is written to disk, so it is read
+from the device once and never re-read locally.
+
+Transfers land in a `.part` file named after the listed size and mtime.
+An interrupted pull is resumed from the bytes already on disk (`tail -c
++N` on the device); only that local prefix is hashed again. A `.part`
+left by another version of the file is dropped instead of resumed. A file
+whose (path, size, mtime) is already in the case store is skipped without
+transferring. A pulled file whose hash is already stored is recorded as a
+duplicate of that copy and its bytes are not kept twice. A new version of
+a device file never replaces the copy an earlier row points at: it is
+kept next to it under a name suffixed with its hash.
+"""
+import os
+import sys
+
+# Ensure project root is on PYTHONPATH
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import glob
+import hashlib
+import shlex
+import subprocess
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime
+
+from STORE.case_store import CaseStore, case_path
+
+DEFAULT_ROOT = "/sdcard/DCIM"
+# Bytes read from an adb stream (and hashed) at a time
+CHUNK_SIZE = 1 << 20
+PARTIAL_SUFFIX = ".part"
+# Leading SHA-256 hex digits in the name of a further version of a file
+VERSION_DIGITS = 16
+# `stat -c` format of each listing line: size, mtime (epoch s), path
+STAT_FORMAT = "%s %Y %n"
+
+MediaFile = namedtuple("MediaFile", "path size mtime")
+
+
+# ---------------- LISTING ----------------
+def list_command(root):
+    return ["shell", "find", shlex.quote(root), "-type", "f", "-exec", "stat", "-c", shlex.quote(STAT_FORMAT), "{}", "+"]
+
+
+def parse_listing(text):
+    """MediaFile per `stat -c STAT_FORMAT` line; other lines are ignored."""
+    files = []
+    for line in text.splitlines():
+        parts = line.split(" ", 2)
+        if len(parts) == 3 and parts[0].isdigit() and parts[1].isdigit():
+            files.append(MediaFile(parts[2], int(parts[0]), int(parts[1])))
+    return files
+
+
+def list_media(run, root=DEFAULT_ROOT):
+    """run(cmd_list) -> stdout text, e.g. ADBManager.execute."""
+    return parse_listing(run(list_command(root)))
+
+
+# ---------------- TRANSFER ----------------
+def local_path(dest_dir, device_path):
+    """Mirror of the device path under dest_dir."""
+    parts = [p for p in device_path.replace("\\", "/").split("/") if p not in ("", ".", "..")]
+    return os.path.join(dest_dir, *parts)
+
+
+def pull_command(device_path, offset=0):
+    return ["exec-out", "tail", "-c", f"+{offset + 1}", shlex.quote(device_path)]
+
+
+def part_path(dest, media):
+    """Transfer file of this version (size, mtime) of a device file."""
+    return f"{dest}.{media.size}-{media.mtime}{PARTIAL_SUFFIX}"
+
+
+def version_path(dest, sha256):
+    """Name of a further version of dest, e.g. a.<sha256 prefix>.jpg."""
+    stem, ext = os.path.splitext(dest)
+    return f"{stem}.{sha256[:VERSION_DIGITS]}{ext}"
+
+
+def _drop_stale_parts(dest, part):
+    # Transfers of other versions of the same device file can't be resumed
+    for path in glob.glob(glob.escape(dest) + ".*-*" + PARTIAL_SUFFIX):
+        if path != part:
+            os.remove(path)
+
+
+def _hash_prefix(path, h, chunk_size):
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+
+
+def pull(open_stream, media, part, chunk_size=CHUNK_SIZE):
+    """
+    Streams one device file into `part` (see part_path), hashing every
+    chunk as it arrives. open_stream(cmd_list) is a context manager
+    yielding the binary stdout of an adb command. Returns (sha256 hex,
+    bytes transferred); the complete file is left at `part` for the
+    caller to keep or drop. Raises OSError if fewer bytes than listed
+    arrived; the .part file is kept so the next attempt resumes where
+    this one stopped.
+    """
+    os.makedirs(os.path.dirname(part), exist_ok=True)
+    h = hashlib.sha256()
+    offset = os.path.getsize(part) if os.path.exists(part) else 0
+    if offset > media.size:
+        # Not a prefix of this version; start over
+        os.remove(part)
+        offset = 0
+    elif offset:
+        _hash_prefix(part, h, chunk_size)
+
+    received = offset
+    with open_stream(pull_command(media.path, offset)) as src, open(part, "ab") as out:
+        while received < media.size:
+            chunk = src.read(min(chunk_size, media.size - received))
+            if not chunk:
+                break
+            h.update(chunk)
+            out.write(chunk)
+            received += len(chunk)
+    if received != media.size:
+        raise OSError(f"{media.path}: received {received} of {media.size} bytes")
+    return h.hexdigest(), received - offset
+
+
+def _keep(store, part, dest, sha256):
+    # Move a pulled file to dest, or beside it if dest is already taken
+    if os.path.exists(dest) or store.media_at(dest):
+        dest = version_path(dest, sha256)
+    os.replace(part, dest)
+    return dest
+
+
+def acquire_media(store, run, open_stream, dest_dir, root=DEFAULT_ROOT, workers=4,
+                  chunk_size=CHUNK_SIZE, on_progress=None):
+    """
+    Pulls every file under `root` not yet in `store` (a CaseStore) into
+    dest_dir on `workers` concurrent streams and records its SHA-256.
+    All store writes happen on the calling thread.
+    on_progress(media, status, done, total) is called there as each file
+    finishes; status is "new", "duplicate", "skipped" or "failed: <error>".
+    Returns a status -> count summary plus "bytes" transferred.
+    """
+    files = list_media(run, root)
+    summary = {"new": 0, "duplicate": 0, "skipped": 0, "failed": 0, "bytes": 0}
+    pending = []
+    for media in files:
+        if store.media_acquired(media.path, media.size, media.mtime):
+            summary["skipped"] += 1
+            if on_progress: on_progress(media, "skipped", summary["skipped"], len(files))
+        else:
+            pending.append(media)
+
+    done = summary["skipped"]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {}
+        for media in pending:
+            dest = local_path(dest_dir, media.path)
+            part = part_path(dest, media)
+            _drop_stale_parts(dest, part)
+            futures[pool.submit(pull, open_stream, media, part, chunk_size)] = (media, dest, part)
+        for future in as_completed(futures):
+            media, dest, part = futures[future]
+            done += 1
+            try:
+                sha256, transferred = future.result()
+            except Exception as e:
+                summary["failed"] += 1
+                if on_progress: on_progress(media, f"failed: {e}", done, len(files))
+                continue
+            summary["bytes"] += transferred
+            original = store.media_with_hash(sha256)
+            acquired = datetime.now().isoformat(timespec="seconds")
+            if original:
+                os.remove(part)
+                store.add_media(media.path, media.size, media.mtime, sha256, original[1], acquired, original[0])
+                status = "duplicate"
+            else:
+                dest = _keep(store, part, dest, sha256)
+                store.add_media(media.path, media.size, media.mtime, sha256, dest, acquired)
+                status = "new"
+            summary[status] += 1
+            if on_progress: on_progress(media, status, done, len(files))
+    return summary
+
+
+def media_dir(db_path):
+    """Pulled files live next to the case db."""
+    return os.path.splitext(db_path)[0] + "_media"
+
+
+# ---------------- PLAIN ADB ----------------
+class Adb:
+    """subprocess adb for running this module without the dashboard."""
+    def __init__(self, adb_path, serial=None):
+        self.adb_path = adb_path
+        self.serial = serial
+
+    def command(self, cmd_list):
+        return [self.adb_path] + (["-s", self.serial] if self.serial else []) + cmd_list
+
+    def run(self, cmd_list):
+        return subprocess.run(self.command(cmd_list), capture_output=True, text=True, errors="ignore").stdout
+
+    @contextmanager
+    def open_stream(self, cmd_list):
+        proc = subprocess.Popen(self.command(cmd_list), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        try:
+            yield proc.stdout
+        finally:
+            proc.stdout.close()
+            proc.kill()
+            proc.wait()
+
+
+# ---------------- ENTRY ----------------
+def main(argv=None, prog=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog=prog, description="Pull and hash device media into a case")
+    parser.add_argument("--case", required=True, help="case name (CASES/<name>.db)")
+    parser.add_argument("--root", default=DEFAULT_ROOT, help=f"device directory to acquire (default {DEFAULT_ROOT})")
+    parser.add_argument("--adb", default=os.environ.get("ECHELON_ADB", "adb"), help="adb binary (default $ECHELON_ADB or adb)")
+    parser.add_argument("--serial", default=os.environ.get("ECHELON_SERIAL"))
+    parser.add_argument("--workers", type=int, default=4, help="concurrent adb streams (default 4)")
+    args = parser.parse_args(argv)
+
+    adb = Adb(args.adb, args.serial)
+    db_path = case_path(args.case)
+
+    def show(media, status, done, total):
+        print(f"[{done}/{total}] {status.upper()}: {media.path} ({media.size} bytes)")
+
+    with CaseStore(db_path) as store:
+        summary = acquire_media(store, adb.run, adb.open_stream, media_dir(db_path), args.root, args.workers, on_progress=show)
+    print(
+        f"\n{summary['new']} new, {summary['duplicate']} duplicate, {summary['skipped']} already acquired, "
+        f"{summary['failed']} failed; {summary['bytes']} bytes transferred"
+    )
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
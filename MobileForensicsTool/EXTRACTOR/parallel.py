@@ -0,0 +1,169 @@
+"""
+Process-pool mode for the extraction pipeline.
+
+Each artifact file is cut into shards of whole rows (byte ranges of the
+csv, or row ranges of its columnar copy). Worker processes read, type,
+scan and anomaly-check their own shard, so parsing and analysis both use
+every core. Results come back in shard order, so printed output, flagged
+records, anomalies and the timeline are identical to the in-process path.
+
+    python EXTRACTOR/extractor.py --workers 32 --chunk-rows 50000
+"""
+import csv
+import io
+import os
+from collections import deque
+from datetime import datetime
+from itertools import islice
+
+from ANALYSIS.records import RECORD_TYPES
+from EXTRACTOR.extractor import BATCH_SIZE, DATA_DIR, iter_packed_batches, load_backend, packed_path, pretty
+from METRICS.stages import StageRecorder
+from STORE import columnar_file
+
+# Shards submitted ahead of the one being consumed, per worker
+PREFETCH = 2
+
+
+# ---------------- SHARD PLANNING ----------------
+def plan_csv_shards(path, shard_rows):
+    """
+    (start byte, stop byte, rows) of consecutive groups of shard_rows csv
+    rows, header excluded. Offsets are taken after whole csv records, so
+    quoted fields spanning lines never straddle two shards.
+    """
+    shards = []
+    with open(path, "rb") as f:
+        lines = (line.decode("utf-8") for line in iter(f.readline, b""))
+        # csv.reader pulls whole lines only as needed, so f.tell() after
+        # a row is exactly where the next row starts
+        reader = csv.reader(lines)
+        if next(reader, None) is None:
+            return shards
+        start, rows = f.tell(), 0
+        for _ in reader:
+            rows += 1
+            if rows == shard_rows:
+                stop = f.tell()
+                shards.append((start, stop, rows))
+                start, rows = stop, 0
+        if rows:
+            shards.append((start, f.tell(), rows))
+    return shards
+
+
+def plan_shards(filename, shard_rows, data_dir=None):
+    """
+    Shards of one DATA file as (kind, path, start, stop, rows) tuples:
+    row ranges of its columnar copy when there is a current one, else
+    byte ranges of the csv.
+    """
+    packed = packed_path(filename, data_dir)
+    if packed:
+        with columnar_file.open_columns(packed) as f:
+            total = len(f)
+        return [
+            ("packed", packed, start, min(start + shard_rows, total), min(shard_rows, total - start))
+            for start in range(0, total, shard_rows)
+        ]
+    path = os.path.join(data_dir or DATA_DIR, filename)
+    return [("csv", path, start, stop, rows) for start, stop, rows in plan_csv_shards(path, shard_rows)]
+
+
+# ---------------- WORKER ----------------
+def read_shard(shard, record_type):
+    kind, path, start, stop, rows = shard
+    if kind == "packed":
+        return [rec for batch in iter_packed_batches(path, rows or 1, record_type, start, stop) for rec in batch]
+    with open(path, newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f), [])
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(stop - start).decode("utf-8")
+    reader = csv.DictReader(io.StringIO(text, newline=""), fieldnames=header)
+    return [record_type.from_row(row) for row in reader]
+
+
+def analyze_shard(backend_name, filename, stream, shard, now, memory=False):
+    """
+    Runs in a worker process. Returns the shard's records as value tuples
+    (FIELDS order) with their epochs, the rule hit of each record, the
+    positions of timestamp anomalies and the worker's stage timings.
+    """
+    backend = load_backend(backend_name)
+    record_type = RECORD_TYPES[filename]
+    metrics = StageRecorder(memory=memory)
+    try:
+        with metrics.stage(f"extract:{stream}") as s:
+            batch = read_shard(shard, record_type)
+            s.rows_out = len(batch)
+        with metrics.stage(f"analyze:{stream}", len(batch)) as s:
+            hits = [hit for _, hit in backend.scan(stream, batch)]
+            s.rows_out = sum(1 for hit in hits if hit)
+        anomalies = []
+        if batch and "time" in batch[0]:
+            with metrics.stage(f"anomalies:{stream}", len(batch)) as s:
+                found = {id(rec) for rec in backend.analyze_timestamp_anomalies(batch, now=now)}
+                anomalies = [i for i, rec in enumerate(batch) if id(rec) in found]
+                s.rows_out = len(anomalies)
+    finally:
+        metrics.close()
+
+    has_epoch = "epoch" in record_type.__slots__
+    values = [tuple(getattr(rec, field) for field in record_type.FIELDS) for rec in batch]
+    epochs = [rec.epoch for rec in batch] if has_epoch else None
+    timings = [{**t, "thread": f"pid {os.getpid()}"} for t in metrics.records()]
+    return values, epochs, hits, anomalies, timings
+
+
+# ---------------- DRIVER ----------------
+def iter_ordered(pool, fn, tasks, prefetch):
+    """
+    pool.submit(fn, *task) for each task, yielding results in task order
+    with at most `prefetch` tasks in flight.
+    """
+    tasks = iter(tasks)
+    pending = deque(pool.submit(fn, *task) for task in islice(tasks, prefetch))
+    while pending:
+        result = pending.popleft().result()
+        pending.extend(pool.submit(fn, *task) for task in islice(tasks, 1))
+        yield result
+
+
+def stream_artifact_sharded(pool, workers, title, filename, stream, on_scanned=None,
+                            shard_rows=None, backend="python", metrics=None, data_dir=None):
+    """
+    stream_artifact on a process pool: one shard per task, merged back in
+    file order. Returns (row count, flagged records, timestamp anomalies).
+    """
+    metrics = metrics or StageRecorder()
+    record_type = RECORD_TYPES[filename]
+    now = datetime.now()
+
+    with metrics.stage(f"shards:{stream}") as s:
+        shards = plan_shards(filename, shard_rows or BATCH_SIZE, data_dir)
+        s.rows_out = len(shards)
+    tasks = ((backend, filename, stream, shard, now, metrics.memory) for shard in shards)
+
+    count = 0
+    flagged = []
+    anomalies = []
+    for values, epochs, hits, positions, timings in iter_ordered(pool, analyze_shard, tasks, workers * PREFETCH):
+        for t in timings:
+            metrics.record(t["stage"], t["rows_in"], t["rows_out"], t["wall_s"], t["cpu_s"],
+                           t["peak_bytes"], t["thread"])
+        batch = [
+            record_type.from_values(row, epoch)
+            for row, epoch in zip(values, epochs or [None] * len(values))
+        ]
+        pretty(title, batch, start=count + 1)
+        count += len(batch)
+        scanned = list(zip(batch, hits))
+        flagged.extend(rec for rec, hit in scanned if hit)
+        anomalies.extend(batch[i] for i in positions)
+        if on_scanned:
+            on_scanned(scanned)
+
+    if count == 0:
+        pretty(title, [])
+    return count, flagged, anomalies
@@ -0,0 +1,294 @@
+"""
+Per-stage instrumentation for the pipeline.
+
+    metrics = StageRecorder(jsonl="run.jsonl", memory=True, profile="analyze:*")
+    with metrics.stage("analyze:calls", rows_in=len(batch)) as s:
+        s.rows_out = len(backend.analyze_calls(batch))
+    for batch in metrics.iterate("extract:calls.csv", iter_csv_batches("calls.csv")):
+        ...
+
+Every stage records wall time, CPU time, rows in/out and, when memory
+tracing is on, the peak tracemalloc allocation above what was live when
+the stage started. A stage may run many times (once per batch); summary()
+folds runs of the same name into one row.
+
+CPU time is the process clock on the main thread and the thread clock on
+any other thread, so stages running concurrently in a pool do not count
+each other's work.
+
+Stages whose name matches `profile` (fnmatch pattern) run under cProfile;
+their stats are kept per stage and can be printed or dumped to .prof files.
+"""
+import fnmatch
+import io
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+
+class Stage:
+    __slots__ = ("name", "rows_in", "rows_out", "wall_s", "cpu_s", "peak_bytes", "started", "thread",
+                 "_live", "_peak")
+
+    def __init__(self, name, rows_in=None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.wall_s = self.cpu_s = 0.0
+        self.peak_bytes = None
+        self.started = time.time()
+        self.thread = threading.current_thread().name
+        self._live = self._peak = 0
+
+    def as_dict(self):
+        return {
+            "stage": self.name, "rows_in": self.rows_in, "rows_out": self.rows_out,
+            "wall_s": round(self.wall_s, 6), "cpu_s": round(self.cpu_s, 6),
+            "peak_bytes": self.peak_bytes, "started": round(self.started, 3), "thread": self.thread,
+        }
+
+
+def _cpu_clock():
+    if threading.current_thread() is threading.main_thread():
+        return time.process_time
+    return time.thread_time
+
+
+class _StageContext:
+    def __init__(self, recorder, stage):
+        self.recorder = recorder
+        self.stage = stage
+
+    def __enter__(self):
+        recorder, stage = self.recorder, self.stage
+        recorder._open(stage)
+        self._profiler = recorder._start_profile(stage.name)
+        self._clock = _cpu_clock()
+        self._cpu = self._clock()
+        self._wall = time.perf_counter()
+        return stage
+
+    def __exit__(self, *exc):
+        stage = self.stage
+        stage.wall_s = time.perf_counter() - self._wall
+        stage.cpu_s = self._clock() - self._cpu
+        if self._profiler is not None:
+            self.recorder._stop_profile(stage.name, self._profiler)
+        self.recorder._close(stage)
+        return False
+
+
+class StageRecorder:
+    """Collects Stage records; safe to share between threads."""
+
+    def __init__(self, jsonl=None, memory=False, profile=None, profile_dir=None, on_stage=None):
+        self.jsonl = jsonl
+        self.memory = memory
+        self.profile = profile
+        self.profile_dir = profile_dir
+        self.on_stage = on_stage
+        self.stages = []
+        self.profiles = {}
+        self._lock = threading.Lock()
+        self._active = []
+        self._profiling = threading.local()
+        self._started_tracing = memory and not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+
+    def trace_memory(self, enabled):
+        """Turns peak-memory recording on or off for stages started from now on."""
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        elif not enabled:
+            self.close()
+        self.memory = enabled
+
+    # ---------------- RECORDING ----------------
+    def stage(self, name, rows_in=None):
+        """Context manager timing one run of `name`; set .rows_out on the yielded Stage."""
+        return _StageContext(self, Stage(name, rows_in))
+
+    def timed(self, name, rows_in=len, rows_out=len):
+        """
+        Decorator form of stage(). rows_in is called with the first
+        argument and rows_out with the result (None to skip either).
+        """
+        def wrap(fn):
+            def run(*args, **kwargs):
+                n_in = _count(rows_in, args[0]) if rows_in and args else None
+                with self.stage(name, n_in) as s:
+                    out = fn(*args, **kwargs)
+                    s.rows_out = _count(rows_out, out) if rows_out else None
+                return out
+            run.__name__, run.__doc__ = fn.__name__, fn.__doc__
+            return run
+        return wrap
+
+    def iterate(self, name, iterable):
+        """
+        Yields from iterable, timing each step as one run of `name`
+        (rows_out is the length of each item, e.g. a batch).
+        """
+        it = iter(iterable)
+        while True:
+            with self.stage(name) as s:
+                try:
+                    item = next(it)
+                except StopIteration:
+                    s.rows_out = 0
+                    break
+                s.rows_out = _count(len, item)
+            yield item
+
+    def record(self, name, rows_in=None, rows_out=None, wall_s=0.0, cpu_s=0.0, peak_bytes=None, thread=None):
+        """Adds a run measured elsewhere, e.g. in a worker process."""
+        stage = Stage(name, rows_in)
+        stage.rows_out, stage.wall_s, stage.cpu_s, stage.peak_bytes = rows_out, wall_s, cpu_s, peak_bytes
+        if thread is not None:
+            stage.thread = thread
+        self._close(stage)
+        return stage
+
+    def _open(self, stage):
+        if not self.memory or not tracemalloc.is_tracing():
+            return
+        with self._lock:
+            live, peak = tracemalloc.get_traced_memory()
+            for outer in self._active:
+                outer._peak = max(outer._peak, peak)
+            tracemalloc.reset_peak()
+            stage._live = stage._peak = live
+            self._active.append(stage)
+
+    def _close(self, stage):
+        with self._lock:
+            if stage in self._active and not tracemalloc.is_tracing():
+                # Tracing was switched off while the stage ran
+                self._active.remove(stage)
+            elif stage in self._active:
+                peak = tracemalloc.get_traced_memory()[1]
+                for outer in self._active:
+                    outer._peak = max(outer._peak, peak)
+                tracemalloc.reset_peak()
+                self._active.remove(stage)
+                stage.peak_bytes = stage._peak - stage._live
+            self.stages.append(stage)
+        if self.jsonl:
+            with self._lock, open(self.jsonl, "a", encoding="utf-8") as f:
+                f.write(json.dumps(stage.as_dict()) + "\n")
+        if self.on_stage:
+            self.on_stage(stage)
+
+    # ---------------- PROFILING ----------------
+    def _start_profile(self, name):
+        # One profiler per thread at a time; a nested match is folded into the outer one
+        if not self.profile or not fnmatch.fnmatchcase(name, self.profile):
+            return None
+        if getattr(self._profiling, "active", False):
+            return None
+        # Imported here: profiling is opt-in and pstats is slow to import
+        import cProfile
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler (e.g. an outer cProfile run) already owns this thread
+            return None
+        self._profiling.active = True
+        return profiler
+
+    def _stop_profile(self, name, profiler):
+        import pstats
+
+        profiler.disable()
+        self._profiling.active = False
+        with self._lock:
+            stats = self.profiles.get(name)
+            if stats is None:
+                self.profiles[name] = pstats.Stats(profiler)
+            else:
+                stats.add(profiler)
+            if self.profile_dir:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                self.profiles[name].dump_stats(os.path.join(self.profile_dir, _file_name(name) + ".prof"))
+
+    def profile_report(self, name, sort="cumulative", limit=25):
+        """pstats listing of a profiled stage, or None if it was not profiled."""
+        with self._lock:
+            stats = self.profiles.get(name)
+            if stats is None:
+                return None
+            out = io.StringIO()
+            stats.stream = out
+            stats.sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    # ---------------- RESULTS ----------------
+    def records(self):
+        with self._lock:
+            return [s.as_dict() for s in self.stages]
+
+    def summary(self):
+        """One row per stage name, in first-seen order: totals, run count and largest peak."""
+        rows = {}
+        with self._lock:
+            stages = list(self.stages)
+        for s in stages:
+            row = rows.get(s.name)
+            if row is None:
+                row = rows[s.name] = {
+                    "stage": s.name, "runs": 0, "rows_in": None, "rows_out": None,
+                    "wall_s": 0.0, "cpu_s": 0.0, "peak_bytes": None,
+                }
+            row["runs"] += 1
+            row["wall_s"] += s.wall_s
+            row["cpu_s"] += s.cpu_s
+            for key in ("rows_in", "rows_out"):
+                value = getattr(s, key)
+                if value is not None:
+                    row[key] = (row[key] or 0) + value
+            if s.peak_bytes is not None:
+                row["peak_bytes"] = max(row["peak_bytes"] or 0, s.peak_bytes)
+        for row in rows.values():
+            row["wall_s"], row["cpu_s"] = round(row["wall_s"], 6), round(row["cpu_s"], 6)
+        return list(rows.values())
+
+    def clear(self):
+        with self._lock:
+            self.stages.clear()
+            self.profiles.clear()
+
+    def close(self):
+        """Stops memory tracing if this recorder started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+
+def _count(fn, value):
+    try:
+        return fn(value)
+    except TypeError:
+        return None
+
+
+def _file_name(stage):
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in stage)
+
+
+def format_summary(rows):
+    """Fixed-width text table of summary() rows."""
+    lines = [f"{'STAGE':<32} {'RUNS':>6} {'ROWS IN':>10} {'ROWS OUT':>10} {'WALL s':>9} {'CPU s':>9} {'PEAK MiB':>9}"]
+    for r in rows:
+        rows_in, rows_out = ("" if n is None else n for n in (r["rows_in"], r["rows_out"]))
+        peak = "" if r["peak_bytes"] is None else f"{r['peak_bytes'] / 1048576:.1f}"
+        lines.append(
+            f"{r['stage']:<32} {r['runs']:>6} {rows_in:>10} {rows_out:>10} "
+            f"{r['wall_s']:>9.4f} {r['cpu_s']:>9.4f} {peak:>9}"
+        )
+    return "\n".join(lines)
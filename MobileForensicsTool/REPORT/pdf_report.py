@@ -0,0 +1,373 @@
+"""
+Paged PDF report engine.
+
+Renders the same findings model as the text report (FINDINGS and
+TIMELINE_COLUMNS in REPORT.report_generator) as tables. Pages are
+compressed and written to the file as soon as they are full, so memory
+does not grow with the number of rows; only one small integer per PDF
+object is kept for the cross-reference table.
+
+Text uses the PDF base-14 Helvetica fonts (nothing is embedded); their
+glyph widths are tabulated here so cell text can be clipped to its column
+without a font library. Column positions, the font and resource objects
+and the repeated table header are computed once and reused on every page.
+"""
+import zlib
+from bisect import bisect_right
+from datetime import datetime
+from functools import lru_cache
+from itertools import accumulate
+
+from REPORT.report_generator import (
+    FINDINGS, MEDIA_COLUMNS, TIMELINE_COLUMNS, finding_cells, findings_summary_rows, media_cells, overview_rows,
+    timeline_cells
+)
+
+# A4 portrait, in points
+PAGE_WIDTH, PAGE_HEIGHT = 595.28, 841.89
+MARGIN = 36
+FOOTER_HEIGHT = 20
+FONT_SIZE = 8
+ROW_HEIGHT = 11
+CELL_PADDING = 3
+
+ACCENT = (1.0, 0.29, 0.29)
+BAND = (0.12, 0.12, 0.12)
+ZEBRA = (0.94, 0.94, 0.94)
+BLACK = (0, 0, 0)
+WHITE = (1, 1, 1)
+
+# Helvetica / Helvetica-Bold advance widths (1/1000 em) for ' ' .. '~'
+_REGULAR = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+_BOLD = (
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+)
+# Glyphs outside printable ASCII are measured as this
+_DEFAULT_WIDTH = 556
+# Widths in units of 4/1000 em fit in a byte, so a cp1252-encoded string
+# is measured with one bytes.translate() instead of a lookup per character
+_UNIT = 4
+
+
+def _width_table(widths):
+    table = [round(_DEFAULT_WIDTH / _UNIT)] * 256
+    for i, w in enumerate(widths):
+        table[32 + i] = round(w / _UNIT)
+    return bytes(table)
+
+
+_WIDTHS = {False: _width_table(_REGULAR), True: _width_table(_BOLD)}
+_MAX_WIDTH = max(_REGULAR + _BOLD)
+_MIN_WIDTH = min(_REGULAR + _BOLD)
+_ELLIPSIS = "..."
+
+_ESCAPES = str.maketrans({"\\": "\\\\", "(": "\\(", ")": "\\)", "\r": " ", "\n": " ", "\t": " "})
+
+
+def _advances(text, bold):
+    return text.encode("cp1252", "replace").translate(_WIDTHS[bold])
+
+
+def text_width(text, size, bold=False):
+    return sum(_advances(text, bold)) * _UNIT * size / 1000
+
+
+def clip(text, width, size, bold=False):
+    """Longest prefix of text (plus "...") that fits in width points."""
+    if len(text) * _MAX_WIDTH * size / 1000 <= width:
+        return text
+    limit = width * 1000 / size / _UNIT
+    # No glyph is narrower than _MIN_WIDTH, so nothing past this can fit
+    head = text[:int(limit * _UNIT // _MIN_WIDTH) + 1]
+    advances = _advances(head, bold)
+    if len(head) == len(text) and sum(advances) <= limit:
+        return text
+    room = limit - 3 * _WIDTHS[bold][ord(".")]
+    return head[:bisect_right(list(accumulate(advances)), room)] + _ELLIPSIS
+
+
+def wrap(text, width, size, bold=False):
+    """Splits text into lines of at most width points, at spaces where possible."""
+    lines = []
+    for paragraph in str(text).splitlines() or [""]:
+        line = ""
+        for word in paragraph.split(" "):
+            candidate = f"{line} {word}" if line else word
+            if line and text_width(candidate, size, bold) > width:
+                lines.append(line)
+                line = word
+            else:
+                line = candidate
+        lines.append(line)
+    return lines
+
+
+def _pdf_string(text):
+    return "(" + text.translate(_ESCAPES) + ")"
+
+
+@lru_cache(maxsize=None)
+def _color(rgb):
+    return " ".join(f"{c:.3f}" for c in rgb)
+
+
+class PdfWriter:
+    """
+    Minimal PDF 1.4 writer. Drawing calls append operators to the current
+    page; end_page() compresses them and writes the page straight to disk.
+    y coordinates are measured from the top of the page.
+    """
+    CATALOG, PAGES, FONT, FONT_BOLD, RESOURCES = 1, 2, 3, 4, 5
+
+    def __init__(self, path, title="Forensic Report"):
+        self.path = path
+        self.f = open(path, "wb")
+        self.offsets = [0] * (self.RESOURCES + 1)
+        self.page_ids = []
+        self.ops = None
+        self.f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._object(self.CATALOG, f"<< /Type /Catalog /Pages {self.PAGES} 0 R >>")
+        for num, name in ((self.FONT, "Helvetica"), (self.FONT_BOLD, "Helvetica-Bold")):
+            self._object(num, f"<< /Type /Font /Subtype /Type1 /BaseFont /{name} /Encoding /WinAnsiEncoding >>")
+        self._object(
+            self.RESOURCES,
+            f"<< /Font << /F1 {self.FONT} 0 R /F2 {self.FONT_BOLD} 0 R >> /ProcSet [/PDF /Text] >>"
+        )
+        self.title = title
+
+    def _reserve(self):
+        self.offsets.append(0)
+        return len(self.offsets) - 1
+
+    def _object(self, num, body, stream=None):
+        self.offsets[num] = self.f.tell()
+        self.f.write(f"{num} 0 obj\n{body}\n".encode("latin-1"))
+        if stream is not None:
+            self.f.write(b"stream\n" + stream + b"\nendstream\n")
+        self.f.write(b"endobj\n")
+
+    # ---------------- PAGES ----------------
+    @property
+    def page_number(self):
+        return len(self.page_ids) + (self.ops is not None)
+
+    def begin_page(self):
+        if self.ops is not None:
+            self.end_page()
+        self.ops = []
+
+    def end_page(self):
+        content = zlib.compress("\n".join(self.ops).encode("cp1252", "replace"), 6)
+        self.ops = None
+        content_id, page_id = self._reserve(), self._reserve()
+        self._object(content_id, f"<< /Length {len(content)} /Filter /FlateDecode >>", content)
+        self._object(
+            page_id,
+            f"<< /Type /Page /Parent {self.PAGES} 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources {self.RESOURCES} 0 R /Contents {content_id} 0 R >>"
+        )
+        self.page_ids.append(page_id)
+
+    # ---------------- DRAWING ----------------
+    def text(self, x, y, text, size=FONT_SIZE, bold=False, color=BLACK):
+        """Draws text with its baseline at y."""
+        font = "F2" if bold else "F1"
+        self.ops.append(
+            f"BT {_color(color)} rg /{font} {size} Tf {x:.2f} {PAGE_HEIGHT - y:.2f} Td {_pdf_string(text)} Tj ET"
+        )
+
+    def rect(self, x, y, w, h, color):
+        """Filled rectangle with its top-left corner at (x, y)."""
+        self.ops.append(f"{_color(color)} rg {x:.2f} {PAGE_HEIGHT - y - h:.2f} {w:.2f} {h:.2f} re f")
+
+    def hline(self, x1, x2, y, color=BLACK, width=0.5):
+        self.ops.append(
+            f"{_color(color)} RG {width} w {x1:.2f} {PAGE_HEIGHT - y:.2f} m {x2:.2f} {PAGE_HEIGHT - y:.2f} l S"
+        )
+
+    def close(self):
+        if self.ops is not None:
+            self.end_page()
+        kids = " ".join(f"{p} 0 R" for p in self.page_ids)
+        self._object(self.PAGES, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>")
+        info = self._reserve()
+        stamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        self._object(info, f"<< /Title {_pdf_string(self.title)} /Producer (ECHELON) /CreationDate (D:{stamp}) >>")
+
+        xref = self.f.tell()
+        self.f.write(f"xref\n0 {len(self.offsets)}\n0000000000 65535 f \n".encode("latin-1"))
+        self.f.write("".join(f"{off:010d} 00000 n \n" for off in self.offsets[1:]).encode("latin-1"))
+        self.f.write(
+            f"trailer\n<< /Size {len(self.offsets)} /Root {self.CATALOG} 0 R /Info {info} 0 R >>\n"
+            f"startxref\n{xref}\n%%EOF\n".encode("latin-1")
+        )
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if not self.f.closed:
+            self.close()
+
+
+class Table:
+    """Column layout computed once: x offsets, widths and the clipped header labels."""
+
+    def __init__(self, labels, weights, width=PAGE_WIDTH - 2 * MARGIN):
+        total = sum(weights)
+        self.widths = [width * w / total for w in weights]
+        self.xs = []
+        x = MARGIN
+        for w in self.widths:
+            self.xs.append(x)
+            x += w
+        self.inner = [w - 2 * CELL_PADDING for w in self.widths]
+        self.labels = [clip(label, inner, FONT_SIZE, True) for label, inner in zip(labels, self.inner)]
+
+
+class PdfReport(PdfWriter):
+    """Flowing report layout: headings, text lines and tables that continue across pages."""
+
+    def __init__(self, path, title="ECHELON FORENSIC AUDIT"):
+        super().__init__(path, title)
+        self.y = 0
+        self.table = None
+
+    def begin_page(self):
+        super().begin_page()
+        self.y = MARGIN
+        self.text(MARGIN, PAGE_HEIGHT - MARGIN / 2, "CONFIDENTIAL - ECHELON MOBILE FORENSICS", 7, True)
+        label = f"Page {self.page_number}"
+        self.text(PAGE_WIDTH - MARGIN - text_width(label, 7), PAGE_HEIGHT - MARGIN / 2, label, 7)
+        if self.table is not None:
+            self._table_header()
+
+    def _room(self, height):
+        if self.ops is None or self.y + height > PAGE_HEIGHT - MARGIN - FOOTER_HEIGHT:
+            self.begin_page()
+
+    def banner(self):
+        self._room(60)
+        self.rect(0, 0, PAGE_WIDTH, 60, BAND)
+        self.text((PAGE_WIDTH - text_width(self.title, 22, True)) / 2, 40, self.title, 22, True, ACCENT)
+        self.y = 80
+
+    def heading(self, text, size=12):
+        self._room(size + 3 * ROW_HEIGHT)
+        self.y += size + 10
+        self.text(MARGIN, self.y, text, size, True)
+        self.y += 4
+        self.hline(MARGIN, PAGE_WIDTH - MARGIN, self.y, ACCENT)
+        self.y += ROW_HEIGHT
+
+    def line(self, text, size=10, bold=False):
+        for part in wrap(text, PAGE_WIDTH - 2 * MARGIN, size, bold):
+            self._room(size + 4)
+            self.y += size + 4
+            self.text(MARGIN, self.y, part, size, bold)
+
+    def gap(self, height=ROW_HEIGHT):
+        self.y += height
+
+    # ---------------- TABLES ----------------
+    def _table_header(self):
+        table = self.table
+        self.rect(MARGIN, self.y, PAGE_WIDTH - 2 * MARGIN, ROW_HEIGHT + 2, BAND)
+        baseline = self.y + ROW_HEIGHT - 2
+        for x, label in zip(table.xs, table.labels):
+            self.text(x + CELL_PADDING, baseline, label, FONT_SIZE, True, WHITE)
+        self.y += ROW_HEIGHT + 2
+
+    def rows(self, table, rows):
+        """
+        Draws rows (iterables of cell strings) under table's header,
+        repeating the header on every page. Rows are consumed lazily.
+        Returns the number of rows drawn.
+        """
+        self._room(3 * ROW_HEIGHT)
+        self.table = table
+        self._table_header()
+        bottom = PAGE_HEIGHT - MARGIN - FOOTER_HEIGHT
+        row_width = PAGE_WIDTH - 2 * MARGIN
+        n = 0
+        for cells in rows:
+            if self.y + ROW_HEIGHT > bottom:
+                self.begin_page()
+            if n % 2:
+                self.rect(MARGIN, self.y, row_width, ROW_HEIGHT, ZEBRA)
+            baseline = self.y + ROW_HEIGHT - 3
+            for x, inner, cell in zip(table.xs, table.inner, cells):
+                if cell:
+                    self.text(x + CELL_PADDING, baseline, clip(cell, inner, FONT_SIZE), FONT_SIZE)
+            self.y += ROW_HEIGHT
+            n += 1
+        self.table = None
+        self.gap()
+        return n
+
+
+# ---------------- REPORT ----------------
+FINDING_TABLES = {
+    section.stream: Table([label for label, _, _, _ in section.columns], [w for _, _, _, w in section.columns])
+    for section in FINDINGS
+}
+TIMELINE_TABLE = Table([label for label, _, _ in TIMELINE_COLUMNS], [w for _, _, w in TIMELINE_COLUMNS])
+MEDIA_TABLE = Table([label for label, _, _ in MEDIA_COLUMNS], [w for _, _, w in MEDIA_COLUMNS])
+
+
+def write_pdf_report(path, counts, findings, timeline, case=(), notes=None, media=()):
+    """
+    Writes the PDF report and returns its path.
+      counts    (calls, messages, apps, locations) record counts
+      findings  (suspicious calls, messages, apps[, SMS campaigns[, impossible travel]]): sized sequences of rows
+      timeline  iterable of timeline events, consumed once
+      case      (label, value) pairs shown under the banner
+      media     acquired media hashes (CaseStore.media_hashes rows)
+    Sections follow the text report: overview, findings summary, one table
+    per FINDINGS section, the timeline, then media integrity.
+    """
+    with PdfReport(path) as pdf:
+        pdf.banner()
+        pdf.heading("1. CASE SUMMARY")
+        for label, value in case:
+            pdf.line(f"{label}: {value}", bold=True)
+        pdf.line(f"Generated On: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", bold=True)
+
+        pdf.heading("2. EXTRACTED DATA OVERVIEW")
+        for label, n in overview_rows(*counts):
+            pdf.line(f"{label}: {n}")
+        pdf.heading("3. SUSPICIOUS FINDINGS SUMMARY")
+        for label, n in findings_summary_rows(*(len(records) for records in findings)):
+            pdf.line(f"{label}: {n}")
+
+        for section, records in zip(FINDINGS, findings):
+            if len(records) == 0:
+                continue
+            pdf.heading(section.heading, 11)
+            pdf.rows(FINDING_TABLES[section.stream], (finding_cells(section, rec) for rec in records))
+
+        pdf.heading("4. TIMELINE RECONSTRUCTION")
+        if not pdf.rows(TIMELINE_TABLE, (timeline_cells(e) for e in timeline)):
+            pdf.line("No timeline events.")
+
+        pdf.heading("5. EVIDENCE INTEGRITY")
+        if not pdf.rows(MEDIA_TABLE, (media_cells(m) for m in media)):
+            pdf.line("No media files acquired.")
+
+        if notes:
+            pdf.heading("6. CASE NOTES")
+            pdf.line(notes)
+    return path
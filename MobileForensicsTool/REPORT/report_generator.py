@@ -1,104 +1,242 @@
 import os
+import shutil
+import tempfile
+from collections import Counter, namedtuple
 from datetime import datetime
 
-def generate_report(
-    calls, messages, apps, locations,
-    suspicious_calls, suspicious_messages, suspicious_apps,
-    timeline
-):
-    """
-    Generates a clean, professional Mobile Forensics Investigation Report.
-    Output: REPORT/forensic_report.txt
-    """
+# Write buffer for the streaming report (bytes)
+STREAM_BUFFER_SIZE = 1 << 20
+
+# ---------------- FINDINGS MODEL ----------------
+# Shared by this text report and the PDF tables (REPORT.pdf_report).
+# columns: (label, record field, suffix, relative PDF column width)
+FindingSection = namedtuple("FindingSection", "stream heading summary columns")
+
+FINDINGS = [
+    FindingSection("calls", "3.1 Suspicious Call Details", "Suspicious Calls", (
+        ("Number", "number", "", 3), ("Time", "time", "", 3), ("Duration", "duration", " sec", 2),
+    )),
+    FindingSection("messages", "3.2 Suspicious Message Details", "Suspicious Messages", (
+        ("Sender", "sender", "", 2), ("Time", "time", "", 2), ("Content", "message", "", 6),
+    )),
+    FindingSection("apps", "3.3 Suspicious Application Details", "Suspicious Apps", (
+        ("App Name", "app_name", "", 3), ("Permission", "permission", "", 2),
+    )),
+    # Rows are ANALYSIS.similarity Cluster.as_dict()
+    FindingSection("campaigns", "3.4 SMS Campaign Clusters", "SMS Campaigns", (
+        ("Messages", "size", "", 1.4), ("Senders", "senders", "", 1.3), ("Top Senders", "top_senders", "", 2.6),
+        ("First Seen", "first", "", 2.2), ("Last Seen", "last", "", 2.2), ("Span", "span", "", 1.9),
+        ("Sample", "sample", "", 4.6),
+    )),
+    # Rows are ANALYSIS.geo ImpossibleTravel.jumps()
+    FindingSection("jumps", "3.5 Impossible Travel", "Impossible Travel", (
+        ("From", "from", "", 2.2), ("To", "to", "", 2.2), ("From Position", "from_position", "", 2.6),
+        ("To Position", "to_position", "", 2.6), ("Distance", "distance", "", 1.6), ("Gap", "gap", "", 1.2),
+        ("Speed", "speed", "", 1.8),
+    )),
+]
+
+# (label, event key, relative PDF column width)
+TIMELINE_COLUMNS = (
+    ("Time", "time", 2), ("Type", "type", 1.2), ("Severity", "severity", 1.2), ("Event", "event", 7),
+)
+
+# Acquired media files (CaseStore.media_hashes rows) for the integrity section
+MEDIA_COLUMNS = (
+    ("SHA-256", "sha256", 8), ("Bytes", "size", 1.1), ("Device Path", "device_path", 3), ("Note", "note", 1.4),
+)
+
+def media_cells(m):
+    note = f"duplicate of #{m['duplicate_of']}" if m.get('duplicate_of') else ""
+    return [f"{m['sha256']}", f"{m['size']}", f"{m['device_path']}", note]
 
+def finding_cells(section, rec):
+    return [f"{rec[field]}{suffix}" for _, field, suffix, _ in section.columns]
+
+def timeline_cells(e):
+    return [
+        f"{e['time']}", f"{e.get('type', 'EVENT')}", f"{e.get('severity', 'NORMAL')}", f"{e['event']}"
+    ]
+
+def overview_rows(n_calls, n_messages, n_apps, n_locations):
+    return [
+        ("Total Call Records", n_calls),
+        ("Total Messages", n_messages),
+        ("Installed Applications", n_apps),
+        ("Location Records", n_locations),
+    ]
+
+def findings_summary_rows(*counts):
+    return [(section.summary, n) for section, n in zip(FINDINGS, counts)]
+
+def _count(records):
+    # Streamed runs pass row counts instead of holding every record
+    return records if isinstance(records, int) else len(records)
+
+def _report_path():
     # ---- SAFE PATH HANDLING ----
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     report_dir = os.path.join(base_dir, "REPORT")
     os.makedirs(report_dir, exist_ok=True)
-    report_path = os.path.join(report_dir, "forensic_report.txt")
+    return os.path.join(report_dir, "forensic_report.txt")
 
-    lines = []
+# ---------------- SECTIONS ----------------
+# Each writer takes a `write(text)` callable, so the same text goes to an
+# in-memory list (generate_report) or straight to a file (stream_report).
 
+def _write_header(write):
     # ---- HEADER ----
-    lines.append("MOBILE FORENSICS INVESTIGATION REPORT\n")
-    lines.append("=" * 60 + "\n")
-    lines.append(f"Generated On : {datetime.now()}\n\n")
+    write("MOBILE FORENSICS INVESTIGATION REPORT\n")
+    write("=" * 60 + "\n")
+    write(f"Generated On : {datetime.now()}\n\n")
 
     # ---- 1. CASE SUMMARY ----
-    lines.append("1. CASE SUMMARY\n")
-    lines.append("-" * 60 + "\n")
-    lines.append(
+    write("1. CASE SUMMARY\n")
+    write("-" * 60 + "\n")
+    write(
         "This report documents the results of a mobile forensic investigation.\n"
         "The objective was to safely extract mobile data, identify suspicious\n"
         "activities, and reconstruct a chronological timeline without modifying\n"
         "original evidence.\n\n"
     )
 
+def _write_overview(write, n_calls, n_messages, n_apps, n_locations):
     # ---- 2. EXTRACTED DATA OVERVIEW ----
-    lines.append("2. EXTRACTED DATA OVERVIEW\n")
-    lines.append("-" * 60 + "\n")
-    lines.append(f"Total Call Records     : {len(calls)}\n")
-    lines.append(f"Total Messages         : {len(messages)}\n")
-    lines.append(f"Installed Applications : {len(apps)}\n")
-    lines.append(f"Location Records       : {len(locations)}\n\n")
+    write("2. EXTRACTED DATA OVERVIEW\n")
+    write("-" * 60 + "\n")
+    for label, n in overview_rows(n_calls, n_messages, n_apps, n_locations):
+        write(f"{label:<22} : {n}\n")
+    write("\n")
 
+def _write_findings_summary(write, n_calls, n_messages, n_apps, n_campaigns=0, n_jumps=0):
     # ---- 3. SUSPICIOUS FINDINGS ----
-    lines.append("3. SUSPICIOUS FINDINGS SUMMARY\n")
-    lines.append("-" * 60 + "\n")
-    lines.append(f"Suspicious Calls    : {len(suspicious_calls)}\n")
-    lines.append(f"Suspicious Messages : {len(suspicious_messages)}\n")
-    lines.append(f"Suspicious Apps     : {len(suspicious_apps)}\n\n")
-
-    # ---- 3.1 Suspicious Call Details ----
-    if suspicious_calls:
-        lines.append("3.1 Suspicious Call Details\n")
-        for c in suspicious_calls:
-            lines.append(
-                f"- Number: {c['number']}, Time: {c['time']}, "
-                f"Duration: {c['duration']} sec\n"
-            )
-        lines.append("\n")
-
-    # ---- 3.2 Suspicious Message Details ----
-    if suspicious_messages:
-        lines.append("3.2 Suspicious Message Details\n")
-        for m in suspicious_messages:
-            lines.append(
-                f"- Sender: {m['sender']}, Time: {m['time']}, "
-                f"Content: {m['message']}\n"
-            )
-        lines.append("\n")
-
-    # ---- 3.3 Suspicious App Details ----
-    if suspicious_apps:
-        lines.append("3.3 Suspicious Application Details\n")
-        for a in suspicious_apps:
-            lines.append(
-                f"- App Name: {a['app_name']}, Permission: {a['permission']}\n"
-            )
-        lines.append("\n")
+    write("3. SUSPICIOUS FINDINGS SUMMARY\n")
+    write("-" * 60 + "\n")
+    for label, n in findings_summary_rows(n_calls, n_messages, n_apps, n_campaigns, n_jumps):
+        write(f"{label:<19} : {n}\n")
+    write("\n")
+
+def _write_detail_block(write, heading, records, describe):
+    """Writes one 3.x block if there are records; returns how many."""
+    n = 0
+    for rec in records:
+        if n == 0:
+            write(heading)
+        write(describe(rec))
+        n += 1
+    if n:
+        write("\n")
+    return n
+
+def _describe(section, rec):
+    labels = (label for label, _, _, _ in section.columns)
+    return "- " + ", ".join(f"{label}: {cell}" for label, cell in zip(labels, finding_cells(section, rec))) + "\n"
+
+def _write_findings_details(write, suspicious_calls, suspicious_messages, suspicious_apps, campaigns=(), jumps=()):
+    # ---- 3.1 - 3.5 one block per FINDINGS section ----
+    return tuple(
+        _write_detail_block(
+            write, section.heading + "\n", records, lambda rec, section=section: _describe(section, rec)
+        )
+        for section, records in zip(
+            FINDINGS, (suspicious_calls, suspicious_messages, suspicious_apps, campaigns, jumps)
+        )
+    )
 
+def _write_timeline(write, timeline):
+    """Writes section 4 from any iterable of events; returns counts per type."""
     # ---- 4. TIMELINE RECONSTRUCTION ----
-    lines.append("4. TIMELINE RECONSTRUCTION\n")
-    lines.append("-" * 60 + "\n")
+    write("4. TIMELINE RECONSTRUCTION\n")
+    write("-" * 60 + "\n")
+    counts = Counter()
     for e in timeline:
-        severity = e.get("severity", "NORMAL")
-        event_type = e.get("type", "EVENT")
-        lines.append(
-            f"{e['time']} | {event_type} | {severity} | {e['event']}\n"
-        )
+        cells = timeline_cells(e)
+        counts[cells[1]] += 1
+        write(" | ".join(cells) + "\n")
+    return counts
 
+def _write_integrity(write, media=()):
     # ---- 5. EVIDENCE INTEGRITY NOTE ----
-    lines.append("\n5. EVIDENCE INTEGRITY & LIMITATIONS\n")
-    lines.append("-" * 60 + "\n")
-    lines.append(
+    write("\n5. EVIDENCE INTEGRITY & LIMITATIONS\n")
+    write("-" * 60 + "\n")
+    write(
         "• All analysis was performed in read-only mode.\n"
         "• Original mobile data was never modified.\n"
         "• This tool is an academic prototype intended for demonstration purposes.\n"
     )
+    n = 0
+    for m in media:
+        if n == 0:
+            write("• Acquired media, SHA-256 computed while each file was transferred:\n")
+        n += 1
+        write("  " + " | ".join(cell for cell in media_cells(m) if cell) + "\n")
+
+# ---------------- REPORT ----------------
+def generate_report(
+    calls, messages, apps, locations,
+    suspicious_calls, suspicious_messages, suspicious_apps,
+    timeline, report_path=None, media=(), campaigns=(), jumps=()
+):
+    """
+    Generates a clean, professional Mobile Forensics Investigation Report.
+    Output: REPORT/forensic_report.txt unless report_path is given
+    `media` lists acquired media hashes (CaseStore.media_hashes) for section 5.
+    `campaigns` lists SMS campaign clusters (Cluster.as_dict rows) for 3.4.
+    `jumps` lists impossible-travel legs (ImpossibleTravel.jumps rows) for 3.5.
+    """
+    report_path = report_path or _report_path()
+    lines = []
+    write = lines.append
+
+    _write_header(write)
+    _write_overview(write, _count(calls), _count(messages), _count(apps), _count(locations))
+    _write_findings_summary(
+        write, len(suspicious_calls), len(suspicious_messages), len(suspicious_apps), len(campaigns), len(jumps)
+    )
+    _write_findings_details(write, suspicious_calls, suspicious_messages, suspicious_apps, campaigns, jumps)
+    _write_timeline(write, timeline)
+    _write_integrity(write, media)
 
     # ---- WRITE REPORT ----
     with open(report_path, "w", encoding="utf-8") as f:
         f.writelines(lines)
 
-    return report_path
\ No newline at end of file
+    return report_path
+
+def stream_report(
+    timeline, suspicious_calls, suspicious_messages, suspicious_apps, apps,
+    report_path=None, media=(), campaigns=(), jumps=()
+):
+    """
+    Streaming variant of generate_report with the same output.
+    `timeline` and the suspicious_* arguments may be one-shot iterators;
+    every section is written to a buffered file handle as it is produced.
+    Record counts for section 2 and 3 are taken in that same pass (one
+    timeline event per call, message and location), so sections 3.x and 4
+    are spooled to a temporary file next to the report and copied in once
+    the counts are known. Peak memory does not depend on the event count.
+    `apps` is the app record count (or the app records), since apps have
+    no timeline events.
+    """
+    report_path = report_path or _report_path()
+    report_dir = os.path.dirname(os.path.abspath(report_path))
+
+    with open(report_path, "w", encoding="utf-8", buffering=STREAM_BUFFER_SIZE) as f, \
+            tempfile.TemporaryFile("w+", encoding="utf-8", dir=report_dir) as spool:
+        _write_header(f.write)
+
+        n_suspicious = _write_findings_details(
+            spool.write, suspicious_calls, suspicious_messages, suspicious_apps, campaigns, jumps
+        )
+        events = _write_timeline(spool.write, timeline)
+
+        _write_overview(
+            f.write, events["CALL"], events["MESSAGE"], _count(apps), events["LOCATION"]
+        )
+        _write_findings_summary(f.write, *n_suspicious)
+
+        spool.seek(0)
+        shutil.copyfileobj(spool, f, STREAM_BUFFER_SIZE)
+        _write_integrity(f.write, media)
+
+    return report_path
@@ -0,0 +1,335 @@
+"""
+Persistent, incremental case store (SQLite).
+
+Artifacts are stored once together with their rule-engine result, and a
+checkpoint per source remembers how far into the evidence file we got,
+so a re-run only reads, analyzes and inserts rows appended since then.
+Suspicious records, timestamp anomalies and the timeline are answered
+from indexed queries instead of re-analyzing the CSVs. A last line
+without its newline may still be being written: its row is stored, but
+read again (and replaced) on the next run.
+"""
+import csv
+import hashlib
+import os
+import sqlite3
+
+from ANALYSIS.records import Call, Message, App, Location, to_epoch
+from ANALYSIS.rules import severity
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CASES_DIR = os.path.join(BASE_DIR, "CASES")
+
+# Bytes at the start of an evidence file used to recognise it across runs
+HEAD_BYTES = 4096
+
+# stream -> (table, record type)
+STREAM_TABLES = {
+    "calls": ("calls", Call),
+    "messages": ("messages", Message),
+    "apps": ("apps", App),
+    "locations": ("locations", Location),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS calls (
+    id INTEGER PRIMARY KEY, number TEXT, time TEXT, duration TEXT,
+    epoch INTEGER, rule TEXT, severity TEXT
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY, sender TEXT, message TEXT, time TEXT,
+    epoch INTEGER, rule TEXT, severity TEXT
+);
+CREATE TABLE IF NOT EXISTS apps (
+    id INTEGER PRIMARY KEY, app_name TEXT, permission TEXT,
+    rule TEXT, severity TEXT
+);
+CREATE TABLE IF NOT EXISTS locations (
+    id INTEGER PRIMARY KEY, latitude TEXT, longitude TEXT, time TEXT,
+    epoch INTEGER, rule TEXT, severity TEXT
+);
+CREATE TABLE IF NOT EXISTS media (
+    id INTEGER PRIMARY KEY, device_path TEXT, size INTEGER, mtime INTEGER,
+    sha256 TEXT, local_path TEXT, duplicate_of INTEGER, acquired TEXT
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    source TEXT PRIMARY KEY, path TEXT, offset INTEGER, head_hash TEXT,
+    tail_rows INTEGER DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_calls_epoch ON calls (epoch IS NULL, epoch, id);
+CREATE INDEX IF NOT EXISTS idx_calls_number ON calls (number);
+CREATE INDEX IF NOT EXISTS idx_calls_severity ON calls (severity);
+CREATE INDEX IF NOT EXISTS idx_messages_epoch ON messages (epoch IS NULL, epoch, id);
+CREATE INDEX IF NOT EXISTS idx_messages_sender ON messages (sender);
+CREATE INDEX IF NOT EXISTS idx_messages_severity ON messages (severity);
+CREATE INDEX IF NOT EXISTS idx_apps_severity ON apps (severity);
+CREATE INDEX IF NOT EXISTS idx_locations_epoch ON locations (epoch IS NULL, epoch, id);
+CREATE INDEX IF NOT EXISTS idx_locations_severity ON locations (severity);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_media_source ON media (device_path, size, mtime);
+CREATE INDEX IF NOT EXISTS idx_media_sha256 ON media (sha256);
+"""
+
+
+def case_path(name):
+    return os.path.join(CASES_DIR, f"{name}.db")
+
+
+def _head_hash(path, length):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        h.update(f.read(min(length, HEAD_BYTES)))
+    return h.hexdigest()
+
+
+class CaseStore:
+    def __init__(self, db_path):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        # Stores created before checkpoints had tail_rows
+        if "tail_rows" not in {r[1] for r in self.conn.execute("PRAGMA table_info(checkpoints)")}:
+            with self.conn:
+                self.conn.execute("ALTER TABLE checkpoints ADD COLUMN tail_rows INTEGER DEFAULT 0")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------------- INGEST ----------------
+    def _checkpoint(self, source, path):
+        """
+        (byte offset to resume from, rows stored from an unterminated last
+        line at that offset); (0, 0) if the file is new or was replaced.
+        """
+        row = self.conn.execute(
+            "SELECT path, offset, head_hash, tail_rows FROM checkpoints WHERE source = ?", (source,)
+        ).fetchone()
+        if row is None:
+            return 0, 0
+        old_path, offset, head_hash, tail_rows = row
+        if (
+            old_path != os.path.abspath(path)
+            or os.path.getsize(path) < offset
+            or _head_hash(path, offset) != head_hash
+        ):
+            return 0, 0
+        return offset, tail_rows or 0
+
+    def ingest_csv(self, stream, path, scan, batch_size=10000, on_batch=None):
+        """
+        Reads rows of `path` appended since the last checkpoint, classifies
+        each batch with scan(stream, batch) and stores rows and results.
+        Rows and the new checkpoint are committed together per batch, so an
+        interrupted run resumes without duplicates. Returns the new row count
+        (a re-read unterminated last line replaces its row and is not new).
+        """
+        table, record_type = STREAM_TABLES[stream]
+        offset, tail_rows = self._checkpoint(stream, path)
+        if offset == 0:
+            with self.conn:
+                self.conn.execute(f"DELETE FROM {table}")
+        elif tail_rows:
+            # The unterminated line at the checkpoint is read again, complete or not
+            with self.conn:
+                self.conn.execute(
+                    f"DELETE FROM {table} WHERE id IN (SELECT id FROM {table} ORDER BY id DESC LIMIT ?)",
+                    (tail_rows,)
+                )
+                self.conn.execute("UPDATE checkpoints SET tail_rows = 0 WHERE source = ?", (stream,))
+
+        fields = record_type.FIELDS
+        has_epoch = "epoch" in record_type.__slots__
+        columns = fields + (("epoch",) if has_epoch else ()) + ("rule", "severity")
+        insert = (
+            f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' * len(columns))})"
+        )
+
+        added = 0
+        with open(path, "rb") as f:
+            last = [b""]
+
+            def read_lines():
+                for line in iter(f.readline, b""):
+                    last[0] = line
+                    yield line.decode("utf-8")
+
+            lines = read_lines()
+            first = next(lines, None)
+            if first is None:
+                return 0
+            header = next(csv.reader([first]), None)
+            if header is None:
+                return 0
+            if offset:
+                f.seek(offset)
+            # csv.reader pulls whole lines only as needed, so f.tell() after
+            # a row is exactly where the next row starts
+            reader = csv.reader(lines)
+
+            replacing = [tail_rows]
+
+            def commit(batch, tail_start=None):
+                scanned = scan(stream, batch)
+                rows = [
+                    tuple(rec[k] for k in fields)
+                    + ((rec.epoch,) if has_epoch else ())
+                    + (hit, severity(hit))
+                    for rec, hit in scanned
+                ]
+                # A row from an unterminated last line is stored, but the
+                # checkpoint stays at its start so the next run re-reads it
+                end = f.tell() if tail_start is None else tail_start
+                with self.conn:
+                    self.conn.executemany(insert, rows)
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO checkpoints (source, path, offset, head_hash, tail_rows) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (stream, os.path.abspath(path), end, _head_hash(path, end), int(tail_start is not None))
+                    )
+                # Re-read tail rows replace stored ones and are not passed on as new
+                replaced = min(len(batch), replacing[0])
+                replacing[0] -= replaced
+                if on_batch and replaced < len(batch):
+                    on_batch(batch[replaced:], scanned[replaced:])
+
+            batch = []
+            start = f.tell()
+            for values in reader:
+                if not values:
+                    start = f.tell()
+                    continue
+                batch.append(record_type.from_row(dict(zip(header, values))))
+                if not last[0].endswith(b"\n"):
+                    # End of file mid-line: this is the last row
+                    commit(batch, start)
+                    added += len(batch)
+                    batch = []
+                    break
+                if len(batch) >= batch_size:
+                    commit(batch)
+                    added += len(batch)
+                    batch = []
+                start = f.tell()
+            if batch:
+                commit(batch)
+                added += len(batch)
+        return max(0, added - tail_rows)
+
+    # ---------------- QUERIES ----------------
+    def _records(self, stream, where="", params=()):
+        table, record_type = STREAM_TABLES[stream]
+        fields = record_type.FIELDS
+        query = f"SELECT {', '.join(fields)}, rule FROM {table} {where}"
+        for row in self.conn.execute(query, params):
+            yield record_type.from_row(dict(zip(fields, row))), row[-1]
+
+    def count(self, stream):
+        table = STREAM_TABLES[stream][0]
+        return self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def suspicious(self, stream):
+        return [
+            rec for rec, _ in
+            self._records(stream, "WHERE severity = 'HIGH' ORDER BY id")
+        ]
+
+    def anomalies(self, stream, now):
+        """Rows whose timestamp is invalid or later than `now`."""
+        return [
+            rec for rec, _ in self._records(
+                stream, "WHERE epoch IS NULL OR epoch > ? ORDER BY id", (to_epoch(now),)
+            )
+        ]
+
+    def iter_scanned(self, stream):
+        """
+        (record, rule hit) pairs in time order, invalid timestamps last,
+        ready for TIMELINE.timeline.iter_events / merge_timeline(presorted=True).
+        """
+        return self._records(stream, "ORDER BY epoch IS NULL, epoch, id")
+
+    def find(self, stream, **equals):
+        """Indexed lookups, e.g. find("calls", number="9123456789")."""
+        where = " AND ".join(f"{k} = ?" for k in equals)
+        return [
+            rec for rec, _ in
+            self._records(stream, f"WHERE {where} ORDER BY id", tuple(equals.values()))
+        ]
+
+    # ---------------- MEDIA ----------------
+    def media_acquired(self, device_path, size, mtime):
+        """True if this exact device file (path, size, mtime) was already pulled."""
+        return self.conn.execute(
+            "SELECT 1 FROM media WHERE device_path = ? AND size = ? AND mtime = ?",
+            (device_path, size, mtime)
+        ).fetchone() is not None
+
+    def media_with_hash(self, sha256):
+        """(id, local path) of the stored copy with this SHA-256, or None."""
+        return self.conn.execute(
+            "SELECT id, local_path FROM media WHERE sha256 = ? AND duplicate_of IS NULL ORDER BY id LIMIT 1",
+            (sha256,)
+        ).fetchone()
+
+    def media_at(self, local_path):
+        """True if a stored row points at this local file."""
+        return self.conn.execute(
+            "SELECT 1 FROM media WHERE local_path = ? LIMIT 1", (local_path,)
+        ).fetchone() is not None
+
+    def add_media(self, device_path, size, mtime, sha256, local_path, acquired, duplicate_of=None):
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT OR REPLACE INTO media "
+                "(device_path, size, mtime, sha256, local_path, duplicate_of, acquired) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (device_path, size, mtime, sha256, local_path, duplicate_of, acquired)
+            )
+        return cur.lastrowid
+
+    def media_hashes(self):
+        """Every acquired media file in acquisition order, for the report's integrity section."""
+        fields = ("device_path", "size", "sha256", "duplicate_of", "acquired")
+        return [
+            dict(zip(fields, row)) for row in
+            self.conn.execute(f"SELECT {', '.join(fields)} FROM media ORDER BY id")
+        ]
+
+    # ---------------- DASHBOARD FRAMES ----------------
+    def save_frame(self, key, df):
+        """
+        Persists an acquired DataFrame. Content-provider rows carry an
+        `_id`; when they do, only ids not stored yet are appended.
+        """
+        table = f"frame_{key}"
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+        ).fetchone()
+        columns = {r[1] for r in self.conn.execute(f'PRAGMA table_info("{table}")')}
+        if exists and "_id" in df.columns and set(df.columns) <= columns:
+            stored = {r[0] for r in self.conn.execute(f'SELECT "_id" FROM "{table}"')}
+            new_rows = df[~df["_id"].astype(str).isin(stored)]
+            new_rows.astype(str).to_sql(table, self.conn, if_exists="append", index=False)
+            return len(new_rows)
+        df.astype(str).to_sql(table, self.conn, if_exists="replace", index=False)
+        return len(df)
+
+    def load_frames(self):
+        import pandas as pd
+
+        tables = [
+            r[0] for r in self.conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'frame\\_%' ESCAPE '\\'"
+            )
+        ]
+        return {
+            t[len("frame_"):]: pd.read_sql(f'SELECT * FROM "{t}"', self.conn)
+            for t in tables
+        }
@@ -0,0 +1,333 @@
+"""
+Typed columnar evidence files, an alternative to re-parsing DATA/*.csv.
+
+Two on-disk formats share one interface (open_columns / write_columns /
+write_frame):
+
+    .arrow  Arrow IPC file, used when pyarrow is installed; memory-mapped
+            on read, so numeric columns are never copied.
+    .ecpk   pure-Python fallback ("evidence column pack"):
+
+            8s   magic b"ECPK\\x01\\0\\0\\0"
+            <Q   header length
+            ...  JSON header: rows, meta, and per column its name, kind,
+                 pandas dtype and (offset, length) of each buffer
+            ...  buffers, 8-byte aligned, little-endian:
+                   i64 / f64 / bool / datetime  data (datetime = int64 in the
+                                                column's own unit, NaT kept)
+                   str   offsets (rows + 1 x int64) and utf-8 data
+                   str and i64 may add a nulls buffer (one byte per row)
+
+            The file is mmap'ed; numeric columns become NumPy views of the
+            mapping and only strings are decoded.
+
+Column kinds: "str", "i64", "f64", "bool", "datetime".
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:  # optional: the .ecpk fallback needs nothing
+    pa = None
+
+MAGIC = b"ECPK\x01\x00\x00\x00"
+_PREFIX = struct.Struct("<8sQ")
+ALIGN = 8
+
+# Format written by default, and formats that can be read, in preference order
+EXTENSION = ".arrow" if pa is not None else ".ecpk"
+READABLE = (".arrow", ".ecpk") if pa is not None else (".ecpk",)
+
+
+def find(base):
+    """Existing columnar file for `base` (a path without extension), or None."""
+    for ext in READABLE:
+        if os.path.exists(base + ext):
+            return base + ext
+    return None
+
+
+def open_columns(path):
+    if path.endswith(".arrow"):
+        return ArrowFile(path)
+    return PackFile(path)
+
+
+def _little_endian(arr):
+    if sys.byteorder == "big":
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr
+
+
+def _replace(tmp, path):
+    # Readers may still map the old file; a rename leaves their view intact
+    os.replace(tmp, path)
+
+
+# ---------------- WRITERS ----------------
+def write_columns(path, columns, meta=None):
+    """
+    Writes plain Python columns: a list of (name, kind, values) where
+    values is a list and None marks a missing value (str and i64 only).
+    """
+    rows = len(columns[0][2]) if columns else 0
+    if path.endswith(".arrow"):
+        arrow_types = {"str": pa.string(), "i64": pa.int64(), "f64": pa.float64(), "bool": pa.bool_()}
+        table = pa.table({name: pa.array(values, arrow_types[kind]) for name, kind, values in columns})
+        _write_arrow(path, table, meta)
+        return path
+
+    encoded = []
+    for name, kind, values in columns:
+        if kind == "str":
+            buffers = _str_buffers(values)
+        elif kind == "i64":
+            buffers = {"data": _little_endian(array("q", (0 if v is None else v for v in values))).tobytes()}
+            if any(v is None for v in values):
+                buffers["nulls"] = bytes(bytearray(v is None for v in values))
+        elif kind == "f64":
+            buffers = {"data": _little_endian(array("d", values)).tobytes()}
+        elif kind == "bool":
+            buffers = {"data": bytes(bytearray(bool(v) for v in values))}
+        else:
+            raise ValueError(f"unsupported column kind {kind!r}")
+        encoded.append((name, kind, None, buffers))
+    _write_pack(path, rows, encoded, meta)
+    return path
+
+
+def write_frame(path, df, meta=None):
+    """Writes a pandas DataFrame, keeping its dtypes."""
+    if path.endswith(".arrow"):
+        _write_arrow(path, pa.Table.from_pandas(df, preserve_index=False), meta)
+        return path
+
+    import numpy as np
+    from pandas.api import types
+
+    encoded = []
+    for name in df.columns:
+        s = df[name]
+        dtype = s.dtype
+        nulls = s.isna().to_numpy()
+        if types.is_bool_dtype(dtype) and not nulls.any():
+            kind, buffers = "bool", {"data": s.to_numpy(dtype=np.bool_).tobytes()}
+        elif types.is_integer_dtype(dtype):
+            kind, buffers = "i64", {"data": s.to_numpy(dtype="<i8", na_value=0).tobytes()}
+            if nulls.any():
+                buffers["nulls"] = nulls.astype(np.uint8).tobytes()
+        elif types.is_float_dtype(dtype):
+            kind, buffers = "f64", {"data": s.to_numpy(dtype="<f8").tobytes()}
+        elif types.is_datetime64_dtype(dtype):
+            # Naive timestamps only; tz-aware columns are kept as text
+            kind, buffers = "datetime", {"data": s.to_numpy().view("<i8").tobytes()}
+        else:
+            kind = "str"
+            buffers = _str_buffers([None if n else str(v) for v, n in zip(s.tolist(), nulls)])
+        encoded.append((str(name), kind, str(dtype), buffers))
+    _write_pack(path, len(df), encoded, meta)
+    return path
+
+
+def _str_buffers(values):
+    offsets = array("q", [0])
+    chunks = []
+    pos = 0
+    for v in values:
+        if v is not None:
+            b = v.encode("utf-8")
+            chunks.append(b)
+            pos += len(b)
+        offsets.append(pos)
+    buffers = {"offsets": _little_endian(offsets).tobytes(), "data": b"".join(chunks)}
+    if any(v is None for v in values):
+        buffers["nulls"] = bytes(bytearray(v is None for v in values))
+    return buffers
+
+
+def _write_pack(path, rows, encoded, meta):
+    columns = []
+    pos = 0
+    for name, kind, dtype, buffers in encoded:
+        layout = {}
+        for part, buf in buffers.items():
+            layout[part] = [pos, len(buf)]
+            pos += -(-len(buf) // ALIGN) * ALIGN
+        columns.append({"name": name, "kind": kind, "dtype": dtype, "buffers": layout})
+
+    header = json.dumps({"rows": rows, "meta": meta or {}, "columns": columns}).encode("utf-8")
+    header += b" " * (-(_PREFIX.size + len(header)) % ALIGN)
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, len(header)))
+        f.write(header)
+        for _, _, _, buffers in encoded:
+            for buf in buffers.values():
+                f.write(buf)
+                f.write(b"\0" * (-len(buf) % ALIGN))
+    _replace(tmp, path)
+
+
+def _write_arrow(path, table, meta):
+    metadata = dict(table.schema.metadata or {})
+    metadata[b"echelon"] = json.dumps(meta or {}).encode("utf-8")
+    table = table.replace_schema_metadata(metadata)
+    tmp = path + ".tmp"
+    with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    _replace(tmp, path)
+
+
+# ---------------- READERS ----------------
+class PackFile:
+    """Memory-mapped reader for .ecpk files."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_len = _PREFIX.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an evidence column pack")
+        header = json.loads(self._mm[_PREFIX.size:_PREFIX.size + header_len])
+        self._base = _PREFIX.size + header_len
+        self.rows = header["rows"]
+        self.meta = header["meta"]
+        self._columns = {c["name"]: c for c in header["columns"]}
+        self.names = list(self._columns)
+
+    def close(self):
+        try:
+            self._mm.close()
+        except BufferError:
+            # NumPy views from to_pandas() still use the mapping; it is
+            # released together with them
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.rows
+
+    def _buffer(self, column, part, start=0, stop=None):
+        """Bytes [start, stop) of one column buffer, as a view of the mapping."""
+        span = column["buffers"].get(part)
+        if span is None:
+            return None
+        offset, length = span
+        stop = length if stop is None else stop
+        return memoryview(self._mm)[self._base + offset + start:self._base + offset + stop]
+
+    def _ints(self, column, part, start, stop):
+        with self._buffer(column, part, start * 8, stop * 8) as buf:
+            return _little_endian(array("q", buf.tobytes()))
+
+    def _strings(self, column, start, stop):
+        offsets = self._ints(column, "offsets", start, stop + 1)
+        with self._buffer(column, "data", offsets[0], offsets[-1]) as buf:
+            raw = buf.tobytes()
+        base = offsets[0]
+        text = raw.decode("utf-8")
+        if len(text) == len(raw):
+            # ASCII: byte offsets are character offsets
+            return [text[offsets[i] - base:offsets[i + 1] - base] for i in range(stop - start)]
+        return [raw[offsets[i] - base:offsets[i + 1] - base].decode("utf-8") for i in range(stop - start)]
+
+    def column(self, name, start=0, stop=None):
+        """Rows [start, stop) of one column as a Python list (None where missing)."""
+        c = self._columns[name]
+        kind = c["kind"]
+        stop = self.rows if stop is None else min(stop, self.rows)
+        if start >= stop:
+            return []
+        if kind == "str":
+            values = self._strings(c, start, stop)
+        elif kind == "bool":
+            with self._buffer(c, "data", start, stop) as buf:
+                values = [bool(b) for b in buf]
+        elif kind == "f64":
+            with self._buffer(c, "data", start * 8, stop * 8) as buf:
+                values = _little_endian(array("d", buf.tobytes())).tolist()
+        else:
+            values = self._ints(c, "data", start, stop).tolist()
+        nulls = self._buffer(c, "nulls", start, stop)
+        if nulls is not None:
+            with nulls:
+                values = [None if n else v for v, n in zip(values, nulls)]
+        return values
+
+    def to_pandas(self):
+        import numpy as np
+        import pandas as pd
+
+        data = {}
+        for name, c in self._columns.items():
+            kind = c["kind"]
+            if kind == "str":
+                # Text columns come back with their string dtype; anything
+                # else that was written as text stays object
+                dtype = c["dtype"] if c["dtype"] and c["dtype"] != "object" else object
+                try:
+                    data[name] = pd.Series(self.column(name), dtype=dtype)
+                except (TypeError, ValueError):
+                    data[name] = pd.Series(self.column(name), dtype=object)
+                continue
+            buf = self._buffer(c, "data")
+            if kind == "bool":
+                values = np.frombuffer(buf, dtype=np.bool_)
+            elif kind == "f64":
+                values = np.frombuffer(buf, dtype="<f8")
+            elif kind == "datetime":
+                values = np.frombuffer(buf, dtype="<i8").view(c["dtype"])
+            else:
+                values = np.frombuffer(buf, dtype="<i8")
+                nulls = self._buffer(c, "nulls")
+                if nulls is not None or c["dtype"] == "Int64":
+                    mask = np.frombuffer(nulls, dtype=np.bool_) if nulls is not None else np.zeros(len(values), bool)
+                    values = pd.arrays.IntegerArray(values, mask)
+            data[name] = pd.Series(values, copy=False)
+        return pd.DataFrame(data, columns=self.names)
+
+
+class ArrowFile:
+    """Memory-mapped reader for Arrow IPC files; same interface as PackFile."""
+
+    def __init__(self, path):
+        self.path = path
+        self._source = pa.memory_map(path, "r")
+        self.table = pa.ipc.open_file(self._source).read_all()
+        self.rows = self.table.num_rows
+        metadata = self.table.schema.metadata or {}
+        self.meta = json.loads(metadata.get(b"echelon", b"{}"))
+        self.names = self.table.column_names
+
+    def close(self):
+        self._source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.rows
+
+    def column(self, name, start=0, stop=None):
+        stop = self.rows if stop is None else min(stop, self.rows)
+        return self.table.column(name).slice(start, max(stop - start, 0)).to_pylist()
+
+    def to_pandas(self):
+        return self.table.to_pandas()
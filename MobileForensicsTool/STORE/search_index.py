@@ -0,0 +1,132 @@
+"""
+Full-text index over acquired dashboard streams (SQLite FTS5).
+
+Built once per acquisition; every search is then an FTS5 MATCH instead
+of stringifying and regex-scanning the whole DataFrame.
+
+Query syntax (terms are AND-ed unless OR / NOT is given):
+    whatsapp            token match in any field
+    link*               prefix match
+    address:+91*        field-scoped (field names are lower-cased, with
+                        spaces replaced by "_", e.g. file_name:img*)
+    "click this"        phrase
+    NOT link            every row without the term
+Matching is by token/prefix, not arbitrary substring. "+" is part of a
+token, so +91* matches international numbers only, not 9123.
+"""
+import re
+import sqlite3
+
+_QUERY_TOKEN = re.compile(r'(?:([\w]+):)?("[^"]*"\*?|\S+)')
+_OPERATORS = {"AND", "OR", "NOT"}
+# Hidden column holding ALL_TOKEN in every row; FTS5 NOT needs a left operand
+ALL_COLUMN = "_all"
+ALL_TOKEN = "all"
+
+
+def field_name(column):
+    return re.sub(r"\W+", "_", str(column).strip()).strip("_").lower() or "field"
+
+
+def _table(stream):
+    return f'"fts_{field_name(stream)}"'
+
+
+def to_fts_query(query, fields):
+    """
+    Translates the search box syntax into an FTS5 expression for a table
+    with the given fields. Returns None if the query scopes a field that
+    table does not have (so that stream cannot match).
+    A NOT with nothing before it (at the start, or after AND / OR) applies
+    to every row: it gets the ALL_COLUMN term as its left operand.
+    """
+    parts = []
+    for field, value in _QUERY_TOKEN.findall(query):
+        if not field and value.upper() in _OPERATORS:
+            parts.append(value.upper())
+            continue
+        prefix = value.endswith("*")
+        value = value.rstrip("*").strip('"').replace('"', '""')
+        if not value:
+            continue
+        term = f'"{value}"' + ("*" if prefix else "")
+        if field:
+            field = field_name(field)
+            if field not in fields:
+                return None
+            term = f"{field} : {term}"
+        else:
+            term = f"- {ALL_COLUMN} : {term}"
+        parts.append(term)
+    # Drop dangling operators left by skipped terms, then give unary NOTs an operand
+    while parts and parts[-1] in _OPERATORS:
+        parts.pop()
+    expr = []
+    for part in parts:
+        if part in _OPERATORS and (not expr or expr[-1] in _OPERATORS):
+            if part != "NOT":
+                continue
+            expr.append(f'{ALL_COLUMN} : "{ALL_TOKEN}"')
+        expr.append(part)
+    return " ".join(expr) or None
+
+
+class SearchIndex:
+    def __init__(self):
+        self.conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self.fields = {}
+
+    @classmethod
+    def build(cls, frames):
+        """Indexes {stream: DataFrame}; the FTS rowid is the row position + 1."""
+        index = cls()
+        for stream, df in frames.items():
+            index.add(stream, df)
+        return index
+
+    def add(self, stream, df):
+        table = _table(stream)
+        fields = []
+        for col in df.columns:
+            name = field_name(col)
+            while name in fields:
+                name += "_"
+            fields.append(name)
+        self.conn.execute(f"DROP TABLE IF EXISTS {table}")
+        self.fields[stream] = fields
+        if not fields:
+            return
+        self.conn.execute(
+            f"CREATE VIRTUAL TABLE {table} USING fts5({', '.join(fields)}, {ALL_COLUMN}, "
+            "tokenize = \"unicode61 tokenchars '+'\")"
+        )
+        rows = (row + (ALL_TOKEN,) for row in df.astype(str).itertuples(index=False, name=None))
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT INTO {table} VALUES ({', '.join('?' * (len(fields) + 1))})", rows
+            )
+
+    def row_positions(self, stream, query, limit=None):
+        fields = self.fields.get(stream)
+        expr = to_fts_query(query, fields) if fields else None
+        if expr is None:
+            return []
+        sql = f"SELECT rowid - 1 FROM {_table(stream)} WHERE {_table(stream)} MATCH ? ORDER BY rowid"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        try:
+            return [r[0] for r in self.conn.execute(sql, (expr,))]
+        except sqlite3.OperationalError:
+            # Malformed expression (e.g. unbalanced quotes)
+            return []
+
+    def search(self, frames, query, streams=None, limit=None):
+        """Returns {stream: matching rows of frames[stream]}, only for streams with hits."""
+        results = {}
+        for stream in streams or frames.keys():
+            if stream not in frames:
+                continue
+            positions = self.row_positions(stream, query, limit)
+            if positions:
+                results[stream] = frames[stream].iloc[positions]
+        return results
@@ -0,0 +1,235 @@
+"""
+Pre-aggregated time-bucket index over timeline events.
+
+Per source, events are counted into minute, hour and day buckets by
+severity, and their epochs are kept sorted next to a row reference
+(whatever the caller uses to find the event again, e.g. a frame row).
+
+    index = TimeBucketIndex()
+    index.add("calls", epochs, rows, severities)
+    index.histogram("hour", start, end)       # bucket counts in range
+    index.count(start, end)                   # events in range
+    index.events(start, end, offset=500, limit=500, newest_first=True)
+
+add() only touches the buckets and positions of the new events, so
+sources can be fed batch by batch as they are ingested. Histograms read
+only the buckets in range and event pages bisect to their first row, so
+neither depends on how many events the case holds.
+Events without a timestamp are kept per source, outside every range.
+"""
+import heapq
+from bisect import bisect_left, insort
+from collections import Counter
+from itertools import islice
+
+GRANULARITIES = {"minute": 60, "hour": 3600, "day": 86400}
+
+
+class TimeBucketIndex:
+    def __init__(self, granularities=GRANULARITIES):
+        self.granularities = dict(granularities)
+        self.sources = []
+        self.epochs = {}
+        self.rows = {}
+        self.undated = {}
+        # (source, granularity) -> {bucket start: {severity: count}} and its sorted keys
+        self.buckets = {}
+        self.bucket_keys = {}
+
+    def __len__(self):
+        return sum(len(e) for e in self.epochs.values())
+
+    # ---------------- INGEST ----------------
+    def add(self, source, epochs, rows=None, severities=None):
+        """
+        Indexes one batch of a source's events. epochs may be None/NaN
+        for undated events; rows default to running positions within the
+        source and severities to "NORMAL". Returns the number added.
+        """
+        if source not in self.epochs:
+            self.sources.append(source)
+            self.epochs[source], self.rows[source], self.undated[source] = [], [], []
+            for g in self.granularities:
+                self.buckets[(source, g)], self.bucket_keys[(source, g)] = {}, []
+        epochs = list(epochs)
+        n = len(epochs)
+        if rows is None:
+            first = len(self.epochs[source]) + len(self.undated[source])
+            rows = range(first, first + n)
+        rows = list(rows)
+        severities = ["NORMAL"] * n if severities is None else list(severities)
+
+        if any(e is None or e != e for e in epochs):
+            self.undated[source].extend(row for e, row in zip(epochs, rows) if e is None or e != e)
+            dated = [i for i, e in enumerate(epochs) if e is not None and e == e]
+            epochs, rows, severities = ([col[i] for i in dated] for col in (epochs, rows, severities))
+        if not epochs:
+            return n
+
+        # Ingest order is usually time order; sort only when it is not
+        if any(a > b for a, b in zip(epochs, islice(epochs, 1, None))):
+            order = sorted(range(len(epochs)), key=epochs.__getitem__)
+            epochs, rows, severities = ([col[i] for i in order] for col in (epochs, rows, severities))
+        self._insert_sorted(source, epochs, rows)
+
+        for g, width in self.granularities.items():
+            counts = Counter(zip([e // width * width for e in epochs], severities))
+            buckets, keys = self.buckets[(source, g)], self.bucket_keys[(source, g)]
+            new = []
+            for (bucket, sev), count in counts.items():
+                counts_at = buckets.get(bucket)
+                if counts_at is None:
+                    counts_at = buckets[bucket] = {}
+                    new.append(bucket)
+                counts_at[sev] = counts_at.get(sev, 0) + count
+            new.sort()
+            if new and (not keys or new[0] > keys[-1]):
+                keys.extend(new)
+            elif len(new) > 64:
+                keys.extend(new)
+                keys.sort()
+            else:
+                for bucket in new:
+                    insort(keys, bucket)
+        return n
+
+    def _insert_sorted(self, source, new_epochs, new_rows):
+        epochs, rows = self.epochs[source], self.rows[source]
+        if not epochs or new_epochs[0] >= epochs[-1]:
+            epochs.extend(new_epochs)
+            rows.extend(new_rows)
+            return
+        # Out-of-order batch: merge it in (stable, existing events first on ties)
+        merged = list(heapq.merge(zip(epochs, rows), zip(new_epochs, new_rows), key=lambda p: p[0]))
+        self.epochs[source] = [p[0] for p in merged]
+        self.rows[source] = [p[1] for p in merged]
+
+    def drop(self, source):
+        """Forgets one source, e.g. before re-indexing it after a re-acquisition."""
+        if source in self.epochs:
+            self.sources.remove(source)
+            del self.epochs[source], self.rows[source], self.undated[source]
+            for g in self.granularities:
+                del self.buckets[(source, g)], self.bucket_keys[(source, g)]
+
+    # ---------------- AGGREGATES ----------------
+    def span(self, sources=None):
+        """(first epoch, last epoch) over the dated events, or None."""
+        ends = [
+            (self.epochs[s][0], self.epochs[s][-1]) for s in self._sources(sources) if self.epochs[s]
+        ]
+        if not ends:
+            return None
+        return min(e[0] for e in ends), max(e[1] for e in ends)
+
+    def histogram(self, granularity, start=None, end=None, sources=None):
+        """
+        (bucket start, source, severity, count) for every non-empty bucket
+        overlapping [start, end), in bucket order per source. Partially
+        covered edge buckets are counted whole.
+        """
+        width = self.granularities[granularity]
+        out = []
+        for source in self._sources(sources):
+            buckets, keys = self.buckets[(source, granularity)], self.bucket_keys[(source, granularity)]
+            lo = 0 if start is None else bisect_left(keys, start // width * width)
+            hi = len(keys) if end is None else bisect_left(keys, end)
+            for bucket in keys[lo:hi]:
+                for sev, n in buckets[bucket].items():
+                    out.append((bucket, source, sev, n))
+        return out
+
+    def totals(self, start=None, end=None, sources=None, granularity="hour"):
+        """
+        Counter of (source, severity) over the buckets in range; exact when
+        start and end fall on bucket boundaries.
+        """
+        totals = Counter()
+        for _, source, sev, n in self.histogram(granularity, start, end, sources):
+            totals[(source, sev)] += n
+        return totals
+
+    def hour_of_day(self, source):
+        """Events per hour of the day (24 counts), folded from the hour buckets."""
+        hours = [0] * 24
+        for bucket, counts in self.buckets[(source, "hour")].items():
+            hours[int(bucket // 3600 % 24)] += sum(counts.values())
+        return hours
+
+    # ---------------- EVENT RANGES ----------------
+    def _sources(self, sources):
+        return [s for s in self.sources if sources is None or s in sources]
+
+    def _bounds(self, source, start, end):
+        epochs = self.epochs[source]
+        lo = 0 if start is None else bisect_left(epochs, start)
+        hi = len(epochs) if end is None else bisect_left(epochs, end)
+        return lo, max(lo, hi)
+
+    def count(self, start=None, end=None, sources=None):
+        """Dated events with start <= epoch < end."""
+        return sum(hi - lo for lo, hi in (self._bounds(s, start, end) for s in self._sources(sources)))
+
+    def events(self, start=None, end=None, sources=None, offset=0, limit=None, newest_first=False):
+        """
+        (epoch, source, row) of the events in [start, end) in time order
+        (ties in source order), skipping `offset` and returning at most
+        `limit`. The page start is located by bisecting on time, not by
+        walking the events before it.
+        """
+        sources = self._sources(sources)
+        ranges = {s: self._bounds(s, start, end) for s in sources}
+        total = sum(hi - lo for lo, hi in ranges.values())
+        if limit is None:
+            limit = total
+        if newest_first:
+            # The same page counted from the end, read ascending then reversed
+            stop = max(0, total - offset)
+            offset, limit = max(0, stop - limit), stop - max(0, stop - limit)
+        if limit <= 0 or offset >= total:
+            return []
+
+        # Smallest epoch with more than `offset` events at or before it
+        skip, cut = self._seek(ranges, offset)
+        runs = []
+        for s in sources:
+            lo, hi = ranges[s]
+            epochs, rows = self.epochs[s], self.rows[s]
+            first = lo if cut is None else bisect_left(epochs, cut, lo, hi)
+            runs.append(_run(epochs, rows, s, first, hi))
+        merged = heapq.merge(*runs, key=lambda e: e[0])
+        page = list(islice(merged, skip, skip + limit))
+        return page[::-1] if newest_first else page
+
+    def _seek(self, ranges, offset):
+        """
+        (skip, cut) locating the offset-th event in range: cut is its
+        epoch and skip the number of in-range events at that same epoch
+        that precede it. It is the largest epoch x with at most `offset`
+        events before x; per source those form a prefix, so one bisection
+        per source finds it.
+        """
+        if offset == 0:
+            return 0, None
+
+        def before(value):
+            return sum(bisect_left(self.epochs[s], value, lo, hi) - lo for s, (lo, hi) in ranges.items())
+
+        cut = None
+        for s, (lo, hi) in ranges.items():
+            epochs = self.epochs[s]
+            # Last position in [lo, hi) whose epoch has <= offset events before it
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if before(epochs[mid]) <= offset:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            if lo > ranges[s][0] and (cut is None or epochs[lo - 1] > cut):
+                cut = epochs[lo - 1]
+        return offset - before(cut), cut
+
+
+def _run(epochs, rows, source, lo, hi):
+    for i in range(lo, hi):
+        yield epochs[i], source, rows[i]
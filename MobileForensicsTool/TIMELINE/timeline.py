@@ -1,48 +1,240 @@
-from datetime import datetime
+import heapq
+import pickle
+import tempfile
+
+from ANALYSIS.records import epoch_of
+from ANALYSIS.rules import default_engine, severity
+
+# Ascending stretches shorter than this are sorted together instead of
+# being merged as separate runs
+MIN_RUN = 32
+# Events a TimelineSpool holds per source before writing a sorted run
+SPOOL_RUN_EVENTS = 100000
+# Events per pickled block of a spooled run (read back one block at a time)
+SPOOL_BLOCK_EVENTS = 1024
 
 def build_timeline(calls, messages, locations):
     """
     Builds a chronological forensic timeline from extracted artifacts.
     Each event includes type and severity for investigation clarity.
     """
-    timeline = []
-
-    # ---- CALL EVENTS ----
-    for call in calls:
-        hour = datetime.strptime(call["time"], "%Y-%m-%d %H:%M").hour
-        severity = "HIGH" if 0 <= hour <= 5 else "NORMAL"
-
-        timeline.append({
-            "time": call["time"],
-            "type": "CALL",
-            "severity": severity,
-            "event": f"Call to {call['number']} (Duration {call['duration']} sec)"
-        })
-
-    # ---- MESSAGE EVENTS ----
-    for msg in messages:
-        content = msg["message"].lower()
-        severity = "HIGH" if ("link" in content or msg["sender"].lower() == "unknown") else "NORMAL"
-
-        timeline.append({
-            "time": msg["time"],
-            "type": "MESSAGE",
-            "severity": severity,
-            "event": f"Message from {msg['sender']}: {msg['message']}"
-        })
-
-    # ---- LOCATION EVENTS ----
-    for loc in locations:
-        hour = datetime.strptime(loc["time"], "%Y-%m-%d %H:%M").hour
-        severity = "HIGH" if 0 <= hour <= 5 else "NORMAL"
-
-        timeline.append({
-            "time": loc["time"],
-            "type": "LOCATION",
-            "severity": severity,
-            "event": f"Location changed to ({loc['latitude']}, {loc['longitude']})"
-        })
-
-    # ---- SORT TIMELINE ----
-    timeline.sort(key=lambda x: datetime.strptime(x["time"], "%Y-%m-%d %H:%M"))
-    return timeline
\ No newline at end of file
+    return list(iter_timeline(calls, messages, locations))
+
+
+def iter_timeline(calls=(), messages=(), locations=(), presorted=False):
+    """
+    Yields the timeline lazily, merging the per-source event streams.
+    With presorted=True each source must already be time-ordered and is
+    consumed as an iterator (nothing is held but the merge heap);
+    otherwise sources are materialized and only their unsorted runs sorted.
+    """
+    engine = default_engine()
+    sources = [
+        iter_events("calls", engine.iter_scan("calls", calls)),
+        iter_events("messages", engine.iter_scan("messages", messages)),
+        iter_events("locations", engine.iter_scan("locations", locations)),
+    ]
+    return merge_timeline(*sources, presorted=presorted)
+
+
+def extend_timeline(timeline, calls=(), messages=(), locations=()):
+    """
+    Appends the events for one batch of artifacts to an unsorted timeline.
+    Call sort_timeline() once every batch has been added.
+    """
+    engine = default_engine()
+    add_events(timeline, "calls", engine.scan("calls", calls))
+    add_events(timeline, "messages", engine.scan("messages", messages))
+    add_events(timeline, "locations", engine.scan("locations", locations))
+    return timeline
+
+
+# ---- EVENT TYPE AND DESCRIPTION PER STREAM ----
+def _call_event(call):
+    return f"Call to {call['number']} (Duration {call['duration']} sec)"
+
+def _message_event(msg):
+    return f"Message from {msg['sender']}: {msg['message']}"
+
+def _location_event(loc):
+    return f"Location changed to ({loc['latitude']}, {loc['longitude']})"
+
+EVENT_TYPES = {
+    "calls": ("CALL", _call_event),
+    "messages": ("MESSAGE", _message_event),
+    "locations": ("LOCATION", _location_event),
+}
+
+
+def add_events(timeline, stream, scanned):
+    """
+    Appends events from an already-scanned stream: (record, rule hit) pairs
+    as returned by RuleEngine.scan. The severity comes from that same scan,
+    so records are not classified a second time.
+    """
+    timeline.extend(iter_events(stream, scanned))
+    return timeline
+
+
+def iter_events(stream, scanned):
+    event_type, describe = EVENT_TYPES[stream]
+    for rec, hit in scanned:
+        yield {
+            "time": rec["time"],
+            "epoch": epoch_of(rec),
+            "type": event_type,
+            "severity": severity(hit),
+            "event": describe(rec)
+        }
+
+
+def _event_key(event):
+    # Events with unparseable timestamps sort last
+    epoch = event["epoch"]
+    return (epoch is None, epoch or 0)
+
+
+def sort_timeline(timeline):
+    """Sorts on the epoch parsed at ingestion; no timestamp is re-parsed."""
+    timeline.sort(key=_event_key)
+    return timeline
+
+
+# ---- K-WAY MERGE ----
+def merge_timeline(*sources, presorted=False):
+    """
+    Heap-based k-way merge of per-source event streams into one
+    chronological iterator. Ties keep source order, then input order,
+    which matches a stable sort of the concatenated sources.
+    """
+    runs = []
+    for source in sources:
+        if presorted:
+            runs.append(_checked_run(source))
+        else:
+            runs.extend(sorted_runs(list(source)))
+    return heapq.merge(*runs, key=_event_key)
+
+
+def sorted_runs(events):
+    """
+    Splits events into time-ordered runs for merging. Long ascending
+    stretches are kept as they are; short ones are pooled and sorted,
+    so an already ordered source costs one linear pass.
+    """
+    keys = [_event_key(e) for e in events]
+    runs = []
+    pending = []
+    start = 0
+    while start < len(events):
+        end = start + 1
+        while end < len(events) and keys[end - 1] <= keys[end]:
+            end += 1
+        if end - start >= MIN_RUN:
+            if pending:
+                runs.append(sort_timeline(pending))
+                pending = []
+            runs.append(events[start:end])
+        else:
+            pending.extend(events[start:end])
+        start = end
+    if pending:
+        runs.append(sort_timeline(pending))
+    return runs
+
+
+def _checked_run(events):
+    last = None
+    for event in events:
+        key = _event_key(event)
+        if last is not None and key < last:
+            raise ValueError(
+                f"timeline source is not time-ordered at {event['time']}; "
+                "pass presorted=False"
+            )
+        last = key
+        yield event
+
+
+# ---- DISK-BACKED TIMELINE ----
+class TimelineSpool:
+    """
+    Timeline of a pipeline run that may not fit in memory. Events are
+    added per source as batches stream past; every SPOOL_RUN_EVENTS of a
+    source are sorted and written to a temporary file as one run. merge()
+    k-way merges the runs lazily and can be called again for every pass
+    (printing, text report, PDF). Ties keep source order, then input
+    order, like merge_timeline. Use as a context manager to delete the
+    file.
+    """
+
+    def __init__(self, run_events=SPOOL_RUN_EVENTS, dir=None):
+        self.run_events = run_events
+        self.file = tempfile.TemporaryFile(dir=dir)
+        self.pending = {}
+        self.added = {}
+        self.runs = {}
+        self.marks = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.file.close()
+
+    def __len__(self):
+        return sum(self.added.values())
+
+    def add(self, stream, scanned):
+        """Adds the events of (record, rule hit) pairs of one stream; returns how many."""
+        pending = self.pending.setdefault(stream, [])
+        # Runs are merged in the order their sources were first added
+        self.runs.setdefault(stream, [])
+        start = self.added.get(stream, 0)
+        n = 0
+        for n, event in enumerate(iter_events(stream, scanned), 1):
+            pending.append((start + n - 1, event))
+            if len(pending) >= self.run_events:
+                self._spool(stream)
+        self.added[stream] = start + n
+        return n
+
+    def mark(self, stream, positions, hit):
+        """Gives the events at these stream positions (in add order) the severity of `hit`."""
+        self.marks.setdefault(stream, {}).update(dict.fromkeys(positions, severity(hit)))
+
+    def _spool(self, stream):
+        pending = self.pending.get(stream)
+        if not pending:
+            return
+        pending.sort(key=lambda item: _event_key(item[1]))
+        self.file.seek(0, 2)
+        offset = self.file.tell()
+        for i in range(0, len(pending), SPOOL_BLOCK_EVENTS):
+            pickle.dump(pending[i:i + SPOOL_BLOCK_EVENTS], self.file, pickle.HIGHEST_PROTOCOL)
+        self.runs[stream].append((offset, -(-len(pending) // SPOOL_BLOCK_EVENTS)))
+        pending.clear()
+
+    def _read_run(self, offset, blocks, marks):
+        for _ in range(blocks):
+            # Other runs read from the same file in between
+            self.file.seek(offset)
+            block = pickle.load(self.file)
+            offset = self.file.tell()
+            for position, event in block:
+                if position in marks:
+                    event["severity"] = marks[position]
+                yield event
+
+    def merge(self):
+        """Chronological iterator over every event added so far."""
+        for stream in list(self.pending):
+            self._spool(stream)
+        runs = [
+            self._read_run(offset, blocks, self.marks.get(stream, {}))
+            for stream in self.runs for offset, blocks in self.runs[stream]
+        ]
+        return heapq.merge(*runs, key=_event_key)
@@ -1,30 +1,115 @@
 import os
+from array import array
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(BASE_DIR, "DATA")
 REPORT_DIR = os.path.join(BASE_DIR, "REPORT")
 
-def view_file(path, title=None):
+# Records shown per page
+PAGE_SIZE = 20
+
+class LineIndex:
+    """
+    Byte offset of every line start in a file, built in one pass.
+    Reading line N or a page of lines is then a single seek + read,
+    and only that window is ever decoded or held in memory.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.offsets = array("q", [0])
+        pos = 0
+        with open(path, "rb") as f:
+            for line in f:
+                pos += len(line)
+                self.offsets.append(pos)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def lines(self, start, stop):
+        """Lines [start, stop) of the file, without line endings."""
+        start, stop = max(start, 0), min(stop, len(self))
+        if start >= stop:
+            return []
+        base = self.offsets[start]
+        with open(self.path, "rb") as f:
+            f.seek(base)
+            chunk = f.read(self.offsets[stop] - base)
+        return [
+            chunk[self.offsets[i] - base:self.offsets[i + 1] - base].decode("utf-8").rstrip("\r\n")
+            for i in range(start, stop)
+        ]
+
+    def line(self, n):
+        lines = self.lines(n, n + 1)
+        return lines[0] if lines else None
+
+def _print_record(i, headers, record):
+    values = [v.strip() for v in record.strip().split(",")]
+    print(f"Record {i}:")
+    for h, v in zip(headers, values):
+        print(f"  {h.capitalize()} : {v}")
+    print("-" * 30)
+
+def page_count(index, page_size=PAGE_SIZE):
+    return max(1, -(-(len(index) - 1) // page_size))
+
+def view_page(index, headers, page, page_size=PAGE_SIZE):
+    """Prints records of 1-based `page`; record N is line N of the file."""
+    first = (page - 1) * page_size + 1
+    for i, record in enumerate(index.lines(first, first + page_size), first):
+        _print_record(i, headers, record)
+    print(f"Page {page}/{page_count(index, page_size)} ({len(index) - 1} records)")
+
+def view_record(index, headers, n):
+    record = index.line(n) if n >= 1 else None
+    if record is None:
+        print("No such record")
+        return
+    _print_record(n, headers, record)
+
+def view_file(path, title=None, page_size=PAGE_SIZE, page=None):
+    """
+    Pages through a CSV or the report. With `page` given, prints just
+    that page; otherwise prompts for navigation until the user quits.
+    """
     print("\n--- READ ONLY VIEW ---")
     if title:
         print(f"{title}\n")
 
-    with open(path, "r", encoding="utf-8") as f:
-        lines = f.readlines()
-
-    if not lines:
+    index = LineIndex(path)
+    if not len(index):
         print("No data available")
         return
 
-    headers = [h.strip() for h in lines[0].strip().split(",")]
-    records = lines[1:]
+    headers = [h.strip() for h in index.line(0).strip().split(",")]
+    pages = page_count(index, page_size)
+
+    if page is not None:
+        view_page(index, headers, min(max(page, 1), pages), page_size)
+        return
 
-    for i, record in enumerate(records, 1):
-        values = [v.strip() for v in record.strip().split(",")]
-        print(f"Record {i}:")
-        for h, v in zip(headers, values):
-            print(f"  {h.capitalize()} : {v}")
-        print("-" * 30)
+    page = 1
+    view_page(index, headers, page, page_size)
+    while True:
+        cmd = input("[n]ext  [p]rev  [g N] go to page  [r N] record  [q]uit: ").strip().split()
+        if not cmd or cmd[0] == "n":
+            if page == pages:
+                break
+            page += 1
+        elif cmd[0] == "p":
+            page = max(page - 1, 1)
+        elif cmd[0] in ("g", "r") and len(cmd) == 2 and cmd[1].isdigit():
+            if cmd[0] == "r":
+                view_record(index, headers, int(cmd[1]))
+                continue
+            page = min(max(int(cmd[1]), 1), pages)
+        elif cmd[0] == "q":
+            break
+        else:
+            print("Invalid choice")
+            continue
+        view_page(index, headers, page, page_size)
 
 def viewer_menu():
     while True:
@@ -0,0 +1,62 @@
+"""
+Command-line entry point for the whole tool.
+
+    python -m MobileForensicsTool run --case demo --quiet
+    python -m MobileForensicsTool analyze --data-dir /tmp/synth -q
+    python -m MobileForensicsTool report --case demo --pdf
+    python -m MobileForensicsTool bench --rows 100k --backend columnar
+    python -m MobileForensicsTool <command> --help
+
+Each command's module is imported only when that command runs, so the
+headless commands never load the dashboard stack (streamlit, plotly,
+pandas). `dashboard` starts the Streamlit app in its own process.
+"""
+import os
+import sys
+
+# The packages (ANALYSIS, EXTRACTOR, ...) import each other as top-level modules
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import argparse
+import importlib
+import subprocess
+
+# command -> (module, entry function, summary)
+COMMANDS = {
+    "run": ("EXTRACTOR.extractor", "main", "extract, analyze, build the timeline and write the reports"),
+    "analyze": ("EXTRACTOR.extractor", "analyze_main", "extract and analyze only; findings and a summary"),
+    "report": ("EXTRACTOR.extractor", "report_main", "regenerate the reports of an existing case"),
+    "bench": ("BENCH.benchmark", "main", "time each pipeline stage on synthetic or given evidence"),
+    "synth": ("BENCH.synthetic", "main", "generate a synthetic evidence set"),
+    "media": ("EXTRACTOR.media", "main", "pull and hash device media into a case"),
+    "dashboard": (None, None, "start the Streamlit dashboard (extra arguments go to streamlit)"),
+}
+
+
+def dashboard(argv):
+    app = os.path.join(PROJECT_ROOT, "DASHBOARD", "app.py")
+    return subprocess.call([sys.executable, "-m", "streamlit", "run", app] + argv)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m MobileForensicsTool",
+        description="Mobile forensics toolkit",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="commands:\n" + "\n".join(f"  {name:<10} {summary}" for name, (_, _, summary) in COMMANDS.items()),
+    )
+    parser.add_argument("command", choices=COMMANDS, metavar="command")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="arguments of the command (see <command> --help)")
+    args = parser.parse_args(argv)
+
+    module, function, _ = COMMANDS[args.command]
+    if module is None:
+        return dashboard(args.args)
+    entry = getattr(importlib.import_module(module), function)
+    return entry(args.args, prog=f"{parser.prog} {args.command}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+TimeBucketIndex (TIMELINE.buckets): event pages and bucket counts
+against a brute-force sort of the same events.
+
+    python -m pytest tests
+"""
+import os
+import random
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import pytest
+
+from TIMELINE.buckets import TimeBucketIndex
+
+SOURCES = ("calls", "sms", "loc")
+DAY = 86400
+
+
+@pytest.fixture(scope="module")
+def fed():
+    """An index fed in shuffled batches (with many equal epochs), and every event it holds."""
+    rng = random.Random(7)
+    index = TimeBucketIndex()
+    dated = []
+    for source in SOURCES:
+        row = 0
+        for _ in range(5):
+            # Minute timestamps over three days, so ties within and across sources
+            epochs = [rng.randrange(0, 3 * DAY, 60) for _ in range(200)]
+            epochs[::50] = [None] * len(epochs[::50])
+            severities = [rng.choice(["HIGH", "NORMAL"]) for _ in epochs]
+            index.add(source, epochs, severities=severities)
+            for e, sev in zip(epochs, severities):
+                if e is not None:
+                    dated.append((e, source, row, sev))
+                row += 1
+    # Time order, ties in source order, then in the order they were added
+    dated.sort(key=lambda d: (d[0], SOURCES.index(d[1])))
+    return index, dated
+
+
+def brute(dated, start=None, end=None, sources=None):
+    return [
+        (e, s, row) for e, s, row, _ in dated
+        if (start is None or e >= start) and (end is None or e < end) and (sources is None or s in sources)
+    ]
+
+
+def test_count_and_span(fed):
+    index, dated = fed
+    assert len(index) == len(dated)
+    assert index.count() == len(dated)
+    assert index.count(DAY, 2 * DAY) == len(brute(dated, DAY, 2 * DAY))
+    assert index.span() == (dated[0][0], dated[-1][0])
+
+
+@pytest.mark.parametrize("start,end,sources", [
+    (None, None, None),
+    (DAY + 3600, 2 * DAY + 60, None),
+    (DAY, None, ("sms", "loc")),
+])
+@pytest.mark.parametrize("limit", [1, 7, 100])
+def test_pages_match_brute_force(fed, start, end, sources, limit):
+    index, dated = fed
+    expected = brute(dated, start, end, sources)
+    for offset in list(range(0, 40, 3)) + [len(expected) - 5, len(expected), len(expected) + 10]:
+        page = index.events(start, end, sources, offset=offset, limit=limit)
+        assert page == expected[offset:offset + limit]
+
+        newest = index.events(start, end, sources, offset=offset, limit=limit, newest_first=True)
+        assert newest == expected[::-1][offset:offset + limit]
+
+
+def test_histogram_totals(fed):
+    index, dated = fed
+    for granularity in ("minute", "hour", "day"):
+        totals = index.totals(DAY, 2 * DAY, granularity=granularity)
+        expected = {}
+        for e, s, _, sev in dated:
+            if DAY <= e < 2 * DAY:
+                expected[(s, sev)] = expected.get((s, sev), 0) + 1
+        assert dict(totals) == expected
+    assert sum(index.hour_of_day("calls")) == sum(1 for d in dated if d[1] == "calls")
+
+
+def test_drop_source():
+    index = TimeBucketIndex()
+    index.add("calls", [60, 120])
+    index.add("sms", [90])
+    index.drop("calls")
+    assert index.events() == [(90, "sms", 0)]
+    assert index.histogram("minute") == [(60, "sms", "NORMAL", 1)]
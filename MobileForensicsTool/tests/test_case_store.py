@@ -0,0 +1,109 @@
+"""
+Incremental ingest of the SQLite case store (STORE.case_store): resuming
+from the byte-offset checkpoint, starting over when the file was
+replaced, and an unterminated last line.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import pytest
+
+from ANALYSIS.rules import default_engine
+from STORE.case_store import CaseStore
+
+HEADER = "number,time,duration\n"
+
+
+def call(i, hour=12):
+    return f"9{i:09d},2024-01-01 {hour:02d}:00,{i}\n"
+
+
+@pytest.fixture
+def store(tmp_path):
+    with CaseStore(str(tmp_path / "case.db")) as store:
+        yield store
+
+
+@pytest.fixture
+def calls_csv(tmp_path):
+    return tmp_path / "calls.csv"
+
+
+def ingest(store, path, batch_size=2, shown=None):
+    on_batch = (lambda batch, scanned: shown.extend(rec["number"] for rec in batch)) if shown is not None else None
+    return store.ingest_csv("calls", str(path), default_engine().scan, batch_size, on_batch)
+
+
+def numbers(store):
+    return [row[0] for row in store.conn.execute("SELECT number FROM calls ORDER BY id")]
+
+
+def test_resumes_from_checkpoint(store, calls_csv):
+    calls_csv.write_text(HEADER + call(0) + call(1) + call(2, hour=3))
+    assert ingest(store, calls_csv) == 3
+
+    with open(calls_csv, "a") as f:
+        f.write(call(3) + call(4, hour=1))
+    shown = []
+    assert ingest(store, calls_csv, shown=shown) == 2
+    assert shown == ["9000000003", "9000000004"]
+    assert numbers(store) == [f"9{i:09d}" for i in range(5)]
+    assert [rec["number"] for rec in store.suspicious("calls")] == ["9000000002", "9000000004"]
+
+    # Nothing appended: nothing read
+    assert ingest(store, calls_csv) == 0
+    assert store.count("calls") == 5
+
+
+def test_replaced_file_is_read_again(store, calls_csv):
+    calls_csv.write_text(HEADER + call(0) + call(1))
+    ingest(store, calls_csv)
+
+    # Same size and longer, but different bytes before the checkpoint
+    calls_csv.write_text(HEADER + call(7) + call(8) + call(9))
+    assert ingest(store, calls_csv) == 3
+    assert numbers(store) == ["9000000007", "9000000008", "9000000009"]
+
+
+def test_truncated_file_is_read_again(store, calls_csv):
+    calls_csv.write_text(HEADER + call(0) + call(1) + call(2))
+    ingest(store, calls_csv)
+    calls_csv.write_text(HEADER + call(0))
+    assert ingest(store, calls_csv) == 1
+    assert numbers(store) == ["9000000000"]
+
+
+def test_unterminated_last_line(store, calls_csv):
+    # A dump still being written: the last row has no newline yet
+    calls_csv.write_text(HEADER + call(0) + "9000000001,2024-01-01 12:00,1")
+    assert ingest(store, calls_csv) == 2
+    assert numbers(store) == ["9000000000", "9000000001"]
+
+    # Unchanged: the tail is read again but replaces its row
+    shown = []
+    assert ingest(store, calls_csv, shown=shown) == 0
+    assert shown == []
+    assert store.count("calls") == 2
+
+    # The writer finishes the line and appends more
+    with open(calls_csv, "a") as f:
+        f.write("5\n" + call(2))
+    shown = []
+    assert ingest(store, calls_csv, shown=shown) == 1
+    assert shown == ["9000000002"]
+    assert numbers(store) == ["9000000000", "9000000001", "9000000002"]
+    assert store.find("calls", number="9000000001")[0]["duration"] == "15"
+
+
+def test_header_only_and_empty_files(store, calls_csv):
+    calls_csv.write_text("")
+    assert ingest(store, calls_csv) == 0
+    calls_csv.write_text(HEADER)
+    assert ingest(store, calls_csv) == 0
+    assert store.count("calls") == 0
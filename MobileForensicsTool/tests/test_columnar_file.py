@@ -0,0 +1,93 @@
+"""
+The pure-Python .ecpk evidence column pack (STORE.columnar_file): plain
+columns and DataFrames written and read back, slices, missing values.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import pytest
+
+from STORE import columnar_file
+from STORE.columnar_file import PackFile, open_columns, write_columns, write_frame
+
+COLUMNS = [
+    ("number", "str", ["9123456789", None, "", "Ünïcode ☎", "+91 98"]),
+    ("duration", "i64", [12, None, 0, -5, 2 ** 40]),
+    ("lat", "f64", [23.0225, -0.5, 0.0, 1e-9, 72.5714]),
+    ("flagged", "bool", [True, False, False, True, False]),
+]
+
+
+def test_columns_round_trip(tmp_path):
+    path = str(tmp_path / "calls.ecpk")
+    write_columns(path, COLUMNS, meta={"source": "calls.csv", "offset": 123})
+
+    with open_columns(path) as f:
+        assert isinstance(f, PackFile)
+        assert len(f) == 5
+        assert f.names == [name for name, _, _ in COLUMNS]
+        assert f.meta == {"source": "calls.csv", "offset": 123}
+        for name, _, values in COLUMNS:
+            assert f.column(name) == values
+            assert f.column(name, 1, 4) == values[1:4]
+            assert f.column(name, 3, 99) == values[3:]
+            assert f.column(name, 4, 2) == []
+
+
+def test_frame_round_trip(tmp_path):
+    pd = pytest.importorskip("pandas")
+    df = pd.DataFrame({
+        "address": ["+919876543210", None, "Bank"],
+        "count": pd.array([1, None, 3], dtype="Int64"),
+        "plain": [1, 2, 3],
+        "score": [0.5, float("nan"), 2.0],
+        "read": [True, False, True],
+        "when": pd.to_datetime(["2024-01-01 10:00", None, "2024-03-01 00:30"]),
+    })
+    path = write_frame(str(tmp_path / "sms.ecpk"), df)
+
+    with open_columns(path) as f:
+        back = f.to_pandas()
+        assert f.column("address") == ["+919876543210", None, "Bank"]
+        assert f.column("count") == [1, None, 3]
+    pd.testing.assert_frame_equal(back, df)
+
+
+def test_empty_and_foreign_files(tmp_path):
+    path = str(tmp_path / "empty.ecpk")
+    write_columns(path, [("number", "str", [])])
+    with open_columns(path) as f:
+        assert len(f) == 0 and f.column("number") == []
+
+    bogus = tmp_path / "bogus.ecpk"
+    bogus.write_bytes(b"NOTECPK!" + bytes(64))
+    with pytest.raises(ValueError):
+        PackFile(str(bogus))
+
+    with pytest.raises(ValueError):
+        write_columns(str(tmp_path / "bad.ecpk"), [("x", "complex", [1j])])
+
+
+def test_find_prefers_readable_formats(tmp_path):
+    base = str(tmp_path / "calls")
+    assert columnar_file.find(base) is None
+    write_columns(base + ".ecpk", COLUMNS)
+    assert columnar_file.find(base) == base + ".ecpk"
+
+
+def test_packed_batches_cover_row_range(tmp_path):
+    from EXTRACTOR.extractor import iter_packed_batches
+
+    path = str(tmp_path / "calls.ecpk")
+    numbers = [str(i) for i in range(23)]
+    write_columns(path, [("number", "str", numbers), ("duration", "str", ["1"] * 23)])
+    for start, stop in ((0, None), (5, 18), (20, 99), (7, 7)):
+        batches = list(iter_packed_batches(path, 4, start=start, stop=stop))
+        assert all(len(b) <= 4 for b in batches)
+        assert [row["number"] for b in batches for row in b] == numbers[start:stop]
@@ -0,0 +1,111 @@
+"""
+Media acquisition against DASHBOARD/stub_adb.py serving a local directory.
+
+    python -m pytest tests
+"""
+import hashlib
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import pytest
+
+from EXTRACTOR import media
+from STORE.case_store import CaseStore
+
+STUB_ADB = os.path.join(PROJECT_ROOT, "DASHBOARD", "stub_adb.py")
+
+
+@pytest.fixture
+def device(tmp_path, monkeypatch):
+    sdcard = tmp_path / "sdcard"
+    (sdcard / "DCIM").mkdir(parents=True)
+    monkeypatch.setenv("STUB_ADB_MEDIA_DIR", str(sdcard))
+    monkeypatch.setenv("STUB_ADB_SERIALS", "STUB0001")
+    return sdcard / "DCIM"
+
+
+@pytest.fixture
+def case(tmp_path):
+    with CaseStore(str(tmp_path / "case.db")) as store:
+        yield store, str(tmp_path / "case_media")
+
+
+def put(device, name, data, mtime):
+    path = device / name
+    path.write_bytes(data)
+    os.utime(path, (mtime, mtime))
+
+
+def acquire(case):
+    store, dest_dir = case
+    adb = media.Adb(STUB_ADB)
+    return media.acquire_media(store, adb.run, adb.open_stream, dest_dir, "/sdcard/DCIM", workers=2, chunk_size=7)
+
+
+def rows(store):
+    return store.conn.execute("SELECT device_path, sha256, local_path, duplicate_of FROM media ORDER BY id").fetchall()
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def assert_intact(store):
+    # Every row's local copy still hashes to the row's SHA-256
+    for _, digest, path, _ in rows(store):
+        with open(path, "rb") as f:
+            assert hashlib.sha256(f.read()).hexdigest() == digest
+
+
+def test_pull_hashes_and_skips(device, case):
+    put(device, "a.jpg", b"first picture" * 100, 1_000_000)
+    put(device, "b.jpg", b"second picture" * 50, 1_000_000)
+    summary = acquire(case)
+    assert (summary["new"], summary["failed"], summary["bytes"]) == (2, 0, 1300 + 700)
+    assert sorted(r[1] for r in rows(case[0])) == sorted([sha256(b"first picture" * 100), sha256(b"second picture" * 50)])
+    assert_intact(case[0])
+
+    summary = acquire(case)
+    assert (summary["skipped"], summary["new"], summary["bytes"]) == (2, 0, 0)
+
+
+def test_new_version_keeps_earlier_copy(device, case):
+    first, second = b"original bytes" * 40, b"edited bytes!" * 60
+    put(device, "a.jpg", first, 1_000_000)
+    acquire(case)
+    put(device, "a.jpg", second, 1_000_500)
+    assert acquire(case)["new"] == 1
+    (_, digest1, path1, _), (_, digest2, path2, _) = rows(case[0])
+    assert (digest1, digest2) == (sha256(first), sha256(second))
+    assert path1 != path2
+    assert_intact(case[0])
+
+    # Back to the first bytes: a duplicate of row 1, whose copy must survive
+    put(device, "a.jpg", first, 1_001_000)
+    assert acquire(case)["duplicate"] == 1
+    assert rows(case[0])[2][2:] == (path1, 1)
+    assert_intact(case[0])
+
+
+def test_resume_and_stale_part(device, case):
+    data = bytes(range(256)) * 8
+    put(device, "a.jpg", data, 1_000_000)
+    listed = media.MediaFile("/sdcard/DCIM/a.jpg", len(data), 1_000_000)
+    dest = media.local_path(case[1], listed.path)
+    os.makedirs(os.path.dirname(dest))
+    # A prefix of this version is resumed, a part of an older version dropped
+    with open(media.part_path(dest, listed), "wb") as f:
+        f.write(data[:1000])
+    stale = media.part_path(dest, listed._replace(size=5000, mtime=999_000))
+    with open(stale, "wb") as f:
+        f.write(b"x" * 3000)
+
+    summary = acquire(case)
+    assert (summary["new"], summary["bytes"]) == (1, len(data) - 1000)
+    assert rows(case[0])[0][1] == sha256(data)
+    assert not os.path.exists(stale)
+    assert_intact(case[0])
@@ -0,0 +1,91 @@
+"""
+Rule engine (ANALYSIS.rules): the compiled single pass reports the same
+rule as evaluating the registered rules one by one, and the columnar
+backend agrees with it.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import pytest
+
+from ANALYSIS.records import Call, Message
+from ANALYSIS.rules import (
+    ExactMatchRule, KeywordRule, NightTimeRule, RuleEngine, flagged, severity
+)
+
+# Registration order decides the reported rule; groups must not reorder it
+RULES = [
+    KeywordRule("otp", "messages", "message", ["otp"]),
+    ExactMatchRule("blocked_sender", "messages", "sender", ["spammer"]),
+    KeywordRule("link", "messages", "message", ["link", "bit.ly"]),
+    KeywordRule("bank", "messages", "message", ["bank", "link"]),
+    NightTimeRule("night_call", "calls"),
+    ExactMatchRule("blocked_number", "calls", "number", ["666"]),
+]
+
+MESSAGES = [
+    Message.from_row({"sender": "bank", "message": "Your OTP is 1234", "time": "2024-01-01 12:00"}),
+    Message.from_row({"sender": "SPAMMER", "message": "visit bit.ly/x", "time": "2024-01-01 12:00"}),
+    # "bank" comes first in the text, but "link" belongs to the earlier rule
+    Message.from_row({"sender": "x", "message": "bank transfer link", "time": "2024-01-01 12:00"}),
+    Message.from_row({"sender": "x", "message": "BANK statement", "time": "2024-01-01 12:00"}),
+    Message.from_row({"sender": "x", "message": "hello", "time": "bad"}),
+    Message.from_row({"sender": "x", "message": "", "time": "2024-01-01 12:00"}),
+]
+
+CALLS = [
+    Call.from_row({"number": "666", "time": "2024-01-01 03:00", "duration": "1"}),
+    Call.from_row({"number": "666", "time": "2024-01-01 13:00", "duration": "1"}),
+    Call.from_row({"number": "1", "time": "2024-01-01 05:59", "duration": "1"}),
+    Call.from_row({"number": "1", "time": "2024-01-01 06:00", "duration": "1"}),
+    Call.from_row({"number": "1", "time": "not a time", "duration": "1"}),
+]
+
+
+def first_hit(stream, rec):
+    return next((r.name for r in RULES if r.stream == stream and r.match(rec)), None)
+
+
+def test_compiled_engine_matches_rules_in_order():
+    engine = RuleEngine(RULES)
+    hits = [hit for _, hit in engine.scan("messages", MESSAGES)]
+    assert hits == [first_hit("messages", m) for m in MESSAGES]
+    assert hits == ["otp", "blocked_sender", "link", "bank", None, None]
+
+    hits = [hit for _, hit in engine.scan("calls", CALLS)]
+    assert hits == [first_hit("calls", c) for c in CALLS]
+    assert hits == ["night_call", "blocked_number", "night_call", None, None]
+
+
+def test_iter_scan_is_lazy_scan():
+    engine = RuleEngine(RULES)
+    assert list(engine.iter_scan("messages", iter(MESSAGES))) == engine.scan("messages", MESSAGES)
+
+
+def test_flagged_and_severity():
+    scanned = RuleEngine(RULES).scan("calls", CALLS)
+    assert flagged(scanned) == CALLS[:3]
+    assert [severity(hit) for _, hit in scanned] == ["HIGH"] * 3 + ["NORMAL"] * 2
+
+
+def test_empty_keyword_list_is_rejected():
+    with pytest.raises(ValueError):
+        KeywordRule("nothing", "messages", "message", [])
+    with pytest.raises(ValueError):
+        NightTimeRule("night", "no_such_stream")
+
+
+def test_columnar_backend_agrees(monkeypatch):
+    pytest.importorskip("pandas")
+    from ANALYSIS import columnar
+
+    engine = RuleEngine(RULES)
+    monkeypatch.setattr(columnar, "default_engine", lambda: engine)
+    for stream, records in (("messages", MESSAGES), ("calls", CALLS)):
+        assert list(columnar.hits(stream, records)) == [hit for _, hit in engine.scan(stream, records)]
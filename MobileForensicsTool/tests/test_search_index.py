@@ -0,0 +1,94 @@
+"""
+Search box syntax (STORE.search_index) against an in-memory FTS5 index.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import pytest
+
+from STORE.search_index import SearchIndex, field_name, to_fts_query
+
+pd = pytest.importorskip("pandas")
+
+FIELDS = ["address", "body", "file_name"]
+
+
+@pytest.fixture(scope="module")
+def index():
+    messages = pd.DataFrame({
+        "address": ["+919876543210", "9123456789", "+14155550100", "Bank"],
+        "Body": ["click link now", "all good", "linked in invite", "OTP is 4821"],
+    })
+    media = pd.DataFrame({"File Name": ["IMG_001.jpg", "VID_002.mp4"]})
+    return SearchIndex.build({"messages": messages, "media": media})
+
+
+def test_field_name():
+    assert field_name("File Name") == "file_name"
+    assert field_name("  Body ") == "body"
+    assert field_name("???") == "field"
+
+
+def test_terms_and_phrases():
+    assert to_fts_query("link", FIELDS) == '- _all : "link"'
+    assert to_fts_query('"click this"', FIELDS) == '- _all : "click this"'
+    assert to_fts_query("link*", FIELDS) == '- _all : "link"*'
+
+
+def test_field_scope():
+    assert to_fts_query("address:+91*", FIELDS) == 'address : "+91"*'
+    assert to_fts_query("File_Name:img*", FIELDS) == 'file_name : "img"*'
+    # A field the table lacks means that stream cannot match
+    assert to_fts_query("sender:bank", FIELDS) is None
+
+
+def test_dangling_operators():
+    assert to_fts_query("link AND", FIELDS) == '- _all : "link"'
+    assert to_fts_query("OR link", FIELDS) == '- _all : "link"'
+    assert to_fts_query("NOT", FIELDS) is None
+    assert to_fts_query("", FIELDS) is None
+
+
+def test_unary_not_gets_every_row():
+    assert to_fts_query("NOT link", FIELDS) == '_all : "all" NOT - _all : "link"'
+    assert to_fts_query("good OR NOT link", FIELDS) == '- _all : "good" OR _all : "all" NOT - _all : "link"'
+
+
+def test_row_positions(index):
+    assert index.row_positions("messages", "link") == [0]
+    assert index.row_positions("messages", "link*") == [0, 2]
+    assert index.row_positions("messages", '"click link"') == [0]
+    assert index.row_positions("messages", "link* NOT invite") == [0]
+    assert index.row_positions("messages", "good OR otp") == [1, 3]
+    assert index.row_positions("messages", "link*", limit=1) == [0]
+
+
+def test_leading_not_excludes(index):
+    assert index.row_positions("messages", "NOT link") == [1, 2, 3]
+    assert index.row_positions("messages", "NOT link*") == [1, 3]
+    # The hidden every-row column is not searchable as a term
+    assert index.row_positions("messages", "all") == [1]
+
+
+def test_plus_numbers(index):
+    assert index.row_positions("messages", "address:+91*") == [0]
+    assert index.row_positions("messages", "address:91*") == [1]
+    assert index.row_positions("messages", "address:+1*") == [2]
+
+
+def test_field_scoped_streams(index):
+    assert index.row_positions("media", "file_name:img*") == [0]
+    assert index.row_positions("media", "address:+91*") == []
+    hits = index.search({"messages": None, "media": pd.DataFrame({"File Name": ["IMG_001.jpg", "VID_002.mp4"]})},
+                        "file_name:vid*", streams=["media"])
+    assert list(hits) == ["media"] and hits["media"]["File Name"].tolist() == ["VID_002.mp4"]
+
+
+def test_unknown_stream_matches_nothing(index):
+    assert index.row_positions("unknown", "link") == []
@@ -0,0 +1,83 @@
+"""
+Near-duplicate SMS clustering (ANALYSIS.similarity): campaigns found
+across batches, unrelated texts kept apart, and identical signatures
+from the NumPy and pure-Python paths.
+
+    python -m pytest tests
+"""
+import os
+import random
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import pytest
+
+from ANALYSIS import similarity
+from ANALYSIS.similarity import CAMPAIGN_RULE, MessageClusters, mark_campaigns, normalize
+
+TEMPLATE = "Dear customer your KYC is pending, update at http://bit.ly/{} or account {} blocked"
+OTHER = [
+    "Are we still meeting for lunch tomorrow at the usual place?",
+    "Your parcel has been dispatched and will arrive on Friday",
+    "Happy birthday! Hope you have a wonderful day with family",
+    "Reminder: electricity bill due, pay via the official app only",
+]
+
+
+def messages(seed=5):
+    """40 campaign texts from rotating senders mixed with unrelated and short texts."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(40):
+        rows.append({"sender": f"VM-{i % 7}", "message": TEMPLATE.format(rng.randrange(10 ** 6), rng.randrange(10 ** 4)), "time": f"2024-01-02 {i % 24:02d}:00"})
+        if i % 4 == 0:
+            rows.append({"sender": "friend", "message": OTHER[i // 4 % len(OTHER)] + f" ({i})", "time": "2024-01-02 10:00"})
+        if i % 10 == 0:
+            rows.append({"sender": "friend", "message": "ok", "time": "2024-01-02 10:00"})
+    return rows
+
+
+def test_normalize():
+    assert normalize("  OTP 4821  is\tyours ") == "otp 0 is yours"
+    assert normalize("Call 98 765 43210") == "call 0 0 0"
+    assert normalize(None) == "" and normalize(float("nan")) == ""
+
+
+def test_campaign_found_across_batches():
+    rows = messages()
+    clusters = MessageClusters()
+    for lo in range(0, len(rows), 9):
+        clusters.update(rows[lo:lo + 9])
+    # "ok" is too short to index
+    assert len(clusters) == len(rows) - sum(r["message"] == "ok" for r in rows)
+
+    campaigns = clusters.campaigns()
+    assert len(campaigns) == 1
+    campaign = campaigns[0]
+    assert campaign.size == 40
+    assert len(campaign.senders) == 7
+
+    keys = clusters.campaign_keys()
+    assert keys == {i for i, r in enumerate(rows) if r["message"].startswith("Dear customer")}
+
+    marked = list(mark_campaigns(((r, None) for r in rows), keys))
+    assert [hit for _, hit in marked] == [CAMPAIGN_RULE if i in keys else None for i in range(len(rows))]
+
+
+def test_caller_keys_and_thresholds():
+    rows = messages()
+    clusters = MessageClusters()
+    clusters.add_many([r["message"] for r in rows], [r["sender"] for r in rows], keys=[f"m{i}" for i in range(len(rows))])
+    assert all(k.startswith("m") for k in clusters.campaign_keys())
+    # More senders than the campaign has: not a campaign
+    assert clusters.campaigns(min_senders=8) == []
+
+
+def test_numpy_and_python_signatures_agree():
+    np = pytest.importorskip("numpy")
+    blobs = [normalize(r["message"]).encode("utf-8") for r in messages() if len(r["message"]) > 10]
+    flat, bands = similarity._signatures_numpy(np, blobs)
+    assert similarity._signatures_python(blobs) == (flat, bands)
@@ -0,0 +1,100 @@
+"""
+Timeline merging (TIMELINE.timeline): the k-way merge against a stable
+sort, the presorted=True order check, and the disk-spooled TimelineSpool
+against an in-memory merge_timeline of the same events.
+
+    python -m pytest tests
+"""
+import os
+import random
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import pytest
+
+from ANALYSIS.similarity import CAMPAIGN_RULE
+from TIMELINE.timeline import MIN_RUN, TimelineSpool, iter_events, merge_timeline, sort_timeline, sorted_runs
+
+STREAMS = ("calls", "messages", "locations")
+
+
+def scanned(n, seed):
+    """(record, hit) pairs with shuffled minute timestamps, a few of them invalid."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        time = "not a time" if i % 97 == 0 else f"2024-01-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}"
+        rows.append(({
+            "time": time, "number": str(i), "type": "incoming", "duration": "1",
+            "sender": str(i), "message": f"message {i}", "latitude": "1.0", "longitude": "2.0",
+        }, None))
+    return rows
+
+
+def events(stream, rows):
+    return list(iter_events(stream, rows))
+
+
+def test_merge_is_a_stable_sort():
+    sources = [events(stream, scanned(500, seed)) for seed, stream in enumerate(STREAMS)]
+    expected = sort_timeline([e for source in sources for e in source])
+    assert list(merge_timeline(*sources)) == expected
+
+
+def test_sorted_runs_keep_ascending_stretches():
+    ordered = sort_timeline(events("calls", scanned(3 * MIN_RUN, 1)))
+    runs = sorted_runs(ordered)
+    assert len(runs) == 1 and runs[0] == ordered
+
+    # A long ordered stretch stays a run; short disordered ones are pooled and sorted
+    mixed = ordered + events("calls", scanned(10, 2))[1:]
+    runs = sorted_runs(mixed)
+    assert runs[0] == ordered
+    assert [e for run in runs for e in run] != mixed
+    assert sorted(map(id, (e for run in runs for e in run))) == sorted(map(id, mixed))
+
+
+def test_presorted_sources_are_streamed():
+    sources = [sort_timeline(events(stream, scanned(300, seed))) for seed, stream in enumerate(STREAMS)]
+    expected = list(merge_timeline(*sources))
+    assert list(merge_timeline(*(iter(s) for s in sources), presorted=True)) == expected
+
+
+def test_presorted_rejects_out_of_order_source():
+    ordered = sort_timeline(events("calls", scanned(50, 4)))
+    merged = merge_timeline(ordered[::-1], presorted=True)
+    with pytest.raises(ValueError, match="presorted=False"):
+        list(merged)
+
+
+def test_spool_matches_in_memory_merge():
+    data = {stream: scanned(2000, seed) for seed, stream in enumerate(STREAMS)}
+    campaign = {3, 1500}
+
+    # Small runs and batches so every source is spread over several runs
+    with TimelineSpool(run_events=300) as spool:
+        for lo in range(0, 2000, 250):
+            for stream in STREAMS:
+                spool.add(stream, data[stream][lo:lo + 250])
+        spool.mark("messages", campaign, CAMPAIGN_RULE)
+        assert len(spool) == 6000
+        first, second = list(spool.merge()), list(spool.merge())
+
+    messages = list(iter_events("messages", data["messages"]))
+    for i in campaign:
+        messages[i]["severity"] = "HIGH"
+    expected = list(merge_timeline(
+        iter_events("calls", data["calls"]), messages, iter_events("locations", data["locations"])
+    ))
+    assert first == expected
+    assert second == expected
+
+
+def test_empty_spool():
+    with TimelineSpool() as spool:
+        assert spool.add("calls", []) == 0
+        assert len(spool) == 0
+        assert list(spool.merge()) == []